@@ -0,0 +1,96 @@
+"""Add full-text search
+
+Revision ID: d41f7a9e2c15
+Revises: 9c4e1f2a7b3d
+Create Date: 2026-10-18 16:40:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7a9e2c15'
+down_revision: Union[str, None] = '9c4e1f2a7b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # stored generated columns, existing rows are indexed by the ALTER TABLE
+        op.execute(
+            'ALTER TABLE products ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ('
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+            ') STORED'
+        )
+        op.execute('CREATE INDEX ix_products_search_vector ON products USING gin (search_vector)')
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX ix_products_title_trgm ON products USING gin (title gin_trgm_ops)')
+        op.execute(
+            'ALTER TABLE reviews ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ('
+            "setweight(to_tsvector('english', coalesce(content, '')), 'A')"
+            ') STORED'
+        )
+        op.execute('CREATE INDEX ix_reviews_search_vector ON reviews USING gin (search_vector)')
+    elif dialect == 'sqlite':
+        op.execute(
+            'CREATE VIRTUAL TABLE products_fts USING fts5(title, description, '
+            "content='products', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            'CREATE TRIGGER products_fts_insert AFTER INSERT ON products BEGIN '
+            'INSERT INTO products_fts(rowid, title, description) '
+            'VALUES (new.id, new.title, new.description); END'
+        )
+        op.execute(
+            'CREATE TRIGGER products_fts_delete AFTER DELETE ON products BEGIN '
+            'INSERT INTO products_fts(products_fts, rowid, title, description) '
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            'CREATE TRIGGER products_fts_update AFTER UPDATE ON products BEGIN '
+            'INSERT INTO products_fts(products_fts, rowid, title, description) '
+            "VALUES ('delete', old.id, old.title, old.description); "
+            'INSERT INTO products_fts(rowid, title, description) '
+            'VALUES (new.id, new.title, new.description); END'
+        )
+        op.execute("INSERT INTO products_fts(products_fts) VALUES ('rebuild')")
+        op.execute(
+            'CREATE VIRTUAL TABLE reviews_fts USING fts5(content, '
+            "content='reviews', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            'CREATE TRIGGER reviews_fts_insert AFTER INSERT ON reviews BEGIN '
+            'INSERT INTO reviews_fts(rowid, content) VALUES (new.id, new.content); END'
+        )
+        op.execute(
+            'CREATE TRIGGER reviews_fts_delete AFTER DELETE ON reviews BEGIN '
+            'INSERT INTO reviews_fts(reviews_fts, rowid, content) '
+            "VALUES ('delete', old.id, old.content); END"
+        )
+        op.execute(
+            'CREATE TRIGGER reviews_fts_update AFTER UPDATE ON reviews BEGIN '
+            'INSERT INTO reviews_fts(reviews_fts, rowid, content) '
+            "VALUES ('delete', old.id, old.content); "
+            'INSERT INTO reviews_fts(rowid, content) VALUES (new.id, new.content); END'
+        )
+        op.execute("INSERT INTO reviews_fts(reviews_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_reviews_search_vector')
+        op.execute('ALTER TABLE reviews DROP COLUMN IF EXISTS search_vector')
+        op.execute('DROP INDEX IF EXISTS ix_products_title_trgm')
+        op.execute('DROP INDEX IF EXISTS ix_products_search_vector')
+        op.execute('ALTER TABLE products DROP COLUMN IF EXISTS search_vector')
+    elif dialect == 'sqlite':
+        for table in ('reviews_fts', 'products_fts'):
+            for trigger in ('insert', 'delete', 'update'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_{trigger}')
+            op.execute(f'DROP TABLE IF EXISTS {table}')
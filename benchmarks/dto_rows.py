@@ -0,0 +1,110 @@
+"""
+Per-row cost of turning database rows into GraphQL objects:
+* validated - pydantic DTO validated from the row and dumped again by the converter
+* trusted - slotted row dataclass passed to the converter as is
+
+Usage:
+    PYTHONPATH=src python benchmarks/dto_rows.py --rows 10000 --repeat 5
+"""
+import argparse
+import os
+import time
+from typing import Any, Callable
+
+for _name, _default in (
+    ('POSTGRES_DB', 'postgres'),
+    ('POSTGRES_PORT', '5432'),
+    ('POSTGRES_HOST', 'localhost'),
+    ('POSTGRES_USER', 'postgres'),
+    ('POSTGRES_PASSWORD', 'postgres'),
+):
+    os.environ.setdefault(_name, _default)
+
+from product_service.api.graphql.v1.converters.product import StrawberryProductConverter  # noqa: E402
+from product_service.api.graphql.v1.converters.review import StrawberryReviewConverter  # noqa: E402
+from product_service.api.graphql.v1.queries.product import Product  # noqa: E402
+from product_service.api.graphql.v1.queries.review import Review  # noqa: E402
+from product_service.api.graphql.v1.queries.user import User  # noqa: E402
+from product_service.core.dto import (  # noqa: E402
+    ProductDTO,
+    ProductRow,
+    ReviewDTO,
+    ReviewRow,
+    UserDTO,
+    UserRow,
+)
+
+
+def validated_product(row: dict[str, Any]) -> Product:
+    data = ProductDTO(**row).model_dump()
+    return Product(**data, _reviews=None)
+
+
+def validated_review(row: dict[str, Any]) -> Review:
+    dto = ReviewDTO(**row['review'])
+    dto.user = UserDTO(**row['user'])  # type: ignore[attr-defined]
+    dto.product = ProductDTO(**row['product'])  # type: ignore[attr-defined]
+    data = dto.model_dump()
+    return Review(
+        _user_id=data.pop('user_id'),
+        _product_id=data.pop('product_id'),
+        _user=User(**data.pop('user')),
+        _product=Product(**data.pop('product')),
+        **data,
+    )
+
+
+def trusted_product(row: dict[str, Any]) -> Product:
+    return StrawberryProductConverter.convert(ProductRow(**row))
+
+
+def trusted_review(row: dict[str, Any]) -> Review:
+    review = ReviewRow(**row['review'])
+    review.user = UserRow(**row['user'])
+    review.product = ProductRow(**row['product'])
+    return StrawberryReviewConverter.convert(review)
+
+
+def measure(
+    convert: Callable[[dict[str, Any]], Any],
+    rows: list[dict[str, Any]],
+    repeat: int,
+) -> float:
+    """Best time per row in microseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            convert(row)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows) * 1_000_000
+
+
+def main(args: argparse.Namespace) -> None:
+    products = [
+        {'id': i, 'title': f'product{i}', 'description': f'description{i}'}
+        for i in range(args.rows)
+    ]
+    reviews = [
+        {
+            'review': {'id': i, 'content': f'content{i}', 'user_id': i, 'product_id': i},
+            'user': {'id': i, 'username': f'user{i}'},
+            'product': products[i],
+        }
+        for i in range(args.rows)
+    ]
+    print(f'{"rows":<20}{"validated, us":>16}{"trusted, us":>14}{"speedup":>10}')
+    for name, validated, trusted, data in (
+        ('products', validated_product, trusted_product, products),
+        ('reviews+related', validated_review, trusted_review, reviews),
+    ):
+        before = measure(validated, data, args.repeat)
+        after = measure(trusted, data, args.repeat)
+        print(f'{name:<20}{before:>16.2f}{after:>14.2f}{before / after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    main(parser.parse_args())
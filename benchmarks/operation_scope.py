@@ -0,0 +1,232 @@
+"""
+Compares pooled connection checkouts and dependency resolution time per GraphQL operation
+of two containers:
+* per-resolve - every "container.get" builds a new gateway with its own session
+* per-operation - "AppContainer", one session and one resolver set per operation
+
+Runs against a temporary SQLite database, usage:
+    PYTHONPATH=src python benchmarks/operation_scope.py --iterations 50 --users 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Iterator
+
+for _name, _default in (
+    ('POSTGRES_DB', 'postgres'),
+    ('POSTGRES_PORT', '5432'),
+    ('POSTGRES_HOST', 'localhost'),
+    ('POSTGRES_USER', 'postgres'),
+    ('POSTGRES_PASSWORD', 'postgres'),
+    ('LISTEN_SQL_QUERIES', 'false'),
+):
+    os.environ.setdefault(_name, _default)
+
+import httpx  # noqa: E402
+from dishka import AnyOf, AsyncContainer, Provider, Scope, make_async_container, provide  # noqa: E402
+from dishka.integrations.fastapi import setup_dishka  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from product_service.api.graphql.v1.resolvers.product import StrawberryProductResolver  # noqa: E402
+from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver  # noqa: E402
+from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver  # noqa: E402
+from product_service.core.db.sqlalchemy import Database  # noqa: E402
+from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM, UserORM  # noqa: E402
+from product_service.core.di import AppContainer  # noqa: E402
+from product_service.gateways.base import ProductGateway, ReviewGateway, UserGateway  # noqa: E402
+from product_service.gateways.sqlalchemy.product import SQLAlchemyAggregatedProductGateway  # noqa: E402
+from product_service.gateways.sqlalchemy.review import SQLAlchemyAggregatedReviewGateway  # noqa: E402
+from product_service.gateways.sqlalchemy.user import SQLAlchemyAggregatedUserGateway  # noqa: E402
+from product_service.main import graphql_app_factory  # noqa: E402
+
+QUERY = """
+query Query($first: Int!) {
+  users(first: $first) {
+    edges {
+      node {
+        username
+        reviews(first: 5) {
+          totalCount
+          edges {
+            node {
+              content
+              product {
+                ... on Product {
+                  title
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+  products(first: $first) {
+    totalCount
+    edges {
+      node {
+        title
+      }
+    }
+  }
+}
+"""
+
+
+class PerResolveProvider(Provider):
+    """Gateways and resolvers are not cached, every gateway opens its own session"""
+
+    @provide(scope=Scope.REQUEST, cache=False)
+    async def user_repository(self, db: Database) -> AnyOf[
+        AsyncGenerator[UserGateway, None],
+        AsyncGenerator[SQLAlchemyAggregatedUserGateway, None],
+    ]:
+        async with db.async_session_factory() as session:
+            yield SQLAlchemyAggregatedUserGateway(session)
+
+    @provide(scope=Scope.REQUEST, cache=False)
+    async def product_repository(self, db: Database) -> AnyOf[
+        AsyncGenerator[ProductGateway, None],
+        AsyncGenerator[SQLAlchemyAggregatedProductGateway, None],
+    ]:
+        async with db.async_session_factory() as session:
+            yield SQLAlchemyAggregatedProductGateway(session)
+
+    @provide(scope=Scope.REQUEST, cache=False)
+    async def review_repository(self, db: Database) -> AnyOf[
+        AsyncGenerator[ReviewGateway, None],
+        AsyncGenerator[SQLAlchemyAggregatedReviewGateway, None],
+    ]:
+        async with db.async_session_factory() as session:
+            yield SQLAlchemyAggregatedReviewGateway(session)
+
+    @provide(scope=Scope.REQUEST, cache=False)
+    def strawberry_review_resolver(self, repository: ReviewGateway) -> StrawberryReviewResolver:
+        return StrawberryReviewResolver(repository)
+
+    @provide(scope=Scope.REQUEST, cache=False)
+    def strawberry_product_resolver(self, repository: ProductGateway) -> StrawberryProductResolver:
+        return StrawberryProductResolver(repository)
+
+    @provide(scope=Scope.REQUEST, cache=False)
+    def strawberry_user_resolver(self, repository: UserGateway) -> StrawberryUserResolver:
+        return StrawberryUserResolver(repository)
+
+
+@dataclass
+class Stats:
+    checkouts: int = 0
+    di_seconds: float = 0.0
+    di_calls: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+
+def database_provider(database: Database) -> Provider:
+    class DatabaseProvider(Provider):
+        @provide(scope=Scope.APP)
+        def database(self) -> Database:
+            return database
+
+    return DatabaseProvider()
+
+
+@contextmanager
+def instrument_container(stats: Stats) -> Iterator[None]:
+    """Measure time spent in "container.get" while the block runs"""
+    original_get = AsyncContainer.get
+
+    async def timed_get(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await original_get(self, *args, **kwargs)
+        finally:
+            stats.di_seconds += time.perf_counter() - start
+            stats.di_calls += 1
+
+    AsyncContainer.get = timed_get  # type: ignore[method-assign]
+    try:
+        yield
+    finally:
+        AsyncContainer.get = original_get  # type: ignore[method-assign]
+
+
+async def seed(database: Database, users: int, products: int, reviews_per_product: int) -> None:
+    await database.create()
+    async with database.async_session_factory() as session:
+        session.add_all(UserORM(id=i, username=f'user{i}') for i in range(1, users + 1))
+        session.add_all(
+            ProductORM(id=i, title=f'product{i}', description=f'description{i}')
+            for i in range(1, products + 1)
+        )
+        review_id = 1
+        for product_id in range(1, products + 1):
+            for _ in range(reviews_per_product):
+                session.add(ReviewORM(
+                    id=review_id,
+                    content=f'content{review_id}',
+                    user_id=review_id % users + 1,
+                    product_id=product_id,
+                ))
+                review_id += 1
+        await session.commit()
+
+
+async def run(name: str, provider: Provider, database: Database, args: argparse.Namespace) -> Stats:
+    stats = Stats()
+
+    @event.listens_for(database.engine.sync_engine, 'checkout')
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+
+    container = make_async_container(provider, database_provider(database))
+    app = FastAPI()
+    app.include_router(graphql_app_factory(), prefix='/graphql')
+    setup_dishka(container, app)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as client:
+        payload = {'query': QUERY, 'variables': {'first': args.users}}
+        response = await client.post('/graphql', json=payload)
+        assert 'errors' not in response.json(), response.json()
+        stats.checkouts, stats.di_seconds, stats.di_calls = 0, 0.0, 0
+        with instrument_container(stats):
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                await client.post('/graphql', json=payload)
+                stats.latencies.append(time.perf_counter() - start)
+    await container.close()
+    event.remove(database.engine.sync_engine, 'checkout', count_checkout)
+
+    print(
+        f'{name:<15}'
+        f'{stats.checkouts / args.iterations:>12.1f}'
+        f'{stats.di_calls / args.iterations:>10.1f}'
+        f'{stats.di_seconds / args.iterations * 1000:>12.3f}'
+        f'{statistics.median(stats.latencies) * 1000:>12.2f}'
+    )
+    return stats
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(url=f'sqlite+aiosqlite:///{directory}/benchmark.db')
+        await seed(database, args.users, args.users, reviews_per_product=10)
+        print(f'{"container":<15}{"checkouts":>12}{"gets":>10}{"DI, ms":>12}{"p50, ms":>12}')
+        for name, provider in (
+            ('per-resolve', PerResolveProvider()),
+            ('per-operation', AppContainer()),
+        ):
+            await run(name, provider, database, args)
+        await database.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--users', type=int, default=50, help='users and products on one page')
+    asyncio.run(main(parser.parse_args()))
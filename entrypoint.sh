@@ -19,6 +19,16 @@ start_fastapi_app() {
     exec uvicorn product_service.main:fastapi_app_factory --reload --host 0.0.0.0 --port 8000 --factory
 }
 
+# Function to start the pre-fork production server, the database must be migrated
+start_production_server() {
+    echo "Starting production server..."
+    exec python3 -m product_service serve --host 0.0.0.0 --port 8000
+}
+
+if [ "$SERVER_MODE" = "production" ]; then
+    start_production_server
+fi
+
 # Run the init_db_tables function
 init_db_tables
 
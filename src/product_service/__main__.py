@@ -0,0 +1,154 @@
+"""
+Command line tools of the service, usage:
+    python -m product_service serve --workers 4
+    python -m product_service import users users.csv
+    python -m product_service import reviews reviews.ndjson --chunk-size 50000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.bulk_import import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    TABLES,
+    ImportReport,
+    import_file,
+)
+from product_service.core.db.sqlalchemy.migrations import (
+    SchemaVersionMismatch,
+    check_schema_version,
+)
+from product_service.core.settings import config
+
+
+def print_progress(report: ImportReport) -> None:
+    print(
+        f'\r{report.table}: {report.imported} imported, {report.rejected} rejected, '
+        f'{report.rows_per_second:.0f} rows/s',
+        end='',
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def run_import(args: argparse.Namespace) -> ImportReport:
+    db = Database(url=args.database_url)
+    try:
+        return await import_file(
+            db,
+            args.table,
+            args.path,
+            format=args.format,
+            chunk_size=args.chunk_size,
+            on_progress=None if args.quiet else print_progress,
+        )
+    finally:
+        await db.engine.dispose()
+
+
+async def prepare_database(db: Database, check: bool = True) -> str | None:
+    """
+    Compile the known statements for the engines and check the schema revision.
+    Connections are closed afterwards, workers must not share them with the master
+    """
+    from product_service.gateways.sqlalchemy.statements import precompile_statements
+
+    try:
+        if config.DB_PRECOMPILE_STATEMENTS:
+            for engine in db.engines:
+                precompile_statements(engine)
+        if check:
+            return await check_schema_version(db, config.ALEMBIC_CONFIG)
+        return None
+    finally:
+        for engine in db.engines:
+            await engine.dispose()
+
+
+def serve(args: argparse.Namespace, started: float) -> int:
+    """
+    Import and build the application once, compile its statements
+    and check the schema revision, then fork the workers
+    """
+    import uvicorn
+
+    from product_service.server import PreforkServer, default_workers, logger
+
+    imported = time.perf_counter()
+    from product_service.main import container, fastapi_app_factory
+
+    app = fastapi_app_factory()
+    uvicorn_config = uvicorn.Config(app, host=args.host, port=args.port, lifespan='on')
+    # workers inherit the database with its compiled statements from the container
+    db = asyncio.run(container.get(Database))
+    try:
+        revision = asyncio.run(prepare_database(db, check=not args.skip_schema_check))
+    except SchemaVersionMismatch as e:
+        logger.error(str(e))
+        return 1
+    logger.info(
+        'Application imported and built in %.0f ms',
+        (time.perf_counter() - imported) * 1000,
+    )
+    if revision is not None:
+        logger.info('Database schema is at revision %s', revision)
+    workers = args.workers or config.SERVER_WORKERS or default_workers()
+    metrics_port = None
+    if config.METRICS_ENABLED:
+        metrics_port = args.metrics_port or config.SERVER_METRICS_PORT
+    server = PreforkServer(
+        uvicorn_config, workers, started, config.SERVER_STARTUP_BUDGET, metrics_port,
+    )
+    return server.run()
+
+
+def main(argv: list[str] | None = None) -> int:
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(prog='python -m product_service')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser(
+        'serve',
+        help='production server, workers are forked from a master with the application built',
+    )
+    serve_parser.add_argument('--host', default='0.0.0.0')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--workers', type=int, help='defaults to available cores')
+    serve_parser.add_argument(
+        '--metrics-port',
+        type=int,
+        help='worker N serves its metrics on this port + N, defaults to SERVER_METRICS_PORT',
+    )
+    serve_parser.add_argument(
+        '--skip-schema-check',
+        action='store_true',
+        help='serve even when the database is not at the head revision of the migrations',
+    )
+
+    import_parser = commands.add_parser(
+        'import',
+        help='stream a CSV or NDJSON file into a table, COPY on Postgres',
+    )
+    import_parser.add_argument('table', choices=sorted(TABLES))
+    import_parser.add_argument('path')
+    import_parser.add_argument('--format', choices=sorted(set(FORMATS.values())))
+    import_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    import_parser.add_argument('--database-url', help='defaults to the configured database')
+    import_parser.add_argument('--quiet', action='store_true', help='do not report progress')
+
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        return serve(args, started)
+    report = asyncio.run(run_import(args))
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(json.dumps(report.as_dict(), indent=2))
+    return 0 if report.rejected == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+import json
+import zlib
+from typing import AsyncIterator
+
+import sqlalchemy as sql
+from dishka.integrations.fastapi import FromDishka, inject
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.models import TABLES
+from product_service.core.settings import config
+
+router = APIRouter(tags=['export'])
+
+MEDIA_TYPE = 'application/x-ndjson'
+
+
+def export_statement(
+    table: sql.Table,
+    columns: tuple[str, ...],
+    min_id: int | None = None,
+    max_id: int | None = None,
+) -> sql.Select:
+    """Rows ordered by id, so an interrupted export is resumed with `min_id`"""
+    stmt = sql.select(*(table.c[column] for column in columns)).order_by(table.c.id)
+    if min_id is not None:
+        stmt = stmt.where(table.c.id >= min_id)
+    if max_id is not None:
+        stmt = stmt.where(table.c.id <= max_id)
+    return stmt
+
+
+async def stream_ndjson(
+    db: Database,
+    stmt: sql.Select,
+    gzip: bool = False,
+    batch_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Rows of the statement as JSON lines read with a server-side cursor,
+    one batch of rows is kept in memory at a time. Read from a replica when there is one
+    """
+    batch_size = batch_size or config.EXPORT_BATCH_SIZE
+    compressor = zlib.compressobj(wbits=31) if gzip else None
+    encode = json.JSONEncoder(separators=(',', ':'), default=str).encode
+    async with db.read_engine().connect() as conn:
+        result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+        keys = tuple(result.keys())
+        async for rows in result.partitions():
+            chunk = ''.join(encode(dict(zip(keys, row))) + '\n' for row in rows).encode()
+            if compressor is not None:
+                # every batch is flushed, so clients receive rows while the export goes on
+                chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+@router.get('/{table}')
+@inject
+async def export(
+    table: str,
+    request: Request,
+    db: FromDishka[Database],
+    columns: str | None = None,
+    min_id: int | None = None,
+    max_id: int | None = None,
+) -> StreamingResponse:
+    """
+    Stream the table as NDJSON ordered by id, `columns` is a comma separated list
+    of columns, ids are filtered with inclusive `min_id` and `max_id`.
+    Compressed with gzip when the client accepts it
+    """
+    if table not in TABLES:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, f'Unknown table {table}')
+    _table = TABLES[table]
+    selected = tuple(c.strip() for c in columns.split(',')) if columns else tuple(_table.c.keys())
+    unknown = [column for column in selected if column not in _table.c]
+    if unknown:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, f'Unknown columns of {table}: {", ".join(unknown)}',
+        )
+    gzip = 'gzip' in request.headers.get('accept-encoding', '')
+    return StreamingResponse(
+        stream_ndjson(db, export_statement(_table, selected, min_id, max_id), gzip=gzip),
+        media_type=MEDIA_TYPE,
+        headers={'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'} if gzip else None,
+    )
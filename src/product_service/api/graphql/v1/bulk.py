@@ -0,0 +1,61 @@
+from typing import Callable, Generic, Sequence, TypeVar
+
+import strawberry
+
+from product_service.api.graphql.v1.exceptions import InvalidBulkInputException
+from product_service.core.exceptions import ApplicationException, ObjectDoesNotExistException
+from product_service.core.settings import config
+
+ItemType = TypeVar('ItemType')
+T = TypeVar('T')
+
+
+@strawberry.type
+class BulkError:
+    index: int = strawberry.field(description='Position of the item in the input')
+    code: str
+    message: str
+
+
+@strawberry.type
+class BulkPayload(Generic[ItemType]):
+    items: list[ItemType]
+    errors: list[BulkError]
+
+
+@strawberry.type
+class BulkDeletePayload:
+    deleted_ids: list[strawberry.ID]
+    errors: list[BulkError]
+
+
+def validate_bulk_size(items: Sequence[object]) -> None:
+    if len(items) > config.BULK_MAX_ITEMS:
+        raise InvalidBulkInputException(
+            f'Bulk mutations accept at most {config.BULK_MAX_ITEMS} items, got {len(items)}',
+        )
+
+
+def bulk_error(index: int, error: ApplicationException) -> BulkError:
+    code = 'NOT_FOUND' if isinstance(error, ObjectDoesNotExistException) else 'INVALID'
+    return BulkError(index=index, code=code, message=str(error))
+
+
+def bulk_payload(
+    results: Sequence[T | ApplicationException],
+    convert: Callable[[T], ItemType],
+) -> BulkPayload[ItemType]:
+    """Split results of a bulk gateway method into converted items and per-item errors"""
+    items: list[ItemType] = []
+    errors: list[BulkError] = []
+    for index, result in enumerate(results):
+        if isinstance(result, ApplicationException):
+            errors.append(bulk_error(index, result))
+        else:
+            items.append(convert(result))
+    return BulkPayload(items=items, errors=errors)
+
+
+def bulk_delete_payload(results: Sequence[int | ApplicationException]) -> BulkDeletePayload:
+    payload = bulk_payload(results, lambda id: strawberry.ID(str(id)))
+    return BulkDeletePayload(deleted_ids=payload.items, errors=payload.errors)
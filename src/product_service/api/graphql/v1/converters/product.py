@@ -1,4 +1,4 @@
-from product_service.core.dto import ProductDTO
+from product_service.core.dto import ProductDTO, ProductRow
 from product_service.api.graphql.v1.queries.product import Product
 
 from .review import StrawberryReviewConverter
@@ -8,11 +8,15 @@ class StrawberryProductConverter:
     review_converter: type[StrawberryReviewConverter] = StrawberryReviewConverter
 
     @classmethod
-    def convert(cls, dto: ProductDTO) -> Product:
-        reviews = []
-        data = dto.model_dump()
-        if hasattr(dto, 'reviews'):
-            reviews = [cls.review_converter.convert(p) for p in dto.reviews]
-            data.pop('reviews')
-        product = Product(**data, _reviews=reviews)
+    def convert(cls, dto: ProductRow | ProductDTO) -> Product:
+        reviews = None
+        _reviews = getattr(dto, 'reviews', None)
+        if _reviews is not None:
+            reviews = [cls.review_converter.convert(p) for p in _reviews]
+        product = Product(
+            id=dto.id,  # type: ignore[arg-type]
+            title=dto.title,
+            description=dto.description,
+            _reviews=reviews,
+        )
         return product
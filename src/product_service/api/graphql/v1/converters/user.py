@@ -1,5 +1,5 @@
 from product_service.api.graphql.v1.converters.review import StrawberryReviewConverter
-from product_service.core.dto import UserDTO
+from product_service.core.dto import UserDTO, UserRow
 from product_service.api.graphql.v1.queries.user import User
 
 
@@ -7,11 +7,10 @@ class StrawberryUserConverter:
     review_converter: type[StrawberryReviewConverter] = StrawberryReviewConverter
 
     @classmethod
-    def convert(cls, dto: UserDTO) -> User:
-        reviews = []
-        data = dto.model_dump()
-        if hasattr(dto, 'reviews'):
-            reviews = [cls.review_converter.convert(p) for p in dto.reviews]
-            data.pop('reviews')
-        product = User(**data, _reviews=reviews)
-        return product
+    def convert(cls, dto: UserRow | UserDTO) -> User:
+        reviews = None
+        _reviews = getattr(dto, 'reviews', None)
+        if _reviews is not None:
+            reviews = [cls.review_converter.convert(p) for p in _reviews]
+        user = User(id=dto.id, username=dto.username, _reviews=reviews)  # type: ignore[arg-type]
+        return user
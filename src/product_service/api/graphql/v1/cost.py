@@ -0,0 +1,228 @@
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from graphql import (
+    DocumentNode,
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLNamedType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+    get_nullable_type,
+    get_operation_ast,
+    is_composite_type,
+    is_list_type,
+    value_from_ast,
+)
+from strawberry.extensions import SchemaExtension
+
+from product_service.api.graphql.v1.exceptions import QueryCostException
+from product_service.core.constants import DEFAULT_PAGE_SIZE
+from product_service.core.settings import config
+
+PAGE_SIZE_ARGUMENT = 'first'
+# Fields of connection types resolved from the already loaded page
+CONNECTION_PLUMBING = {'Connection': frozenset(('edges', 'pageInfo')), 'Edge': frozenset(('node',))}
+# Scalar fields of connection types that cost a query
+CONNECTION_QUERIES = {'Connection': frozenset(('totalCount',))}
+
+
+@dataclass(slots=True)
+class OperationCost:
+    """
+    Estimated cost of an operation: every object field costs one per parent it is resolved for,
+    paginated fields multiply the cost of their selections by the requested page size
+    """
+    cost: int = 0
+    depth: int = 0
+    page_size: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {'cost': self.cost, 'depth': self.depth, 'pageSize': self.page_size}
+
+
+def _connection_kind(type_name: str) -> str | None:
+    for kind in ('Connection', 'Edge'):
+        if type_name.endswith(kind):
+            return kind
+    return None
+
+
+class QueryCostAnalyzer:
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        document: DocumentNode,
+        variables: dict[str, Any] | None = None,
+        default_page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> None:
+        self.schema = schema
+        self.variables = variables or {}
+        self.default_page_size = default_page_size
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self.document = document
+
+    def analyze(self, operation_name: str | None = None) -> OperationCost:
+        result = OperationCost()
+        operation = get_operation_ast(self.document, operation_name)
+        if operation is None:
+            return result
+        root_type = self.schema.get_root_type(operation.operation)
+        if root_type is not None:
+            self._visit(root_type, operation.selection_set, 1, 0, result)
+        return result
+
+    def page_size(self, node: FieldNode, field: GraphQLField) -> int | None:
+        """Requested page size of a paginated field, argument default when it is omitted"""
+        argument = field.args.get(PAGE_SIZE_ARGUMENT)
+        if argument is None:
+            return None
+        value = argument.default_value
+        for argument_node in node.arguments:
+            if argument_node.name.value == PAGE_SIZE_ARGUMENT:
+                value = value_from_ast(argument_node.value, argument.type, self.variables)
+        if not isinstance(value, int):
+            return self.default_page_size
+        return max(value, 0)
+
+    def _visit(
+        self,
+        parent_type: GraphQLNamedType,
+        selection_set: SelectionSetNode,
+        multiplier: int,
+        depth: int,
+        result: OperationCost,
+        page_size: int = 1,
+    ) -> None:
+        """`page_size` multiplies the cost of edges when `parent_type` is a connection"""
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                self._visit_field(parent_type, selection, multiplier, depth, result, page_size)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition is not None:
+                    fragment_type = self.schema.get_type(selection.type_condition.name.value)
+                if fragment_type is not None:
+                    self._visit(
+                        fragment_type,
+                        selection.selection_set,
+                        multiplier,
+                        depth,
+                        result,
+                        page_size,
+                    )
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments.get(selection.name.value)
+                if fragment is None:
+                    continue
+                fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                if fragment_type is not None:
+                    self._visit(
+                        fragment_type, fragment.selection_set, multiplier, depth, result, page_size,
+                    )
+
+    def _visit_field(
+        self,
+        parent_type: GraphQLNamedType,
+        node: FieldNode,
+        multiplier: int,
+        depth: int,
+        result: OperationCost,
+        page_size: int,
+    ) -> None:
+        name = node.name.value
+        field = getattr(parent_type, 'fields', {}).get(name)
+        if field is None:
+            return
+        kind = _connection_kind(parent_type.name)
+        if kind is not None and name in CONNECTION_QUERIES.get(kind, ()):
+            result.cost += multiplier
+        field_type = get_named_type(field.type)
+        if node.selection_set is None or not is_composite_type(field_type):
+            return
+        if kind is not None and name in CONNECTION_PLUMBING[kind]:
+            if name == 'edges':
+                multiplier *= page_size
+            self._visit(field_type, node.selection_set, multiplier, depth, result)
+            return
+        depth += 1
+        result.depth = max(result.depth, depth)
+        result.cost += multiplier
+        requested = self.page_size(node, field)
+        if requested is not None:
+            result.page_size = max(result.page_size, requested)
+            self._visit(field_type, node.selection_set, multiplier, depth, result, requested)
+            return
+        if is_list_type(get_nullable_type(field.type)):
+            multiplier *= self.default_page_size
+        self._visit(field_type, node.selection_set, multiplier, depth, result)
+
+
+def check_cost(
+    cost: OperationCost,
+    max_depth: int,
+    max_page_size: int,
+    max_cost: int,
+) -> None:
+    if cost.depth > max_depth:
+        raise QueryCostException(
+            f'Query depth {cost.depth} exceeds maximum depth {max_depth}', 'QUERY_TOO_DEEP',
+        )
+    if cost.page_size > max_page_size:
+        raise QueryCostException(
+            f'Page size {cost.page_size} exceeds maximum page size {max_page_size}',
+            'PAGE_SIZE_TOO_LARGE',
+        )
+    if cost.cost > max_cost:
+        raise QueryCostException(
+            f'Query cost {cost.cost} exceeds maximum cost {max_cost}', 'QUERY_TOO_COMPLEX',
+        )
+
+
+class QueryCostLimiter(SchemaExtension):
+    """
+    Reject operations that are too deep, request too large pages or cost too much
+    before they are executed, the estimated cost is reported in "extensions" of the response
+    """
+    max_depth = config.QUERY_MAX_DEPTH
+    max_page_size = config.QUERY_MAX_PAGE_SIZE
+    max_cost = config.QUERY_MAX_COST
+    cost: OperationCost | None = None
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if execution_context.graphql_document is not None:
+            self.cost = QueryCostAnalyzer(
+                execution_context.schema._schema,
+                execution_context.graphql_document,
+                execution_context.variables,
+            ).analyze(execution_context.operation_name)
+            try:
+                check_cost(self.cost, self.max_depth, self.max_page_size, self.max_cost)
+            except QueryCostException as e:
+                execution_context.result = GraphQLExecutionResult(
+                    data=None, errors=[GraphQLError(e.message, extensions={'code': e.code})],
+                )
+        yield
+
+    def get_results(self) -> dict[str, Any]:
+        if self.cost is None:
+            return {}
+        return {
+            'cost': {
+                **self.cost.as_dict(),
+                'maxDepth': self.max_depth,
+                'maxPageSize': self.max_page_size,
+                'maxCost': self.max_cost,
+            },
+        }
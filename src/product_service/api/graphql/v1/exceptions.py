@@ -1,2 +1,35 @@
+from dataclasses import dataclass
+
+
 class IDNotProvidedException(Exception):
     ...
+
+
+class InvalidPaginationArgumentsException(Exception):
+    ...
+
+
+class InvalidSearchQueryException(Exception):
+    ...
+
+
+@dataclass(eq=False)
+class PersistedQueryException(Exception):
+    message: str
+    code: str
+
+    def __str__(self) -> str:
+        return self.message
+
+
+@dataclass(eq=False)
+class QueryCostException(Exception):
+    message: str
+    code: str
+
+    def __str__(self) -> str:
+        return self.message
+
+
+class InvalidBulkInputException(Exception):
+    ...
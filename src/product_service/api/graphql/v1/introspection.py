@@ -0,0 +1,131 @@
+import json
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterator
+
+from graphql import (
+    DocumentNode,
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    OperationType,
+)
+from graphql.utilities import get_operation_ast
+from strawberry import Schema
+from strawberry.extensions import SchemaExtension
+
+INTROSPECTION_FIELDS = frozenset({'__schema', '__type', '__typename'})
+INTROSPECTION_CACHE_SIZE = 64
+
+
+def is_introspection(document: DocumentNode, operation_name: str | None = None) -> bool:
+    """Query operation selecting only introspection fields"""
+    operation = get_operation_ast(document, operation_name)
+    if operation is None or operation.operation is not OperationType.QUERY:
+        return False
+    return all(
+        isinstance(selection, FieldNode) and selection.name.value in INTROSPECTION_FIELDS
+        for selection in operation.selection_set.selections
+    )
+
+
+@dataclass(eq=False, slots=True)
+class IntrospectionResult:
+    document: DocumentNode
+    data: dict[str, Any]
+
+
+class IntrospectionResults:
+    """Results of introspection operations of one schema, by query text and variables"""
+    def __init__(self, maxsize: int = INTROSPECTION_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._results: OrderedDict[Hashable, IntrospectionResult] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    @staticmethod
+    def key(
+        query: str,
+        operation_name: str | None,
+        variables: dict[str, Any] | None,
+    ) -> Hashable:
+        return query, operation_name, json.dumps(variables or {}, sort_keys=True, default=str)
+
+    def get(self, key: Hashable) -> IntrospectionResult | None:
+        result = self._results.get(key)
+        if result is None:
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def set(self, key: Hashable, result: IntrospectionResult) -> None:
+        self.misses += 1
+        self._results[key] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+
+    def metrics(self) -> dict[str, int]:
+        return {'size': len(self), 'hits': self.hits, 'misses': self.misses}
+
+
+class IntrospectionCache(SchemaExtension):
+    """
+    Skip parsing, validation and execution of introspection operations executed before,
+    the schema does not change while the process runs so neither do their results
+    """
+    results: 'weakref.WeakKeyDictionary[Schema, IntrospectionResults]' = (
+        weakref.WeakKeyDictionary()
+    )
+    key: Hashable | None = None
+    cached: IntrospectionResult | None = None
+
+    @classmethod
+    def results_of(cls, schema: Schema) -> IntrospectionResults:
+        results = cls.results.get(schema)
+        if results is None:
+            results = cls.results[schema] = IntrospectionResults()
+        return results
+
+    def on_parse(self) -> Iterator[None]:
+        # operation name of the request, strawberry takes it from the document once parsed
+        execution_context = self.execution_context
+        if execution_context.query:
+            self.key = IntrospectionResults.key(
+                execution_context.query,
+                execution_context.operation_name,
+                execution_context.variables,
+            )
+            self.cached = self.results_of(execution_context.schema).get(self.key)
+        if self.cached is not None:
+            execution_context.graphql_document = self.cached.document
+        yield
+
+    def on_validate(self) -> Iterator[None]:
+        if self.cached is not None:
+            self.execution_context.errors = []
+        yield
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if self.cached is not None:
+            execution_context.result = GraphQLExecutionResult(data=self.cached.data)
+            yield
+            return
+        document = execution_context.graphql_document
+        if (
+            self.key is None
+            or document is None
+            or not is_introspection(document, execution_context.operation_name)
+        ):
+            yield
+            return
+        yield
+        result = execution_context.result
+        if result is not None and not result.errors and result.data:
+            self.results_of(execution_context.schema).set(
+                self.key, IntrospectionResult(document=document, data=result.data),
+            )
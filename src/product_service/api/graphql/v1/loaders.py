@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable, Sequence
+
+import strawberry
+from dishka import AsyncContainer
+from strawberry.dataloader import DataLoader
+from strawberry.types.nodes import Selection
+
+from product_service.api.graphql.v1.utils import (
+    derive_from_selections,
+    get_container,
+    operation_state,
+    selection_signature,
+)
+from product_service.core.constants import DEFAULT_PAGE_SIZE
+
+if TYPE_CHECKING:
+    from product_service.api.graphql.v1.queries.product import Product
+    from product_service.api.graphql.v1.queries.review import Review
+    from product_service.api.graphql.v1.queries.user import User
+
+
+@dataclass(eq=False, repr=False)
+class Loaders:
+    """
+    Per-operation registry of batch loaders
+
+    Every key requested during one event loop tick is collected by the loader
+    and resolved with a single query, repeated keys are deduplicated.
+    Loaders are separated by the shape of the requested fields,
+    so rows fetched for one selection are never reused for another
+    """
+    container: AsyncContainer
+    _loaders: dict[Hashable, DataLoader] = field(default_factory=dict)
+
+    def _get_or_create(
+        self,
+        name: str,
+        fields: list[Selection],
+        load_fn: Callable[[list[Selection]], Callable[[list[Any]], Awaitable[Sequence[Any]]]],
+    ) -> DataLoader:
+        signature = derive_from_selections(
+            fields, 'signature', lambda: selection_signature(fields),
+        )
+        key = (name, signature)
+        loader = self._loaders.get(key)
+        if loader is None:
+            loader = DataLoader(load_fn=load_fn(fields))
+            self._loaders[key] = loader
+        return loader
+
+    def product_by_id(self, fields: list[Selection]) -> DataLoader[strawberry.ID, 'Product | None']:
+        from product_service.api.graphql.v1.resolvers.product import StrawberryProductResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(ids: list[strawberry.ID]) -> list['Product | None']:
+                resolver = await self.container.get(StrawberryProductResolver)
+                return await resolver.get_many(ids=ids, fields=fields)
+            return load
+
+        return self._get_or_create('product_by_id', fields, load_fn)
+
+    def product_by_review_id(
+        self,
+        fields: list[Selection],
+    ) -> DataLoader[strawberry.ID, 'Product | None']:
+        from product_service.api.graphql.v1.resolvers.product import StrawberryProductResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(review_ids: list[strawberry.ID]) -> list['Product | None']:
+                resolver = await self.container.get(StrawberryProductResolver)
+                return await resolver.get_many_by_review_ids(review_ids=review_ids, fields=fields)
+            return load
+
+        return self._get_or_create('product_by_review_id', fields, load_fn)
+
+    def user_by_id(self, fields: list[Selection]) -> DataLoader[strawberry.ID, 'User | None']:
+        from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(ids: list[strawberry.ID]) -> list['User | None']:
+                resolver = await self.container.get(StrawberryUserResolver)
+                return await resolver.get_many(ids=ids, fields=fields)
+            return load
+
+        return self._get_or_create('user_by_id', fields, load_fn)
+
+    def user_by_review_id(self, fields: list[Selection]) -> DataLoader[strawberry.ID, 'User | None']:
+        from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(review_ids: list[strawberry.ID]) -> list['User | None']:
+                resolver = await self.container.get(StrawberryUserResolver)
+                return await resolver.get_many_by_review_ids(review_ids=review_ids, fields=fields)
+            return load
+
+        return self._get_or_create('user_by_review_id', fields, load_fn)
+
+    def reviews_by_product_id(
+        self,
+        fields: list[Selection],
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: int | None = None,
+    ) -> DataLoader[strawberry.ID, list['Review']]:
+        from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(product_ids: list[strawberry.ID]) -> list[list['Review']]:
+                resolver = await self.container.get(StrawberryReviewResolver)
+                return await resolver.get_many_by_product_ids(
+                    product_ids=product_ids, fields=fields, limit=limit, after=after,
+                )
+            return load
+
+        return self._get_or_create('reviews_by_product_id', fields, load_fn)
+
+    def review_count_by_product_id(self) -> DataLoader[strawberry.ID, int]:
+        from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(product_ids: list[strawberry.ID]) -> list[int]:
+                resolver = await self.container.get(StrawberryReviewResolver)
+                return await resolver.count_many_by_product_ids(product_ids=product_ids)
+            return load
+
+        return self._get_or_create('review_count_by_product_id', [], load_fn)
+
+    def reviews_by_user_id(
+        self,
+        fields: list[Selection],
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: int | None = None,
+    ) -> DataLoader[strawberry.ID, list['Review']]:
+        from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(user_ids: list[strawberry.ID]) -> list[list['Review']]:
+                resolver = await self.container.get(StrawberryReviewResolver)
+                return await resolver.get_many_by_user_ids(
+                    user_ids=user_ids, fields=fields, limit=limit, after=after,
+                )
+            return load
+
+        return self._get_or_create('reviews_by_user_id', fields, load_fn)
+
+    def review_count_by_user_id(self) -> DataLoader[strawberry.ID, int]:
+        from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
+
+        def load_fn(fields: list[Selection]):
+            async def load(user_ids: list[strawberry.ID]) -> list[int]:
+                resolver = await self.container.get(StrawberryReviewResolver)
+                return await resolver.count_many_by_user_ids(user_ids=user_ids)
+            return load
+
+        return self._get_or_create('review_count_by_user_id', [], load_fn)
+
+
+def get_loaders(info: strawberry.Info) -> Loaders:
+    """Return batch loaders of the current operation, create them on first use"""
+    state = operation_state.get()
+    if state is None:
+        state = info.context
+    loaders = state.get('loaders')
+    if loaders is None:
+        loaders = Loaders(container=get_container(info))
+        state['loaders'] = loaders
+    return loaders
@@ -0,0 +1,149 @@
+import hashlib
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from inspect import isawaitable
+from typing import Any, Awaitable, Callable, Iterator
+
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from product_service.api.graphql.v1.response_cache import normalize_query
+from product_service.api.graphql.v1.tracing import has_resolver
+from product_service.core.metrics import (
+    Counter,
+    Histogram,
+    HistogramChild,
+    OperationStats,
+    current_operation_stats,
+    registry,
+)
+
+# Operations over the limit are counted as "other", every fingerprint is a label value
+MAX_OPERATIONS = 500
+OTHER_OPERATION = 'other'
+
+# Fingerprint of the operation being executed. Strawberry calls `resolve` of the extension
+# instances of the first operation of the schema, so resolvers cannot read `self.operation`
+current_fingerprint: ContextVar[str] = ContextVar('current_fingerprint', default=OTHER_OPERATION)
+
+OPERATION_DURATION = registry.register(Histogram(
+    'graphql_operation_duration_seconds',
+    'Duration of GraphQL operations',
+    ('operation',),
+))
+RESOLVER_DURATION = registry.register(Histogram(
+    'graphql_resolver_duration_seconds',
+    'Duration of GraphQL field resolvers',
+    ('operation', 'field'),
+))
+OPERATION_SQL_STATEMENTS = registry.register(Histogram(
+    'graphql_operation_sql_statements',
+    'SQL statements executed by one GraphQL operation',
+    ('operation',),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+))
+OPERATION_SQL_ROWS = registry.register(Histogram(
+    'graphql_operation_sql_rows',
+    'Rows fetched or changed by one GraphQL operation',
+    ('operation',),
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000),
+))
+ERRORS = registry.register(Counter(
+    'graphql_errors',
+    'Errors of GraphQL operations by exception type',
+    ('operation', 'type'),
+))
+
+
+@lru_cache(maxsize=1024)
+def operation_fingerprint(query: str, operation_name: str | None) -> str:
+    """Operation name with a hash of the normalized query text"""
+    digest = hashlib.sha256(normalize_query(query).encode()).hexdigest()[:12]
+    return f'{operation_name or "anonymous"}:{digest}'
+
+
+class MetricsExtension(SchemaExtension):
+    """
+    Record latency of operations and field resolvers, SQL volume and errors by operation
+    fingerprint. Label children are created once per fingerprint and field,
+    so recording is a few dictionary lookups per operation and resolved field
+    """
+    operations: set[str] = set()
+    # (operation, parent type, field) -> histogram child, None for fields without resolvers
+    _resolver_children: dict[tuple[str, str, str], HistogramChild | None] = {}
+    operation = OTHER_OPERATION
+
+    def on_operation(self) -> Iterator[None]:
+        stats = OperationStats()
+        token = current_operation_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            current_operation_stats.reset(token)
+        operation = self.operation
+        OPERATION_DURATION.labels(operation).observe(duration)
+        OPERATION_SQL_STATEMENTS.labels(operation).observe(stats.statements)
+        OPERATION_SQL_ROWS.labels(operation).observe(stats.rows)
+        result = self.execution_context.result
+        for error in (result.errors or ()) if result is not None else ():
+            error_type = type(error.original_error or error).__name__
+            ERRORS.labels(operation, error_type).inc()
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        operation = OTHER_OPERATION
+        if execution_context.query is not None:
+            operation = operation_fingerprint(
+                execution_context.query, execution_context.operation_name,
+            )
+            if operation not in self.operations:
+                if len(self.operations) < MAX_OPERATIONS:
+                    self.operations.add(operation)
+                else:
+                    operation = OTHER_OPERATION
+        self.operation = operation
+        token = current_fingerprint.set(operation)
+        try:
+            yield
+        finally:
+            try:
+                current_fingerprint.reset(token)
+            except ValueError:
+                # closed from another context after a failed hook, the one that set it is gone
+                pass
+
+    def resolve(
+        self,
+        _next: Callable[..., Any],
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        operation = current_fingerprint.get()
+        key = (operation, info.parent_type.name, info.field_name)
+        try:
+            child = self._resolver_children[key]
+        except KeyError:
+            child = None
+            if has_resolver(info):
+                child = RESOLVER_DURATION.labels(operation, f'{key[1]}.{key[2]}')
+            self._resolver_children[key] = child
+        if child is None:
+            return _next(root, info, *args, **kwargs)
+        start = time.perf_counter()
+        result = _next(root, info, *args, **kwargs)
+        if isawaitable(result):
+            return self._observe(result, child, start)
+        child.observe(time.perf_counter() - start)
+        return result
+
+    @staticmethod
+    async def _observe(result: Awaitable[Any], child: HistogramChild, start: float) -> Any:
+        try:
+            return await result
+        finally:
+            child.observe(time.perf_counter() - start)
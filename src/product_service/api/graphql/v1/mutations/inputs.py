@@ -33,3 +33,22 @@ class UserInput:
 @strawberry.input
 class UpdateUserInput:
     username: str
+
+
+@strawberry.input
+class UpdateReviewItemInput:
+    id: strawberry.ID
+    content: str
+
+
+@strawberry.input
+class UpdateProductItemInput:
+    id: strawberry.ID
+    title: str = ''
+    description: str = ''
+
+
+@strawberry.input
+class UpdateUserItemInput:
+    id: strawberry.ID
+    username: str
@@ -1,10 +1,15 @@
 import strawberry
 
+from product_service.api.graphql.v1.bulk import BulkDeletePayload, BulkPayload
 from product_service.api.graphql.v1.interfaces import IDeleted, IProduct, IUpdated
 from product_service.api.graphql.v1.mutations.inputs import (ProductInput,
-                                                 UpdateProductInput)
+                                                 UpdateProductInput,
+                                                 UpdateProductItemInput)
+from product_service.api.graphql.v1.queries.product import Product
+from product_service.api.graphql.v1.response_cache import response_cache
 from product_service.api.graphql.v1.resolvers.product import StrawberryProductResolver
 from product_service.api.graphql.v1.utils import get_container
+from product_service.core.dto import Entity
 from product_service.core.exceptions import ObjectDoesNotExistException
 
 
@@ -15,6 +20,7 @@ class ProductMutations:
         container = get_container(info)
         resolver = await container.get(StrawberryProductResolver)
         new_product = await resolver.create(input=input)
+        response_cache.invalidate(Entity.PRODUCT)
         return new_product
 
     @strawberry.mutation
@@ -24,6 +30,7 @@ class ProductMutations:
         container = get_container(info)
         resolver = await container.get(StrawberryProductResolver)
         updated_product = await resolver.update(input=input, id=id)
+        response_cache.invalidate_ids(Entity.PRODUCT, [id])
         if updated_product is None:
             return IUpdated(message='Product not found', success=False)
         return IUpdated(success=True, message='OK')
@@ -35,6 +42,37 @@ class ProductMutations:
         response = IDeleted(success=True)
         try:
             await resolver.delete(id=id)
+            response_cache.invalidate(Entity.PRODUCT, Entity.REVIEW)
         except ObjectDoesNotExistException:
             response.success = False
         return response
+
+    @strawberry.mutation
+    async def create_products(
+        self, input: list[ProductInput], info: strawberry.Info,
+    ) -> BulkPayload[Product]:
+        container = get_container(info)
+        resolver = await container.get(StrawberryProductResolver)
+        payload = await resolver.create_many(input=input)
+        response_cache.invalidate(Entity.PRODUCT)
+        return payload
+
+    @strawberry.mutation
+    async def update_products(
+        self, input: list[UpdateProductItemInput], info: strawberry.Info,
+    ) -> BulkPayload[Product]:
+        container = get_container(info)
+        resolver = await container.get(StrawberryProductResolver)
+        payload = await resolver.update_many(input=input)
+        response_cache.invalidate_ids(Entity.PRODUCT, [i.id for i in input])
+        return payload
+
+    @strawberry.mutation
+    async def delete_products(
+        self, ids: list[strawberry.ID], info: strawberry.Info,
+    ) -> BulkDeletePayload:
+        container = get_container(info)
+        resolver = await container.get(StrawberryProductResolver)
+        payload = await resolver.delete_many(ids=ids)
+        response_cache.invalidate(Entity.PRODUCT, Entity.REVIEW)
+        return payload
@@ -1,9 +1,17 @@
 import strawberry
 
+from product_service.api.graphql.v1.bulk import BulkDeletePayload, BulkPayload
 from product_service.api.graphql.v1.interfaces import IDeleted, IReview, IUpdated
-from product_service.api.graphql.v1.mutations.inputs import ReviewInput, UpdateReviewInput
+from product_service.api.graphql.v1.mutations.inputs import (
+    ReviewInput,
+    UpdateReviewInput,
+    UpdateReviewItemInput,
+)
+from product_service.api.graphql.v1.queries.review import Review
+from product_service.api.graphql.v1.response_cache import response_cache
 from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
 from product_service.api.graphql.v1.utils import get_container
+from product_service.core.dto import Entity
 from product_service.core.exceptions import ObjectDoesNotExistException
 
 
@@ -14,6 +22,7 @@ class ReviewMutations:
         container = get_container(info)
         resolver: StrawberryReviewResolver = await container.get(StrawberryReviewResolver)
         new_review = await resolver.create(input=input)
+        response_cache.invalidate(Entity.REVIEW)
         return new_review
 
     @strawberry.mutation
@@ -23,6 +32,7 @@ class ReviewMutations:
         container = get_container(info)
         resolver: StrawberryReviewResolver = await container.get(StrawberryReviewResolver)
         updated_review = await resolver.update(input=input, id=id)
+        response_cache.invalidate_ids(Entity.REVIEW, [id])
         if updated_review is None:
             return IUpdated(success=False, message='Review not found')
         return IUpdated(success=True, message='OK')
@@ -34,6 +44,37 @@ class ReviewMutations:
         response = IDeleted(success=True)
         try:
             await resolver.delete(id=id)
+            response_cache.invalidate(Entity.REVIEW)
         except ObjectDoesNotExistException:
             response.success = False
         return response
+
+    @strawberry.mutation
+    async def create_reviews(
+        self, input: list[ReviewInput], info: strawberry.Info,
+    ) -> BulkPayload[Review]:
+        container = get_container(info)
+        resolver: StrawberryReviewResolver = await container.get(StrawberryReviewResolver)
+        payload = await resolver.create_many(input=input)
+        response_cache.invalidate(Entity.REVIEW)
+        return payload
+
+    @strawberry.mutation
+    async def update_reviews(
+        self, input: list[UpdateReviewItemInput], info: strawberry.Info,
+    ) -> BulkPayload[Review]:
+        container = get_container(info)
+        resolver: StrawberryReviewResolver = await container.get(StrawberryReviewResolver)
+        payload = await resolver.update_many(input=input)
+        response_cache.invalidate_ids(Entity.REVIEW, [i.id for i in input])
+        return payload
+
+    @strawberry.mutation
+    async def delete_reviews(
+        self, ids: list[strawberry.ID], info: strawberry.Info,
+    ) -> BulkDeletePayload:
+        container = get_container(info)
+        resolver: StrawberryReviewResolver = await container.get(StrawberryReviewResolver)
+        payload = await resolver.delete_many(ids=ids)
+        response_cache.invalidate(Entity.REVIEW)
+        return payload
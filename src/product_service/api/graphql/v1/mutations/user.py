@@ -1,10 +1,18 @@
 import strawberry
 
+from product_service.api.graphql.v1.bulk import BulkDeletePayload, BulkPayload
 from product_service.api.graphql.v1.interfaces import IDeleted, IUser
+from product_service.core.dto import Entity
 from product_service.core.exceptions import ObjectDoesNotExistException
 from product_service.api.graphql.v1.utils import get_container
+from product_service.api.graphql.v1.response_cache import response_cache
 from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver
-from product_service.api.graphql.v1.mutations.inputs import UpdateUserInput, UserInput
+from product_service.api.graphql.v1.mutations.inputs import (
+    UpdateUserInput,
+    UpdateUserItemInput,
+    UserInput,
+)
+from product_service.api.graphql.v1.queries.user import User
 
 
 @strawberry.type
@@ -14,6 +22,7 @@ class UserMutations:
         container = get_container(info)
         resolver: StrawberryUserResolver = await container.get(StrawberryUserResolver)
         new_user = await resolver.create(input=input)
+        response_cache.invalidate(Entity.USER)
         return new_user
 
     @strawberry.mutation
@@ -23,6 +32,7 @@ class UserMutations:
         container = get_container(info)
         resolver: StrawberryUserResolver = await container.get(StrawberryUserResolver)
         updated_user = await resolver.update(input=input, id=id)
+        response_cache.invalidate_ids(Entity.USER, [id])
         return updated_user
 
     @strawberry.mutation
@@ -32,6 +42,37 @@ class UserMutations:
         response = IDeleted(success=True)
         try:
             await resolver.delete(id=id)
+            response_cache.invalidate(Entity.USER, Entity.REVIEW)
         except ObjectDoesNotExistException:
             response.success = False
         return response
+
+    @strawberry.mutation
+    async def register_users(
+        self, input: list[UserInput], info: strawberry.Info,
+    ) -> BulkPayload[User]:
+        container = get_container(info)
+        resolver: StrawberryUserResolver = await container.get(StrawberryUserResolver)
+        payload = await resolver.create_many(input=input)
+        response_cache.invalidate(Entity.USER)
+        return payload
+
+    @strawberry.mutation
+    async def update_users(
+        self, input: list[UpdateUserItemInput], info: strawberry.Info,
+    ) -> BulkPayload[User]:
+        container = get_container(info)
+        resolver: StrawberryUserResolver = await container.get(StrawberryUserResolver)
+        payload = await resolver.update_many(input=input)
+        response_cache.invalidate_ids(Entity.USER, [i.id for i in input])
+        return payload
+
+    @strawberry.mutation
+    async def delete_users(
+        self, ids: list[strawberry.ID], info: strawberry.Info,
+    ) -> BulkDeletePayload:
+        container = get_container(info)
+        resolver: StrawberryUserResolver = await container.get(StrawberryUserResolver)
+        payload = await resolver.delete_many(ids=ids)
+        response_cache.invalidate(Entity.USER, Entity.REVIEW)
+        return payload
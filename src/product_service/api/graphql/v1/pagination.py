@@ -0,0 +1,135 @@
+import base64
+import binascii
+import math
+from typing import Any, Awaitable, Callable, Generic, Mapping, Sequence, TypeVar
+
+import strawberry
+
+from product_service.api.graphql.v1.exceptions import (
+    InvalidPaginationArgumentsException,
+    InvalidSearchQueryException,
+)
+from product_service.core.constants import DEFAULT_PAGE_SIZE
+from product_service.core.settings import config
+
+NodeType = TypeVar('NodeType')
+
+CURSOR_PREFIX = 'cursor:'
+CONNECTION_FIELDS = frozenset(('edges', 'pageInfo', 'totalCount'))
+
+
+def encode_cursor(id: int, rank: float | None = None) -> str:
+    value = f'{CURSOR_PREFIX}{id}' if rank is None else f'{CURSOR_PREFIX}{id}:{rank!r}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def _decode(cursor: str) -> tuple[int, float | None]:
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise InvalidPaginationArgumentsException(f'Invalid cursor: {cursor}')
+    id, _, rank = value.removeprefix(CURSOR_PREFIX).partition(':')
+    if not value.startswith(CURSOR_PREFIX) or not id.isdigit():
+        raise InvalidPaginationArgumentsException(f'Invalid cursor: {cursor}')
+    if not rank:
+        return int(id), None
+    try:
+        ranked = float(rank)
+    except ValueError:
+        raise InvalidPaginationArgumentsException(f'Invalid cursor: {cursor}')
+    if not math.isfinite(ranked):
+        raise InvalidPaginationArgumentsException(f'Invalid cursor: {cursor}')
+    return int(id), ranked
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    """Return id of the last seen row, cursors are opaque for clients"""
+    if cursor is None:
+        return None
+    return _decode(cursor)[0]
+
+
+def decode_ranked_cursor(cursor: str | None) -> tuple[float, int] | None:
+    """Return rank and id of the last seen row of search results"""
+    if cursor is None:
+        return None
+    id, rank = _decode(cursor)
+    if rank is None:
+        raise InvalidPaginationArgumentsException(f'Invalid cursor: {cursor}')
+    return rank, id
+
+
+def validate_first(first: int) -> int:
+    if first < 0:
+        raise InvalidPaginationArgumentsException('"first" must be a non-negative number')
+    return first
+
+
+def validate_search_query(query: str) -> str:
+    if len(query) > config.SEARCH_MAX_QUERY_LENGTH:
+        raise InvalidSearchQueryException(
+            f'"query" must be at most {config.SEARCH_MAX_QUERY_LENGTH} characters',
+        )
+    return query
+
+
+def page_arguments(arguments: dict[str, Any]) -> dict[str, Any]:
+    """Convert raw "first" and "after" arguments of a connection field to a limit and an id"""
+    return {
+        'first': validate_first(int(arguments.get('first', DEFAULT_PAGE_SIZE))),
+        'after': decode_cursor(arguments.get('after', None)),
+    }
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    has_previous_page: bool
+    start_cursor: str | None
+    end_cursor: str | None
+
+
+@strawberry.type
+class Edge(Generic[NodeType]):
+    cursor: str
+    node: NodeType
+
+
+@strawberry.type
+class Connection(Generic[NodeType]):
+    edges: list[Edge[NodeType]]
+    page_info: PageInfo
+    _count: strawberry.Private[Callable[[], Awaitable[int]] | None] = None
+
+    @strawberry.field(description='Total number of nodes, costs an additional query')
+    async def total_count(self) -> int | None:
+        if self._count is None:
+            return None
+        return await self._count()
+
+    @classmethod
+    def from_nodes(
+        cls,
+        nodes: Sequence[NodeType],
+        first: int,
+        after: int | tuple[float, int] | None = None,
+        count: Callable[[], Awaitable[int]] | None = None,
+        ranks: Mapping[int, float] | None = None,
+    ) -> 'Connection[NodeType]':
+        """
+        Build connection from the page of nodes ordered by id, or by rank when
+        `ranks` of nodes by id are given, `nodes` are expected to contain
+        one extra node when the next page exists
+        """
+        edges = []
+        for node in nodes[:first]:
+            id = int(node.id)  # type: ignore[attr-defined]
+            rank = ranks[id] if ranks is not None else None
+            edges.append(Edge(cursor=encode_cursor(id, rank), node=node))
+        page_info = PageInfo(
+            has_next_page=len(nodes) > first,
+            has_previous_page=after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        )
+        return cls(edges=edges, page_info=page_info, _count=count)
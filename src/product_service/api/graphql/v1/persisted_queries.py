@@ -0,0 +1,199 @@
+import hashlib
+import json
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Hashable, Iterator
+
+from graphql import DocumentNode, GraphQLError
+from strawberry.extensions import SchemaExtension
+from strawberry.fastapi import GraphQLRouter
+from strawberry.http import GraphQLRequestData
+from strawberry.http.async_base_view import AsyncHTTPRequestAdapter
+from strawberry.http.base import BaseRequestProtocol
+from strawberry.types import ExecutionResult
+
+from product_service.api.graphql.v1.exceptions import PersistedQueryException
+
+SELECTIONS_CACHE_SIZE = 256
+
+current_operation: ContextVar['PersistedOperation | None'] = ContextVar(
+    'current_operation', default=None,
+)
+
+
+def sha256_hash(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+@dataclass(eq=False, repr=False)
+class PersistedOperation:
+    """
+    Registered operation together with everything derived from its text:
+    parsed document, validation result and selections of every field
+    """
+    query: str
+    sha256: str
+    document: DocumentNode | None = None
+    validation_errors: list[GraphQLError] | None = None
+    selections: dict[Hashable, Any] = field(default_factory=dict)
+    projections: dict[Hashable, Any] = field(default_factory=dict)
+
+    def remember(self, cache: dict[Hashable, Any], key: Hashable, value: Any) -> Any:
+        """Store derived value, cache is reset once it grows over the limit"""
+        if len(cache) >= SELECTIONS_CACHE_SIZE:
+            cache.clear()
+        cache[key] = value
+        return value
+
+
+class PersistedQueryStore:
+    """
+    Registry of persisted operations by sha256 hash of the query.
+    Operations from the allowlist are kept forever, operations registered
+    by clients (Automatic Persisted Queries) are evicted in LRU order.
+    In strict mode only allowlisted operations can be executed
+    """
+    def __init__(
+        self,
+        allowlist: dict[str, str] | None = None,
+        strict: bool = False,
+        maxsize: int = 1000,
+    ) -> None:
+        self.strict = strict
+        self.maxsize = maxsize
+        self._allowlist: dict[str, PersistedOperation] = {}
+        self._registered: OrderedDict[str, PersistedOperation] = OrderedDict()
+        for sha256, query in (allowlist or {}).items():
+            if sha256_hash(query) != sha256:
+                raise ValueError(f'Hash of the allowlisted query does not match: {sha256}')
+            self._allowlist[sha256] = PersistedOperation(query=query, sha256=sha256)
+
+    @classmethod
+    def from_file(cls, path: str | Path, strict: bool = False, maxsize: int = 1000):
+        """
+        Load allowlist from JSON file, supported formats are mapping of hashes to queries
+        and Apollo persisted query manifest
+        """
+        data = json.loads(Path(path).read_text())
+        if isinstance(data, dict) and 'operations' in data:
+            allowlist = {sha256_hash(op['body']): op['body'] for op in data['operations']}
+        elif isinstance(data, dict):
+            allowlist = data
+        else:
+            raise ValueError(f'Unsupported persisted queries file format: {path}')
+        return cls(allowlist=allowlist, strict=strict, maxsize=maxsize)
+
+    def __len__(self) -> int:
+        return len(self._allowlist) + len(self._registered)
+
+    def get(self, sha256: str) -> PersistedOperation | None:
+        operation = self._allowlist.get(sha256)
+        if operation is not None:
+            return operation
+        operation = self._registered.get(sha256)
+        if operation is not None:
+            self._registered.move_to_end(sha256)
+        return operation
+
+    def register(self, sha256: str, query: str) -> PersistedOperation:
+        if sha256_hash(query) != sha256:
+            raise PersistedQueryException('provided sha does not match query', 'BAD_USER_INPUT')
+        if self.strict:
+            raise PersistedQueryException('PersistedQueryNotAllowed', 'PERSISTED_QUERY_NOT_ALLOWED')
+        operation = PersistedOperation(query=query, sha256=sha256)
+        self._registered[sha256] = operation
+        if len(self._registered) > self.maxsize:
+            self._registered.popitem(last=False)
+        return operation
+
+    def resolve(
+        self,
+        query: str | None,
+        extensions: dict[str, Any] | None = None,
+    ) -> PersistedOperation | None:
+        """
+        Find operation of the request following APQ protocol:
+        hash without query is looked up, hash with query registers the query
+        """
+        persisted = (extensions or {}).get('persistedQuery')
+        if persisted is not None:
+            if persisted.get('version') != 1:
+                raise PersistedQueryException(
+                    'Unsupported persisted query version', 'PERSISTED_QUERY_NOT_SUPPORTED',
+                )
+            sha256 = persisted.get('sha256Hash', '')
+            operation = self.get(sha256)
+            if operation is not None:
+                return operation
+            if query is None:
+                raise PersistedQueryException('PersistedQueryNotFound', 'PERSISTED_QUERY_NOT_FOUND')
+            return self.register(sha256, query)
+        if query is None or not (self._allowlist or self.strict):
+            return None
+        operation = self.get(sha256_hash(query))
+        if operation is None and self.strict:
+            raise PersistedQueryException('PersistedQueryNotAllowed', 'PERSISTED_QUERY_NOT_ALLOWED')
+        return operation
+
+
+class PersistedQueryCache(SchemaExtension):
+    """Skip parsing and validation of persisted operations executed before"""
+
+    def on_parse(self) -> Iterator[None]:
+        operation = current_operation.get()
+        if operation is not None and operation.document is not None:
+            self.execution_context.graphql_document = operation.document
+        yield
+        if operation is not None and operation.document is None:
+            operation.document = self.execution_context.graphql_document
+
+    def on_validate(self) -> Iterator[None]:
+        operation = current_operation.get()
+        if operation is not None and operation.validation_errors is not None:
+            self.execution_context.errors = list(operation.validation_errors)
+        yield
+        errors = self.execution_context.errors
+        if operation is not None and operation.validation_errors is None and errors is not None:
+            operation.validation_errors = list(errors)
+
+
+class PersistedQueryRouter(GraphQLRouter):
+    """GraphQL router that accepts persisted query hashes in "extensions" of the request"""
+
+    def __init__(self, *args: Any, store: PersistedQueryStore, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = store
+
+    def should_render_graphql_ide(self, request: BaseRequestProtocol) -> bool:
+        return (
+            request.query_params.get('extensions') is None
+            and super().should_render_graphql_ide(request)
+        )
+
+    async def parse_http_body(self, request: AsyncHTTPRequestAdapter) -> GraphQLRequestData:
+        request_data = await super().parse_http_body(request)
+        extensions = None
+        if request.method == 'GET':
+            extensions = request.query_params.get('extensions')
+        elif 'application/json' in (request.content_type or ''):
+            extensions = self.parse_json(await request.get_body()).get('extensions')
+        if isinstance(extensions, (str, bytes)):
+            extensions = self.parse_json(extensions)
+        operation = self.store.resolve(request_data.query, extensions)
+        if operation is not None:
+            request_data.query = operation.query
+            current_operation.set(operation)
+        return request_data
+
+    async def execute_operation(self, request, context, root_value):  # type: ignore[no-untyped-def]
+        token = current_operation.set(None)
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryException as e:
+            return ExecutionResult(
+                data=None, errors=[GraphQLError(e.message, extensions={'code': e.code})],
+            )
+        finally:
+            current_operation.reset(token)
@@ -1,9 +1,13 @@
+from functools import partial
+
 import strawberry
 
 from product_service.api.graphql.v1.interfaces import IProduct
+from product_service.api.graphql.v1.loaders import get_loaders
+from product_service.api.graphql.v1.pagination import Connection, decode_cursor, validate_first
 from product_service.api.graphql.v1.queries.review import Review
-from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
-from product_service.api.graphql.v1.utils import get_container, get_required_fields
+from product_service.api.graphql.v1.utils import get_selected_fields
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 
 
 @strawberry.type
@@ -11,8 +15,8 @@ class Product(IProduct):
     id: strawberry.ID
     title: str
     description: str
-    _reviews: list[Review] = strawberry.field(
-        default_factory=list,
+    _reviews: list[Review] | None = strawberry.field(
+        default=None,
         name='_reviews',
         description='Do not use this field for queries, use "reviews" instead',
     )
@@ -21,18 +25,17 @@ class Product(IProduct):
     async def reviews(
         self,
         info: strawberry.Info,
-        offset: int = 0,
-        limit: int = 20,
-    ) -> list[Review]:
-        container = get_container(info)
-        resolver = await container.get(StrawberryReviewResolver)
-
-        if self._reviews:
-            return self._reviews
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Review]:
+        first, after_id = validate_first(first), decode_cursor(after)
         if not self.id:
-            return []
-        fields = get_required_fields(info)
-        reviews = await resolver.get_list(
-            fields=fields, product_id=self.id, offset=offset, limit=limit,
-        )
-        return reviews
+            return Connection.from_nodes([], first, after_id)
+        loaders = get_loaders(info)
+        reviews = self._reviews
+        if reviews is None:
+            reviews = await loaders.reviews_by_product_id(
+                get_selected_fields(info), limit=first + 1, after=after_id,
+            ).load(self.id)
+        count = partial(loaders.review_count_by_product_id().load, self.id)
+        return Connection.from_nodes(reviews, first, after_id, count=count)
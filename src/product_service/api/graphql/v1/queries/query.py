@@ -1,12 +1,14 @@
 import strawberry
 
+from product_service.api.graphql.v1.pagination import Connection
 from product_service.api.graphql.v1.queries.product import Product
 from product_service.api.graphql.v1.queries.review import Review
 from product_service.api.graphql.v1.queries.user import User
 from product_service.api.graphql.v1.resolvers.product import StrawberryProductResolver
 from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
 from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver
-from product_service.api.graphql.v1.utils import get_container
+from product_service.api.graphql.v1.utils import get_container, get_selected_fields
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 
 
 @strawberry.type
@@ -15,17 +17,22 @@ class Query:
     async def user(self, id: strawberry.ID, info: strawberry.Info) -> User | None:
         container = get_container(info)
         resolver = await container.get(StrawberryUserResolver)
-        user = await resolver.get(id=id, fields=info.selected_fields)
+        user = await resolver.get(id=id, fields=get_selected_fields(info))
         return user
 
     @strawberry.field
-    async def users(self, info: strawberry.Info, offset: int = 0, limit: int = 20) -> list[User]:
+    async def users(
+        self,
+        info: strawberry.Info,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[User]:
         container = get_container(info)
         resolver = await container.get(StrawberryUserResolver)
-        users: list[User] = await resolver.get_list(
-            fields=info.selected_fields,
-            offset=offset,
-            limit=limit,
+        users: Connection[User] = await resolver.get_list(
+            fields=get_selected_fields(info),
+            first=first,
+            after=after,
         )
         return users
 
@@ -34,7 +41,7 @@ class Query:
         container = get_container(info)
         resolver = await container.get(StrawberryReviewResolver)
         review = await resolver.get(
-            id=id, fields=info.selected_fields,
+            id=id, fields=get_selected_fields(info),
         )
         return review
 
@@ -42,15 +49,15 @@ class Query:
     async def reviews(
         self,
         info: strawberry.Info,
-        offset: int = 0,
-        limit: int = 20,
-    ) -> list[Review]:
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Review]:
         container = get_container(info)
         resolver = await container.get(StrawberryReviewResolver)
-        reviews: list[Review] = await resolver.get_list(
-            fields=info.selected_fields,
-            offset=offset,
-            limit=limit,
+        reviews: Connection[Review] = await resolver.get_list(
+            fields=get_selected_fields(info),
+            first=first,
+            after=after,
         )
         return reviews
 
@@ -59,7 +66,7 @@ class Query:
         container = get_container(info)
         resolver = await container.get(StrawberryProductResolver)
         product = await resolver.get(
-            id=id, fields=info.selected_fields,
+            id=id, fields=get_selected_fields(info),
         )
         return product
 
@@ -67,14 +74,52 @@ class Query:
     async def products(
         self,
         info: strawberry.Info,
-        offset: int = 0,
-        limit: int = 20,
-    ) -> list[Product]:
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Product]:
+        container = get_container(info)
+        resolver = await container.get(StrawberryProductResolver)
+        products: Connection[Product] = await resolver.get_list(
+            fields=get_selected_fields(info),
+            first=first,
+            after=after,
+        )
+        return products
+
+    @strawberry.field(description='Products matching the words of the query, most relevant first')
+    async def search_products(
+        self,
+        info: strawberry.Info,
+        query: str,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Product]:
         container = get_container(info)
         resolver = await container.get(StrawberryProductResolver)
-        products: list[Product] = await resolver.get_list(
-            fields=info.selected_fields,
-            offset=offset,
-            limit=limit,
+        products: Connection[Product] = await resolver.search(
+            query=query,
+            fields=get_selected_fields(info),
+            first=first,
+            after=after,
         )
         return products
+
+    @strawberry.field(description='Reviews matching the words of the query, most relevant first')
+    async def search_reviews(
+        self,
+        info: strawberry.Info,
+        query: str,
+        product_id: strawberry.ID | None = None,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Review]:
+        container = get_container(info)
+        resolver = await container.get(StrawberryReviewResolver)
+        reviews: Connection[Review] = await resolver.search(
+            query=query,
+            fields=get_selected_fields(info),
+            first=first,
+            after=after,
+            product_id=product_id,
+        )
+        return reviews
@@ -2,7 +2,8 @@ import strawberry
 
 from product_service.api.graphql.v1.exceptions import IDNotProvidedException
 from product_service.api.graphql.v1.interfaces import IProduct, IReview, IUser
-from product_service.api.graphql.v1.utils import get_container
+from product_service.api.graphql.v1.loaders import get_loaders
+from product_service.api.graphql.v1.utils import get_selected_fields
 
 
 @strawberry.type
@@ -24,40 +25,22 @@ class Review(IReview):
 
     @strawberry.field
     async def product(self, info: strawberry.Info) -> IProduct | None:
-        from product_service.api.graphql.v1.resolvers.product import \
-            StrawberryProductResolver
-        container = get_container(info)
-        resolver: StrawberryProductResolver = await container.get(StrawberryProductResolver)
         if self._product is not None:
             return self._product
+        loaders = get_loaders(info)
         if self._product_id:
-            product = await resolver.get(
-                id=self._product_id, fields=info.selected_fields,
-            )
-        else:
-            if not self.id:
-                raise IDNotProvidedException('Hint: add field \'id\' to the query schema')
-            product = await resolver.get_by_review_id(
-                review_id=self.id, fields=info.selected_fields,
-            )
-        return product
+            return await loaders.product_by_id(get_selected_fields(info)).load(self._product_id)
+        if not self.id:
+            raise IDNotProvidedException('Hint: add field \'id\' to the query schema')
+        return await loaders.product_by_review_id(get_selected_fields(info)).load(self.id)
 
     @strawberry.field
     async def user(self, info: strawberry.Info) -> IUser | None:
-        from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver
-
-        container = get_container(info)
-        resolver: StrawberryUserResolver = await container.get(StrawberryUserResolver)
         if self._user is not None:
             return self._user
+        loaders = get_loaders(info)
+        if self._user_id:
+            return await loaders.user_by_id(get_selected_fields(info)).load(self._user_id)
         if not self.id:
             raise IDNotProvidedException('Hint: add field \'id\' to the query schema')
-        if self._user_id:
-            user = await resolver.get(
-                id=self._user_id, fields=info.selected_fields,
-            )
-        else:
-            user = await resolver.get_by_review_id(
-                review_id=self.id, fields=info.selected_fields,
-            )
-        return user
+        return await loaders.user_by_review_id(get_selected_fields(info)).load(self.id)
@@ -0,0 +1,62 @@
+import math
+import time
+from typing import Iterator
+
+from fastapi import Request, Response
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from product_service.core.db.sqlalchemy.replicas import Route, current_route
+from product_service.core.settings import config
+
+# Expiry of the read-your-writes window of the client, set by mutations
+READ_YOUR_WRITES_COOKIE = 'read_primary_until'
+
+
+def within_read_your_writes(request: Request | None) -> bool:
+    # operations executed without a client request, e.g. refreshes of cached responses
+    if request is None or 'headers' not in request.scope:
+        return False
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def start_read_your_writes(response: Response | None, seconds: float) -> None:
+    if response is None or seconds <= 0:
+        return
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        str(time.time() + seconds),
+        max_age=math.ceil(seconds),
+        httponly=True,
+        samesite='lax',
+    )
+
+
+class ReplicaRouting(SchemaExtension):
+    """
+    Open sessions of query operations on read replicas. Mutations and subscriptions
+    use the primary, after a mutation the client reads from the primary as well
+    for DB_READ_YOUR_WRITES_SECONDS, so it sees its own writes despite replication lag
+    """
+    read_your_writes_seconds = config.DB_READ_YOUR_WRITES_SECONDS
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        context = execution_context.context
+        operation_type = execution_context.operation_type
+        if operation_type is OperationType.MUTATION:
+            start_read_your_writes(context.get('response'), self.read_your_writes_seconds)
+        if operation_type is not OperationType.QUERY:
+            yield
+            return
+        route: Route = (
+            'read_your_writes' if within_read_your_writes(context.get('request')) else 'read'
+        )
+        token = current_route.set(route)
+        try:
+            yield
+        finally:
+            current_route.reset(token)
@@ -1,7 +1,11 @@
-from strawberry.types.nodes import Selection
+import dataclasses
+
+from strawberry.types.nodes import FragmentSpread, InlineFragment, SelectedField, Selection
 from strawberry.utils.str_converters import to_snake_case
 
-from product_service.core.dto import SelectedFields
+from product_service.api.graphql.v1.pagination import CONNECTION_FIELDS, page_arguments
+from product_service.api.graphql.v1.utils import derive_from_selections
+from product_service.core.dto import SelectedFields, canonical_fields
 
 
 class BaseStrawberryResolver:
@@ -26,24 +30,75 @@ class BaseStrawberryResolver:
                     )
         return list_fields
 
+    @classmethod
+    def _expand_fragments(cls, selections: list[Selection]) -> list[Selection]:
+        """Replace fragments with the fields they select"""
+        expanded: list[Selection] = []
+        for selection in selections:
+            if isinstance(selection, (FragmentSpread, InlineFragment)):
+                expanded.extend(cls._expand_fragments(selection.selections))
+            else:
+                expanded.append(selection)
+        return expanded
+
+    @classmethod
+    def _unwrap_connection(cls, field: SelectedField) -> SelectedField:
+        """
+        Replace selections of a connection field with the fields selected on its nodes,
+        node id is always selected since cursors are built from it
+        """
+        selections = cls._expand_fragments(field.selections)
+        if not any(s.name in CONNECTION_FIELDS for s in selections):  # type: ignore[union-attr]
+            return field
+        nodes: list[Selection] = []
+        for edges in selections:
+            if edges.name != 'edges':  # type: ignore[union-attr]
+                continue
+            for node in cls._expand_fragments(edges.selections):
+                if node.name == 'node':  # type: ignore[union-attr]
+                    nodes.extend(cls._expand_fragments(node.selections))
+        if not any(n.name == 'id' for n in nodes):  # type: ignore[union-attr]
+            nodes.insert(0, SelectedField(name='id', directives={}, arguments={}, selections=[]))
+        return dataclasses.replace(
+            field, selections=nodes, arguments=page_arguments(field.arguments),
+        )
+
     @classmethod
     def _selections_to_selected_fields(
         cls,
         fields: list[Selection],
         remove_related: bool = False,
+    ) -> list[SelectedFields]:
+        return derive_from_selections(
+            fields,
+            f'selected_fields:{remove_related}',
+            lambda: cls._build_selected_fields(fields, remove_related=remove_related),
+        )
+
+    @classmethod
+    def _build_selected_fields(
+        cls,
+        fields: list[Selection],
+        remove_related: bool = False,
     ) -> list[SelectedFields]:
         result: list[SelectedFields] = []
-        for field in fields:
+        for field in cls._expand_fragments(fields):
             if field.selections:
-                obj = SelectedFields(owner=field.name.lower())  # type: ignore[union-attr]
-                for selection in field.selections:
+                field = cls._unwrap_connection(field)  # type: ignore[arg-type]
+                obj = SelectedFields(
+                    owner=field.name.lower(),  # type: ignore[union-attr]
+                    arguments=field.arguments,  # type: ignore[union-attr]
+                )
+                result.append(obj)
+                for selection in cls._expand_fragments(field.selections):
                     if selection.selections:
                         if remove_related:
                             continue
                         result.extend(
-                            cls._selections_to_selected_fields([selection], remove_related=False)
+                            cls._build_selected_fields([selection], remove_related=False)
                         )
                     else:
                         obj.fields.append(selection.name)  # type: ignore[union-attr]
-                result.append(obj)
+                # gateways cache statements by selected columns
+                obj.fields = canonical_fields(obj.fields)
         return result
@@ -1,13 +1,31 @@
 from dataclasses import dataclass, field
+from functools import partial
+from typing import Sequence
 
 import strawberry
 from strawberry.types.nodes import Selection
 
+from product_service.api.graphql.v1.bulk import (
+    BulkDeletePayload,
+    BulkPayload,
+    bulk_delete_payload,
+    bulk_payload,
+    validate_bulk_size,
+)
 from product_service.api.graphql.v1.converters.product import StrawberryProductConverter
 from product_service.api.graphql.v1.interfaces import IDeleted
 from product_service.api.graphql.v1.mutations.inputs import (ProductInput,
-                                                 UpdateProductInput)
+                                                 UpdateProductInput,
+                                                 UpdateProductItemInput)
+from product_service.api.graphql.v1.pagination import (
+    Connection,
+    decode_cursor,
+    decode_ranked_cursor,
+    validate_first,
+    validate_search_query,
+)
 from product_service.api.graphql.v1.queries.product import Product
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 from product_service.core.dto import ProductDTO
 from product_service.core.exceptions import ObjectDoesNotExistException
 from product_service.gateways.base import ProductGateway
@@ -23,14 +41,38 @@ class StrawberryProductResolver(BaseStrawberryResolver):
     async def get_list(
         self,
         fields: list[Selection],
-        offset: int = 0,
-        limit: int = 20,
-    ) -> list[Product]:
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Product]:
+        first, after_id = validate_first(first), decode_cursor(after)
         required_fields = self._selections_to_selected_fields(fields)
         products = await self.gw.get_list(
-            fields=required_fields, offset=offset, limit=limit,
+            fields=required_fields, limit=first + 1, after=after_id,
+        )
+        return Connection.from_nodes(
+            [self.converter.convert(p) for p in products], first, after_id, count=self.gw.count,
+        )
+
+    async def search(
+        self,
+        query: str,
+        fields: list[Selection],
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[Product]:
+        query, first = validate_search_query(query), validate_first(first)
+        after_rank = decode_ranked_cursor(after)
+        required_fields = self._selections_to_selected_fields(fields)
+        found = await self.gw.search(
+            query, fields=required_fields, limit=first + 1, after=after_rank,
+        )
+        return Connection.from_nodes(
+            [self.converter.convert(p) for p, _ in found],
+            first,
+            after_rank,
+            count=partial(self.gw.search_count, query),
+            ranks={p.id: rank for p, rank in found},
         )
-        return [self.converter.convert(p) for p in products]
 
     async def get(self, id: strawberry.ID, fields: list[Selection]) -> Product | None:
         required_fields = self._selections_to_selected_fields(fields)
@@ -40,6 +82,33 @@ class StrawberryProductResolver(BaseStrawberryResolver):
             return None
         return self.converter.convert(product)
 
+    async def get_many(
+        self,
+        ids: Sequence[strawberry.ID],
+        fields: list[Selection],
+    ) -> list[Product | None]:
+        required_fields = self._selections_to_selected_fields(fields)
+        products = await self.gw.get_many(ids=[int(id) for id in ids], fields=required_fields)
+        products_by_id = {p.id: p for p in products}
+        return [
+            self.converter.convert(p) if (p := products_by_id.get(int(id))) else None
+            for id in ids
+        ]
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[strawberry.ID],
+        fields: list[Selection],
+    ) -> list[Product | None]:
+        required_fields = self._selections_to_selected_fields(fields)
+        products_by_review_id = await self.gw.get_many_by_review_ids(
+            review_ids=[int(id) for id in review_ids], fields=required_fields,
+        )
+        return [
+            self.converter.convert(p) if (p := products_by_review_id.get(int(id))) else None
+            for id in review_ids
+        ]
+
     async def get_by_review_id(
         self,
         review_id: strawberry.ID,
@@ -73,3 +142,22 @@ class StrawberryProductResolver(BaseStrawberryResolver):
         except ObjectDoesNotExistException:
             return False
         return True
+
+    async def create_many(self, input: list[ProductInput]) -> BulkPayload[Product]:
+        validate_bulk_size(input)
+        dtos = [ProductDTO(**strawberry.asdict(i)) for i in input]  # type: ignore[arg-type]
+        results = await self.gw.add_many(dtos=dtos)
+        return bulk_payload(results, self.converter.convert)
+
+    async def update_many(self, input: list[UpdateProductItemInput]) -> BulkPayload[Product]:
+        validate_bulk_size(input)
+        items = [
+            (int(i.id), ProductDTO(title=i.title, description=i.description)) for i in input
+        ]
+        results = await self.gw.update_many(items=items)
+        return bulk_payload(results, self.converter.convert)
+
+    async def delete_many(self, ids: list[strawberry.ID]) -> BulkDeletePayload:
+        validate_bulk_size(ids)
+        results = await self.gw.delete_many(ids=[int(id) for id in ids])
+        return bulk_delete_payload(results)
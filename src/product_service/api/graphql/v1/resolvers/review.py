@@ -1,42 +1,174 @@
 from dataclasses import dataclass
+from functools import partial
+from typing import AsyncIterator, Sequence
 
 import strawberry
 from strawberry.types.nodes import Selection
 
+from product_service.api.graphql.v1.bulk import (
+    BulkDeletePayload,
+    BulkPayload,
+    bulk_delete_payload,
+    bulk_payload,
+    validate_bulk_size,
+)
 from product_service.api.graphql.v1.converters.review import StrawberryReviewConverter
+from product_service.api.graphql.v1.exceptions import InvalidPaginationArgumentsException
 from product_service.api.graphql.v1.interfaces import IDeleted
-from product_service.api.graphql.v1.mutations.inputs import ReviewInput, UpdateReviewInput
+from product_service.api.graphql.v1.mutations.inputs import (
+    ReviewInput,
+    UpdateReviewInput,
+    UpdateReviewItemInput,
+)
+from product_service.api.graphql.v1.pagination import (
+    Connection,
+    decode_cursor,
+    decode_ranked_cursor,
+    validate_first,
+    validate_search_query,
+)
 from product_service.api.graphql.v1.queries.review import Review
+from product_service.core.broker import Broker
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 from product_service.core.dto import CreateReviewDTO, ReviewDTO, SelectedFields
 from product_service.core.exceptions import ObjectDoesNotExistException
+from product_service.core.settings import config
 from product_service.gateways.base import ReviewGateway
 
 from .base import BaseStrawberryResolver
 
 
+def review_added_topic(product_id: int | strawberry.ID) -> str:
+    return f'review_added:{int(product_id)}'
+
+
 @dataclass(eq=False, repr=False)
 class StrawberryReviewResolver(BaseStrawberryResolver):
     gw: ReviewGateway
+    # New reviews are published to subscribers of their product
+    broker: Broker | None = None
 
     async def get_list(
         self,
         fields: list[Selection],
-        offset: int = 0,
-        limit: int = 20,
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
         user_id: strawberry.ID | None = None,
         product_id: strawberry.ID | None = None,
-    ) -> list[Review]:
+    ) -> Connection[Review]:
+        first, after_id = validate_first(first), decode_cursor(after)
         required_fields: list[SelectedFields] = self._selections_to_selected_fields(
             fields, remove_related=False,
         )
+        filters = {
+            'user_id': int(user_id) if user_id else None,
+            'product_id': int(product_id) if product_id else None,
+        }
         reviews = await self.gw.get_list(
+            fields=required_fields, limit=first + 1, after=after_id, **filters,
+        )
+        return Connection.from_nodes(
+            [StrawberryReviewConverter.convert(r) for r in reviews],
+            first,
+            after_id,
+            count=partial(self.gw.count, **filters),
+        )
+
+    async def search(
+        self,
+        query: str,
+        fields: list[Selection],
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+        product_id: strawberry.ID | None = None,
+    ) -> Connection[Review]:
+        query, first = validate_search_query(query), validate_first(first)
+        after_rank = decode_ranked_cursor(after)
+        required_fields: list[SelectedFields] = self._selections_to_selected_fields(
+            fields, remove_related=False,
+        )
+        filters = {'product_id': int(product_id) if product_id else None}
+        found = await self.gw.search(
+            query, fields=required_fields, limit=first + 1, after=after_rank, **filters,
+        )
+        return Connection.from_nodes(
+            [StrawberryReviewConverter.convert(r) for r, _ in found],
+            first,
+            after_rank,
+            count=partial(self.gw.search_count, query, **filters),
+            ranks={r.id: rank for r, rank in found},
+        )
+
+    async def stream_by_product(
+        self,
+        product_id: strawberry.ID,
+        fields: list[Selection],
+        batch_size: int = DEFAULT_PAGE_SIZE,
+        after: strawberry.ID | None = None,
+    ) -> AsyncIterator[list[Review]]:
+        if not 0 < batch_size <= config.QUERY_MAX_PAGE_SIZE:
+            raise InvalidPaginationArgumentsException(
+                f'"batchSize" must be between 1 and {config.QUERY_MAX_PAGE_SIZE}',
+            )
+        required_fields: list[SelectedFields] = self._selections_to_selected_fields(
+            fields, remove_related=False,
+        )
+        batches = self.gw.stream_by_product(
+            product_id=int(product_id),
+            fields=required_fields,
+            batch_size=batch_size,
+            after=int(after) if after else None,
+        )
+        async for reviews in batches:
+            yield [StrawberryReviewConverter.convert(r) for r in reviews]
+
+    async def get_many_by_product_ids(
+        self,
+        product_ids: Sequence[strawberry.ID],
+        fields: list[Selection],
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: int | None = None,
+    ) -> list[list[Review]]:
+        required_fields: list[SelectedFields] = self._selections_to_selected_fields(
+            fields, remove_related=False,
+        )
+        reviews = await self.gw.get_many_by_product_ids(
+            product_ids=[int(id) for id in product_ids],
             fields=required_fields,
-            offset=offset,
             limit=limit,
-            user_id=int(user_id) if user_id else None,
-            product_id=int(product_id) if product_id else None,
+            after=after,
         )
-        return [StrawberryReviewConverter.convert(r) for r in reviews]
+        return [
+            [StrawberryReviewConverter.convert(r) for r in reviews[int(id)]] for id in product_ids
+        ]
+
+    async def get_many_by_user_ids(
+        self,
+        user_ids: Sequence[strawberry.ID],
+        fields: list[Selection],
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: int | None = None,
+    ) -> list[list[Review]]:
+        required_fields: list[SelectedFields] = self._selections_to_selected_fields(
+            fields, remove_related=False,
+        )
+        reviews = await self.gw.get_many_by_user_ids(
+            user_ids=[int(id) for id in user_ids],
+            fields=required_fields,
+            limit=limit,
+            after=after,
+        )
+        return [
+            [StrawberryReviewConverter.convert(r) for r in reviews[int(id)]] for id in user_ids
+        ]
+
+    async def count_many_by_product_ids(self, product_ids: Sequence[strawberry.ID]) -> list[int]:
+        counts = await self.gw.count_many_by_product_ids([int(id) for id in product_ids])
+        return [counts[int(id)] for id in product_ids]
+
+    async def count_many_by_user_ids(self, user_ids: Sequence[strawberry.ID]) -> list[int]:
+        counts = await self.gw.count_many_by_user_ids([int(id) for id in user_ids])
+        return [counts[int(id)] for id in user_ids]
 
     async def get(self, id: strawberry.ID, fields: list[Selection]) -> Review | None:
         required_fields: list[SelectedFields] = self._selections_to_selected_fields(
@@ -55,12 +187,8 @@ class StrawberryReviewResolver(BaseStrawberryResolver):
 
         dto = CreateReviewDTO(**data)
         new_review = await self.gw.add(dto=dto)
-
-        data = new_review.model_dump()
-        data['_product_id'] = data.pop('product_id')
-        data['_user_id'] = data.pop('user_id')
-
-        return Review(**data)
+        await self._publish_added([new_review])
+        return self._to_review(new_review)
 
     async def update(self, id: strawberry.ID, input: UpdateReviewInput) -> Review | None:
         dto = ReviewDTO(**strawberry.asdict(input))
@@ -68,10 +196,7 @@ class StrawberryReviewResolver(BaseStrawberryResolver):
             review = await self.gw.update(id=int(id), dto=dto)
         except ObjectDoesNotExistException:
             return None
-        data = review.model_dump()
-        data['_product_id'] = data.pop('product_id')
-        data['_user_id'] = data.pop('user_id')
-        return Review(**data)
+        return self._to_review(review)
 
     async def delete(self, id: strawberry.ID) -> bool:
         try:
@@ -79,3 +204,39 @@ class StrawberryReviewResolver(BaseStrawberryResolver):
         except ObjectDoesNotExistException:
             deleted = False
         return deleted
+
+    async def create_many(self, input: list[ReviewInput]) -> BulkPayload[Review]:
+        validate_bulk_size(input)
+        dtos = [
+            CreateReviewDTO(
+                content=i.content, user_id=int(i.user_id), product_id=int(i.product_id),
+            )
+            for i in input
+        ]
+        results = await self.gw.add_many(dtos=dtos)
+        await self._publish_added([r for r in results if isinstance(r, CreateReviewDTO)])
+        return bulk_payload(results, self._to_review)
+
+    async def update_many(self, input: list[UpdateReviewItemInput]) -> BulkPayload[Review]:
+        validate_bulk_size(input)
+        items = [(int(i.id), ReviewDTO(content=i.content)) for i in input]
+        results = await self.gw.update_many(items=items)
+        return bulk_payload(results, self._to_review)
+
+    async def delete_many(self, ids: list[strawberry.ID]) -> BulkDeletePayload:
+        validate_bulk_size(ids)
+        results = await self.gw.delete_many(ids=[int(id) for id in ids])
+        return bulk_delete_payload(results)
+
+    async def _publish_added(self, reviews: list[CreateReviewDTO]) -> None:
+        if self.broker is None:
+            return
+        for review in reviews:
+            await self.broker.publish(review_added_topic(review.product_id), review)
+
+    @staticmethod
+    def _to_review(dto: ReviewDTO | CreateReviewDTO) -> Review:
+        data = dto.model_dump()
+        data['_product_id'] = data.pop('product_id')
+        data['_user_id'] = data.pop('user_id')
+        return Review(**data)
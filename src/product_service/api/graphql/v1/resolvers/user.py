@@ -1,11 +1,25 @@
 from dataclasses import dataclass, field
+from typing import Sequence
 
 import strawberry
 from strawberry.types.nodes import Selection
 
+from product_service.api.graphql.v1.bulk import (
+    BulkDeletePayload,
+    BulkPayload,
+    bulk_delete_payload,
+    bulk_payload,
+    validate_bulk_size,
+)
 from product_service.api.graphql.v1.converters.user import StrawberryUserConverter
-from product_service.api.graphql.v1.mutations.inputs import UpdateUserInput, UserInput
+from product_service.api.graphql.v1.mutations.inputs import (
+    UpdateUserInput,
+    UpdateUserItemInput,
+    UserInput,
+)
+from product_service.api.graphql.v1.pagination import Connection, decode_cursor, validate_first
 from product_service.api.graphql.v1.queries.user import User
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 from product_service.core.dto import SelectedFields, UserDTO
 from product_service.core.exceptions import ObjectDoesNotExistException
 from product_service.gateways.base import UserGateway
@@ -21,12 +35,15 @@ class StrawberryUserResolver(BaseStrawberryResolver):
     async def get_list(
         self,
         fields: list[Selection],
-        offset: int = 0,
-        limit: int = 20,
-    ) -> list[User]:
+        first: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None,
+    ) -> Connection[User]:
+        first, after_id = validate_first(first), decode_cursor(after)
         required_fields: list[SelectedFields] = self._selections_to_selected_fields(fields=fields)
-        users = await self.gw.get_list(fields=required_fields, offset=offset, limit=limit)
-        return [self.converter.convert(user) for user in users]
+        users = await self.gw.get_list(fields=required_fields, limit=first + 1, after=after_id)
+        return Connection.from_nodes(
+            [self.converter.convert(user) for user in users], first, after_id, count=self.gw.count,
+        )
 
     async def get(
         self,
@@ -40,6 +57,33 @@ class StrawberryUserResolver(BaseStrawberryResolver):
             user = None
         return self.converter.convert(user) if user else None
 
+    async def get_many(
+        self,
+        ids: Sequence[strawberry.ID],
+        fields: list[Selection],
+    ) -> list[User | None]:
+        required_fields = self._selections_to_selected_fields(fields)
+        users = await self.gw.get_many(ids=[int(id) for id in ids], fields=required_fields)
+        users_by_id = {u.id: u for u in users}
+        return [
+            self.converter.convert(u) if (u := users_by_id.get(int(id))) else None
+            for id in ids
+        ]
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[strawberry.ID],
+        fields: list[Selection],
+    ) -> list[User | None]:
+        required_fields = self._selections_to_selected_fields(fields)
+        users_by_review_id = await self.gw.get_many_by_review_ids(
+            review_ids=[int(id) for id in review_ids], fields=required_fields,
+        )
+        return [
+            self.converter.convert(u) if (u := users_by_review_id.get(int(id))) else None
+            for id in review_ids
+        ]
+
     async def get_by_review_id(
         self,
         review_id: strawberry.ID,
@@ -73,3 +117,20 @@ class StrawberryUserResolver(BaseStrawberryResolver):
         except ObjectDoesNotExistException:
             deleted = False
         return deleted
+
+    async def create_many(self, input: list[UserInput]) -> BulkPayload[User]:
+        validate_bulk_size(input)
+        dtos = [UserDTO(**strawberry.asdict(i)) for i in input]  # type: ignore[arg-type]
+        results = await self.gw.add_many(dtos=dtos)
+        return bulk_payload(results, self.converter.convert)
+
+    async def update_many(self, input: list[UpdateUserItemInput]) -> BulkPayload[User]:
+        validate_bulk_size(input)
+        items = [(int(i.id), UserDTO(username=i.username)) for i in input]
+        results = await self.gw.update_many(items=items)
+        return bulk_payload(results, self.converter.convert)
+
+    async def delete_many(self, ids: list[strawberry.ID]) -> BulkDeletePayload:
+        validate_bulk_size(ids)
+        results = await self.gw.delete_many(ids=[int(id) for id in ids])
+        return bulk_delete_payload(results)
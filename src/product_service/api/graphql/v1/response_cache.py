@@ -0,0 +1,393 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from graphql import (
+    DocumentNode,
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    SelectionSetNode,
+    TypeInfo,
+    TypeInfoVisitor,
+    Visitor,
+    get_named_type,
+    strip_ignored_characters,
+    visit,
+)
+from graphql.utilities import get_operation_ast
+from starlette.requests import Request
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from product_service.core.dto import Entity
+from product_service.core.settings import config
+
+# Entity tags of the GraphQL types, responses are tagged with every entity they select
+TYPE_TAGS: dict[str, str] = {
+    f'{prefix}{name}{suffix}': entity.value
+    for name, entity in (
+        ('User', Entity.USER), ('Product', Entity.PRODUCT), ('Review', Entity.REVIEW),
+    )
+    for prefix, suffix in (('', ''), ('I', ''), ('', 'Connection'), ('', 'Edge'))
+}
+# Entity tags of the types of single entities, their ids tag responses with "{tag}:{id}"
+NODE_TAGS: dict[str, str] = {
+    name: tag for name, tag in TYPE_TAGS.items() if not name.endswith(('Connection', 'Edge'))
+}
+# Root fields whose results depend on the content of entities, not only on their ids:
+# an update of any entity of the tag may change them
+CONTENT_FIELDS: dict[str, str] = {
+    'searchProducts': Entity.PRODUCT.value, 'searchReviews': Entity.REVIEW.value,
+}
+# Set in the context of operations executed to refresh a stale response
+REVALIDATE_CONTEXT_KEY = 'response_cache_revalidate'
+
+
+@lru_cache(maxsize=1024)
+def normalize_query(query: str) -> str:
+    """Query text without whitespace, comments and commas"""
+    return strip_ignored_characters(query)
+
+
+def document_tags(schema: GraphQLSchema, document: DocumentNode) -> frozenset[str]:
+    """Entity tags of every type selected by the document"""
+    type_info = TypeInfo(schema)
+    tags: set[str] = set()
+
+    class CollectTags(Visitor):
+        def enter_field(self, node: FieldNode, *args: Any) -> None:
+            field_type = type_info.get_type()
+            if field_type is not None:
+                tag = TYPE_TAGS.get(get_named_type(field_type).name)
+                if tag is not None:
+                    tags.add(tag)
+
+    visit(document, TypeInfoVisitor(type_info, CollectTags()))
+    return frozenset(tags)
+
+
+def entity_tags(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    data: dict[str, Any],
+    operation_name: str | None = None,
+) -> frozenset[str]:
+    """
+    Tags of every entity in the response data, "{tag}:{id}" by the selected id
+    or "{tag}:*" when the id is not selected, for invalidation by id
+    """
+    operation = get_operation_ast(document, operation_name)
+    query_type = schema.query_type
+    if operation is None or query_type is None:
+        return frozenset()
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    tags: set[str] = set()
+
+    def fields(
+        parent: GraphQLNamedType,
+        selection_set: SelectionSetNode,
+    ) -> Iterator[tuple[GraphQLNamedType, FieldNode]]:
+        """Fields of the selection set with their parent types, fragments are inlined"""
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                yield parent, selection
+                continue
+            if isinstance(selection, FragmentSpreadNode):
+                fragment = fragments.get(selection.name.value)
+                if fragment is None:
+                    continue
+                condition, nested = fragment.type_condition, fragment.selection_set
+            else:
+                assert isinstance(selection, InlineFragmentNode)
+                condition, nested = selection.type_condition, selection.selection_set
+            fragment_type = schema.get_type(condition.name.value) if condition else parent
+            yield from fields(fragment_type or parent, nested)
+
+    def collect(named_type: GraphQLNamedType, selection_set: SelectionSetNode, value: Any) -> None:
+        if isinstance(value, list):
+            for item in value:
+                collect(named_type, selection_set, item)
+            return
+        if not isinstance(value, dict):
+            return
+        ids = []
+        for parent, node in fields(named_type, selection_set):
+            key = node.alias.value if node.alias else node.name.value
+            if key not in value:
+                continue
+            if node.name.value == 'id':
+                ids.append(value[key])
+            field = getattr(parent, 'fields', {}).get(node.name.value)
+            if field is not None and node.selection_set is not None:
+                collect(get_named_type(field.type), node.selection_set, value[key])
+        tag = NODE_TAGS.get(named_type.name)
+        if tag is not None and ids:
+            tags.update(f'{tag}:{id}' for id in ids)
+        elif tag is not None:
+            tags.add(f'{tag}:*')
+
+    for _, node in fields(query_type, operation.selection_set):
+        if node.name.value in CONTENT_FIELDS:
+            tags.add(f'{CONTENT_FIELDS[node.name.value]}:*')
+    if isinstance(query_type, GraphQLObjectType):
+        collect(query_type, operation.selection_set, data)
+    return frozenset(tags)
+
+
+@dataclass(eq=False, slots=True)
+class CachedResponse:
+    body: bytes
+    tags: frozenset[str]
+    size: int
+    expires_at: float
+    stale_until: float
+    revalidating: bool = False
+
+
+class ResponseCache:
+    """
+    LRU cache of query results bounded by size of the serialized responses in bytes.
+    Entries expire after the shortest TTL of their entity tags and are served
+    stale for `stale_ttl` seconds more while they are refreshed in background.
+    Invalidating a tag drops every response that selects the entity, which creates
+    and deletes do since lists and counts change. Invalidating ids drops only
+    responses with those entities, or with entities of the tag whose ids are unknown
+    """
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: dict[str, float] | None = None,
+        default_ttl: float = 60.0,
+        stale_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = dict(ttl or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+        self._keys_by_tag: dict[str, set[Hashable]] = {}
+        self._versions: dict[str, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(query: str, operation_name: str | None, variables: dict[str, Any] | None) -> Hashable:
+        return (
+            normalize_query(query),
+            operation_name,
+            json.dumps(variables or {}, sort_keys=True, default=str),
+        )
+
+    def ttl_for(self, tags: Iterable[str]) -> float:
+        return min((self.ttl.get(tag, self.default_ttl) for tag in tags), default=self.default_ttl)
+
+    def versions(self, tags: Iterable[str]) -> tuple[int, ...]:
+        return tuple(self._versions.get(tag, 0) for tag in sorted(tags))
+
+    def get(self, key: Hashable) -> tuple[CachedResponse | None, bool]:
+        """Returns cached response and whether it is stale"""
+        entry = self._entries.get(key)
+        now = self.clock()
+        if entry is None or now >= entry.stale_until:
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        if now >= entry.expires_at:
+            self.stale_hits += 1
+            return entry, True
+        self.hits += 1
+        return entry, False
+
+    def set(
+        self,
+        key: Hashable,
+        data: dict[str, Any],
+        tags: frozenset[str],
+        versions: tuple[int, ...] | None = None,
+        ids: frozenset[str] = frozenset(),
+    ) -> bool:
+        """
+        Store response data with its entity tags and the tags of entities by id.
+        Responses computed before invalidation of their tags (`versions` differ
+        from the current ones) and responses over `max_bytes` are skipped
+        """
+        if versions is not None and versions != self.versions(tags):
+            return False
+        body = json.dumps(data, separators=(',', ':')).encode()
+        size = len(body) + sum(len(part) for part in key if isinstance(part, str))
+        if size > self.max_bytes:
+            return False
+        if key in self._entries:
+            self._remove(key)
+        ttl = self.ttl_for(tags)
+        now = self.clock()
+        self._entries[key] = CachedResponse(
+            body=body,
+            tags=tags | ids,
+            size=size,
+            expires_at=now + ttl,
+            stale_until=now + ttl + self.stale_ttl,
+        )
+        self.bytes += size
+        for tag in tags | ids:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    def invalidate(self, *tags: Entity | str) -> int:
+        """Drop responses selecting any of `tags`, returns number of dropped responses"""
+        dropped = 0
+        for tag in (t.value if isinstance(t, Entity) else t for t in tags):
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+            dropped += self._drop(tag)
+        return dropped
+
+    def invalidate_ids(self, tag: Entity | str, ids: Iterable[int | str]) -> int:
+        """
+        Drop responses with the entities of `ids` and responses with entities of the tag
+        whose ids are unknown, returns number of dropped responses
+        """
+        tag = tag.value if isinstance(tag, Entity) else tag
+        # responses being computed may hold the old values, they are not stored
+        self._versions[tag] = self._versions.get(tag, 0) + 1
+        dropped = self._drop(f'{tag}:*')
+        for id in ids:
+            dropped += self._drop(f'{tag}:{id}')
+        return dropped
+
+    def _drop(self, tag: str) -> int:
+        keys = list(self._keys_by_tag.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+
+    def metrics(self) -> dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_tag.clear()
+        self.bytes = self.hits = self.stale_hits = self.misses = 0
+        self.evictions = self.invalidations = 0
+
+
+response_cache = ResponseCache(
+    max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+    ttl=config.RESPONSE_CACHE_TTL,
+    default_ttl=config.RESPONSE_CACHE_DEFAULT_TTL,
+    stale_ttl=config.RESPONSE_CACHE_STALE_TTL,
+)
+
+
+class ResponseCacheExtension(SchemaExtension):
+    """
+    Serve query operations from `response_cache`.
+    Key is the normalized query text, operation name and variables,
+    stale responses are returned right away and refreshed by executing
+    the operation again in a new dependency scope
+    """
+    cache = response_cache
+    _revalidations: set[asyncio.Task] = set()
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        if (
+            execution_context.operation_type is not OperationType.QUERY
+            or not execution_context.query
+        ):
+            yield
+            return
+        context = execution_context.context
+        key = self.cache.key(
+            execution_context.query, execution_context.operation_name, execution_context.variables,
+        )
+        if not context.get(REVALIDATE_CONTEXT_KEY):
+            entry, stale = self.cache.get(key)
+            if entry is not None:
+                execution_context.result = GraphQLExecutionResult(data=json.loads(entry.body))
+                if stale and not entry.revalidating:
+                    entry.revalidating = True
+                    self._revalidate(context)
+                yield
+                return
+        assert execution_context.graphql_document is not None
+        tags = document_tags(execution_context.schema._schema, execution_context.graphql_document)
+        versions = self.cache.versions(tags)
+        yield
+        result = execution_context.result
+        if result is not None and not result.errors and result.data is not None:
+            ids = entity_tags(
+                execution_context.schema._schema,
+                execution_context.graphql_document,
+                result.data,
+                execution_context.operation_name,
+            )
+            self.cache.set(key, result.data, tags, versions, ids=ids)
+
+    def _revalidate(self, context: dict[str, Any]) -> None:
+        execution_context = self.execution_context
+        request_container = context['request'].state.dishka_container
+        parent_container = request_container.parent_container
+
+        async def revalidate() -> None:
+            async with parent_container() as container:
+                request = Request({
+                    'type': 'http', 'headers': [], 'state': {'dishka_container': container},
+                })
+                await execution_context.schema.execute(
+                    execution_context.query,
+                    variable_values=execution_context.variables,
+                    context_value={'request': request, REVALIDATE_CONTEXT_KEY: True},
+                    operation_name=execution_context.operation_name,
+                )
+
+        task = asyncio.create_task(revalidate())
+        self._revalidations.add(task)
+        task.add_done_callback(self._revalidations.discard)
@@ -0,0 +1,79 @@
+import random
+from inspect import isawaitable
+from typing import Any, Callable, Iterator
+
+from graphql import GraphQLError, GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from product_service.api.graphql.v1.tracing import has_resolver
+from product_service.core.db.sqlalchemy.sql_trace import (
+    SQLTrace,
+    current_field_path,
+    current_sql_trace,
+)
+from product_service.core.settings import config
+
+
+class SQLTraceExtension(SchemaExtension):
+    """
+    Record SQL statements of a sampled share of operations with timing and the path
+    of the field that executed them, the trace is returned in "extensions" of the response.
+    In strict mode N+1 queries and lazy loads are reported as errors of the operation
+    """
+    sample_rate = config.SQL_TRACE_SAMPLE_RATE
+    threshold = config.SQL_TRACE_REPEAT_THRESHOLD
+    strict = config.SQL_TRACE_STRICT
+    trace: SQLTrace | None = None
+
+    def on_execute(self) -> Iterator[None]:
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            yield
+            return
+        self.trace = SQLTrace(threshold=self.threshold)
+        token = current_sql_trace.set(self.trace)
+        try:
+            yield
+        finally:
+            current_sql_trace.reset(token)
+        result = self.execution_context.result
+        problems = self.trace.problems()
+        if self.strict and problems and result is not None:
+            result.errors = [
+                *(result.errors or ()),
+                *(GraphQLError(problem, extensions={'code': 'N_PLUS_ONE'}) for problem in problems),
+            ]
+
+    def resolve(
+        self,
+        _next: Callable[..., Any],
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        # the instance may belong to another operation, the trace is the one of the context
+        if current_sql_trace.get() is None or not has_resolver(info):
+            return _next(root, info, *args, **kwargs)
+        return self._resolve_with_path(_next, root, info, *args, **kwargs)
+
+    @staticmethod
+    async def _resolve_with_path(
+        _next: Callable[..., Any],
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        token = current_field_path.set('.'.join(map(str, info.path.as_list())))
+        try:
+            result = _next(root, info, *args, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
+        finally:
+            current_field_path.reset(token)
+
+    def get_results(self) -> dict[str, Any]:
+        if self.trace is None:
+            return {}
+        return {'sqlTrace': self.trace.as_dict()}
@@ -0,0 +1,53 @@
+from typing import AsyncGenerator
+
+import strawberry
+
+from product_service.api.graphql.v1.converters.review import StrawberryReviewConverter
+from product_service.api.graphql.v1.queries.review import Review
+from product_service.api.graphql.v1.resolvers.review import (
+    StrawberryReviewResolver,
+    review_added_topic,
+)
+from product_service.api.graphql.v1.utils import event_scope, get_container, get_selected_fields
+from product_service.core.constants import DEFAULT_PAGE_SIZE
+from product_service.core.broker import Broker
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    async def review_added(
+        self, product_id: strawberry.ID, info: strawberry.Info,
+    ) -> AsyncGenerator[Review, None]:
+        broker = await get_container(info).get(Broker)
+        async with broker.subscribe(review_added_topic(product_id)) as reviews:
+            async for review in reviews:
+                async with event_scope(info):
+                    yield StrawberryReviewConverter.convert(review)
+
+    @strawberry.subscription(
+        description=(
+            'Reviews of the product ordered by id, in batches read from a server-side cursor. '
+            'Each batch is sent as soon as it is read, e.g. over multipart HTTP'
+        ),
+    )
+    async def product_reviews(
+        self,
+        product_id: strawberry.ID,
+        info: strawberry.Info,
+        batch_size: int = DEFAULT_PAGE_SIZE,
+        after: strawberry.ID | None = None,
+    ) -> AsyncGenerator[list[Review], None]:
+        # one request scope for the whole stream, the cursor keeps its session open
+        async with event_scope(info) as state:
+            resolver = await get_container(info).get(StrawberryReviewResolver)
+            batches = resolver.stream_by_product(
+                product_id=product_id,
+                fields=get_selected_fields(info),
+                batch_size=batch_size,
+                after=after,
+            )
+            async for reviews in batches:
+                # batch loaders of nested fields do not keep results of previous batches
+                state.pop('loaders', None)
+                yield reviews
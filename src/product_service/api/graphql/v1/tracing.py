@@ -0,0 +1,67 @@
+from inspect import isawaitable
+from typing import Any, Callable, Iterator
+
+from graphql import GraphQLResolveInfo
+from strawberry.extensions import SchemaExtension
+
+from product_service.core.tracing import tracer
+
+
+def has_resolver(info: GraphQLResolveInfo) -> bool:
+    field = info.parent_type.fields.get(info.field_name)
+    definition = field.extensions.get('strawberry-definition') if field is not None else None
+    return getattr(definition, 'base_resolver', None) is not None
+
+
+class TracingExtension(SchemaExtension):
+    """
+    Record spans of the operation and its parsing, validation and execution,
+    every field with a resolver gets a span as well, fields read from attributes do not
+    """
+    def on_operation(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        with tracer.span('graphql.operation') as span:
+            yield
+            if span is not None:
+                # name and type are known once the document is parsed
+                span.set_attribute('graphql.operation.name', execution_context.operation_name or '')
+                if execution_context.operation_type is not None:
+                    span.set_attribute(
+                        'graphql.operation.type', execution_context.operation_type.value,
+                    )
+                result = execution_context.result
+                span.set_attribute('graphql.errors', len(result.errors or ()) if result else 0)
+
+    def on_parse(self) -> Iterator[None]:
+        with tracer.span('graphql.parse'):
+            yield
+
+    def on_validate(self) -> Iterator[None]:
+        with tracer.span('graphql.validate'):
+            yield
+
+    def on_execute(self) -> Iterator[None]:
+        with tracer.span('graphql.execute'):
+            yield
+
+    async def resolve(
+        self,
+        _next: Callable[..., Any],
+        root: Any,
+        info: GraphQLResolveInfo,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        if not tracer.enabled or not has_resolver(info):
+            result = _next(root, info, *args, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
+        with tracer.span(
+            f'graphql.resolve {info.parent_type.name}.{info.field_name}',
+            **{'graphql.field.path': '.'.join(map(str, info.path.as_list()))},
+        ):
+            result = _next(root, info, *args, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
@@ -1,7 +1,37 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Hashable, Iterator, Sequence, TypeVar
+
 import strawberry
 from dishka import AsyncContainer
 from fastapi import Request
-from strawberry.types.nodes import Selection
+from strawberry.extensions import SchemaExtension
+from strawberry.types.nodes import FragmentSpread, InlineFragment, Selection
+
+from product_service.api.graphql.v1.persisted_queries import current_operation
+from product_service.core.tracing import TracedContainer, tracer
+
+T = TypeVar('T')
+
+# State of the operation being executed. Operations of one websocket connection share
+# their context, the request container and batch loaders of events are kept here instead
+operation_state: ContextVar[dict[str, Any] | None] = ContextVar('operation_state', default=None)
+
+
+class OperationState(SchemaExtension):
+    """
+    Give every operation its own state. The dictionary is shared by the tasks graphql-core
+    creates to read events of subscriptions, a context variable set by them would not be
+    """
+
+    def on_operation(self) -> Iterator[None]:
+        previous = operation_state.get()
+        operation_state.set({})
+        try:
+            yield
+        finally:
+            # generators of subscriptions can be closed from another context
+            operation_state.set(previous)
 
 
 def get_required_fields(info: strawberry.Info) -> list[Selection]:
@@ -9,7 +39,85 @@ def get_required_fields(info: strawberry.Info) -> list[Selection]:
 
 
 def get_container(info: strawberry.Info) -> AsyncContainer:
-    """Return Dishka async container from request"""
+    """Return Dishka async container from request, resolved dependencies are traced if enabled"""
     request: Request = info.context['request']
-    container = request.state.dishka_container
+    state = operation_state.get()
+    container = (state and state.get('event_container')) or request.state.dishka_container
+    if tracer.enabled:
+        return TracedContainer(container)  # type: ignore[return-value]
     return container
+
+
+@asynccontextmanager
+async def event_scope(info: strawberry.Info) -> AsyncIterator[dict[str, Any]]:
+    """
+    Enter request scope for one event of a subscription, websocket connections
+    only enter session scope. Fields of the event get their own database session
+    and batch loaders, events of one subscription are resolved one after another.
+    Yields state of the operation, batch loaders are dropped by removing its "loaders"
+    """
+    state = operation_state.get()
+    assert state is not None, 'OperationState extension is not installed'
+    previous = {key: state.pop(key) for key in ('event_container', 'loaders') if key in state}
+    async with info.context['request'].state.dishka_container() as container:
+        state['event_container'] = container
+        try:
+            yield state
+        finally:
+            state.pop('event_container', None)
+            state.pop('loaders', None)
+            state.update(previous)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def selection_signature(selections: Sequence[Selection]) -> Hashable:
+    """Return hashable representation of the selection shape, including arguments"""
+    signature: list[Hashable] = []
+    for selection in selections:
+        if isinstance(selection, (FragmentSpread, InlineFragment)):
+            signature.append((selection.type_condition, selection_signature(selection.selections)))
+            continue
+        signature.append(
+            (selection.name, _freeze(selection.arguments), selection_signature(selection.selections))
+        )
+    return tuple(signature)
+
+
+def get_selected_fields(info: strawberry.Info) -> list[Selection]:
+    """
+    Return selections of the current field,
+    for persisted operations they are built once per field and variables
+    """
+    operation = current_operation.get()
+    if operation is None:
+        return info.selected_fields
+    raw_info = info._raw_info
+    key = (tuple(id(node) for node in raw_info.field_nodes), _freeze(raw_info.variable_values))
+    selections = operation.selections.get(key)
+    if selections is None:
+        selections = operation.remember(operation.selections, key, info.selected_fields)
+    return selections
+
+
+def derive_from_selections(fields: list[Selection], name: str, derive: Callable[[], T]) -> T:
+    """
+    Return value derived from selections, for persisted operations the value
+    is computed once for every list of selections returned by `get_selected_fields`
+    """
+    operation = current_operation.get()
+    if operation is None:
+        return derive()
+    key = (name, id(fields))
+    cached = operation.projections.get(key)
+    if cached is not None and cached[0] is fields:
+        return cached[1]
+    value = derive()
+    operation.remember(operation.projections, key, (fields, value))
+    return value
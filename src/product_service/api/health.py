@@ -0,0 +1,54 @@
+from typing import Any
+
+from dishka.integrations.fastapi import FromDishka, inject
+from fastapi import APIRouter, Response, status
+
+from product_service.api.graphql.v1.response_cache import response_cache
+from product_service.core.broker import InMemoryBroker
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.statements import statement_cache
+
+router = APIRouter(tags=['health'])
+
+
+@router.get('/live')
+async def live() -> dict[str, Any]:
+    return {'status': 'ok'}
+
+
+@router.get('/ready')
+@inject
+async def ready(response: Response, db: FromDishka[Database]) -> dict[str, Any]:
+    """Ready when the database answers within DB_READINESS_TIMEOUT"""
+    if not await db.ping():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {'status': 'unavailable', 'pool': db.pool_metrics()}
+    return {'status': 'ready', 'pool': db.pool_metrics()}
+
+
+@router.get('/pool')
+@inject
+async def pool(db: FromDishka[Database]) -> dict[str, Any]:
+    return db.pool_metrics()
+
+
+@router.get('/replicas')
+@inject
+async def replicas(db: FromDishka[Database]) -> dict[str, Any]:
+    return db.replicas.metrics()
+
+
+@router.get('/statements')
+async def statements() -> dict[str, Any]:
+    return statement_cache.metrics()
+
+
+@router.get('/response-cache')
+async def response_cache_metrics() -> dict[str, Any]:
+    return response_cache.metrics()
+
+
+@router.get('/subscriptions')
+@inject
+async def subscriptions(broker: FromDishka[InMemoryBroker]) -> dict[str, Any]:
+    return broker.metrics()
@@ -0,0 +1,79 @@
+from typing import Callable, Iterator
+
+from dishka.integrations.fastapi import FromDishka, inject
+from fastapi import APIRouter, Response
+
+from product_service.api.graphql.v1.response_cache import response_cache
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.statements import statement_cache
+from product_service.core.metrics import CONTENT_TYPE, CallbackMetric, registry
+
+router = APIRouter(tags=['metrics'])
+
+POOL_GAUGES = (
+    ('size', 'Connections kept by the pool'),
+    ('checked_in', 'Idle connections in the pool'),
+    ('checked_out', 'Connections in use'),
+    ('overflow', 'Connections opened over the pool size'),
+)
+# Metric name, key of the pool metrics, description
+POOL_COUNTERS = (
+    ('checkouts', 'checkouts', 'Connections checked out of the pool'),
+    ('timeouts', 'timeouts', 'Checkouts that timed out waiting for a connection'),
+    ('connects', 'connects', 'New database connections'),
+    ('wait_seconds', 'wait_seconds_total', 'Time spent waiting for a connection'),
+)
+
+
+def _sample(value: float) -> Callable[[], list[tuple[tuple[()], float]]]:
+    return lambda: [((), value)]
+
+
+def state_metrics(db: Database) -> Iterator[CallbackMetric]:
+    """Pool, replica and cache metrics read from their current state at collection time"""
+    pool = db.pool_metrics()
+    for name, documentation in POOL_GAUGES:
+        if name in pool:
+            yield CallbackMetric(f'db_pool_{name}', documentation, _sample(pool[name]))
+    for name, key, documentation in POOL_COUNTERS:
+        if key in pool:
+            yield CallbackMetric(
+                f'db_pool_{name}', documentation, _sample(pool[key]), type='counter',
+            )
+    replicas = db.replicas.metrics()
+    if replicas:
+        yield CallbackMetric(
+            'db_replica_healthy',
+            'Read replica passed its last health check',
+            lambda: [((name,), float(r['healthy'])) for name, r in replicas.items()],
+            labelnames=('replica',),
+        )
+        yield CallbackMetric(
+            'db_replica_connections',
+            'Connections of the read replica in use',
+            lambda: [((name,), r['connections']) for name, r in replicas.items()],
+            labelnames=('replica',),
+        )
+    for cache, cache_metrics in (
+        ('statement', statement_cache.metrics()),
+        ('response', response_cache.metrics()),
+    ):
+        for key in ('hits', 'misses', 'evictions'):
+            yield CallbackMetric(
+                f'{cache}_cache_{key}',
+                f'{cache.capitalize()} cache {key}',
+                _sample(cache_metrics[key]),
+                type='counter',
+            )
+    yield CallbackMetric('statement_cache_size', 'Cached statements', _sample(
+        statement_cache.metrics()['size'],
+    ))
+    yield CallbackMetric('response_cache_bytes', 'Size of cached responses', _sample(
+        response_cache.bytes,
+    ))
+
+
+@router.get('')
+@inject
+async def metrics(db: FromDishka[Database]) -> Response:
+    return Response(registry.collect(extra=state_metrics(db)), media_type=CONTENT_TYPE)
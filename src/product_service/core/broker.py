@@ -0,0 +1,128 @@
+import asyncio
+from collections import defaultdict
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import Any, AsyncIterator, Literal, Protocol
+
+from product_service.core import logger
+
+Overflow = Literal['wait', 'drop']
+
+
+class SubscriberDropped(Exception):
+    """Subscriber did not keep up with published messages and was unsubscribed"""
+
+
+class Broker(Protocol):
+    """
+    Publish/subscribe of messages by topic. The in-memory broker fans out messages
+    within one process, backends shared by several processes implement the same methods
+    """
+    async def publish(self, topic: str, message: Any) -> None:
+        ...
+
+    def subscribe(self, topic: str) -> AbstractAsyncContextManager[AsyncIterator[Any]]:
+        """Subscription to the topic as long as the context is entered"""
+        ...
+
+
+_DROPPED = object()
+
+
+class QueueSubscription:
+    __slots__ = ('queue', 'dropped')
+
+    def __init__(self, maxsize: int) -> None:
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    def drop(self) -> None:
+        """Discard pending messages and make the iterator raise SubscriberDropped"""
+        self.dropped = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_DROPPED)
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self
+
+    async def __anext__(self) -> Any:
+        message = await self.queue.get()
+        if message is _DROPPED:
+            raise SubscriberDropped('Subscriber was dropped for not keeping up with messages')
+        return message
+
+
+class InMemoryBroker:
+    """
+    Fan-out broker of one process: every topic has a set of subscribers, each with
+    a bounded queue. When the queue of a subscriber is full, publishing either waits
+    up to `publish_timeout` for the subscriber (`overflow='wait'`, backpressure on
+    publishers) or drops it right away (`overflow='drop'`), dropped subscribers
+    are unsubscribed
+    """
+    def __init__(
+        self,
+        maxsize: int = 100,
+        overflow: Overflow = 'wait',
+        publish_timeout: float = 1.0,
+    ) -> None:
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.publish_timeout = publish_timeout
+        self.topics: defaultdict[str, set[QueueSubscription]] = defaultdict(set)
+        self.published = 0
+        self.dropped = 0
+
+    async def publish(self, topic: str, message: Any) -> None:
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return
+        self.published += 1
+        waiting = []
+        for subscriber in tuple(subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                if self.overflow == 'drop':
+                    self._drop(topic, subscriber)
+                else:
+                    waiting.append(self._put(topic, subscriber, message))
+        if waiting:
+            await asyncio.gather(*waiting)
+
+    async def _put(self, topic: str, subscriber: QueueSubscription, message: Any) -> None:
+        try:
+            await asyncio.wait_for(subscriber.queue.put(message), self.publish_timeout)
+        except asyncio.TimeoutError:
+            self._drop(topic, subscriber)
+
+    def _drop(self, topic: str, subscriber: QueueSubscription) -> None:
+        logger.warning(f'Dropped slow subscriber of {topic}')
+        self.dropped += 1
+        self._unsubscribe(topic, subscriber)
+        subscriber.drop()
+
+    def _unsubscribe(self, topic: str, subscriber: QueueSubscription) -> None:
+        subscribers = self.topics.get(topic)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self.topics[topic]
+
+    @asynccontextmanager
+    async def subscribe(self, topic: str) -> AsyncIterator[QueueSubscription]:
+        subscriber = QueueSubscription(self.maxsize)
+        self.topics[topic].add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            self._unsubscribe(topic, subscriber)
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            'topics': len(self.topics),
+            'subscribers': sum(len(s) for s in self.topics.values()),
+            'published': self.published,
+            'dropped': self.dropped,
+        }
@@ -3,3 +3,5 @@ APP_DESCRIPTION = """
 """
 
 APP_TITLE = 'Product Service'
+
+DEFAULT_PAGE_SIZE = 20
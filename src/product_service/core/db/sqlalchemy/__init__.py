@@ -1,26 +1,145 @@
 import asyncio
+import time
+from typing import Any
 
+import sqlalchemy as sql
 from sqlalchemy import event
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
 from product_service.core import logger
+from product_service.core.metrics import current_operation_stats
 from product_service.core.settings import config
+from product_service.core.tracing import tracer
 
 from .models import Base
+from .pool import InstrumentedAsyncAdaptedQueuePool
+from .query_log import QueryLog
+from .replicas import PRIMARY, SESSIONS, ReplicaSet, Route, current_route
+from .search import PRODUCT_SEARCH  # noqa: F401  search indexes are created with their tables
+from .session import SerializedAsyncSession
+from .sql_trace import current_sql_trace
+
+
+def fetched_rows(cursor: Any) -> int:
+    """Rows selected or changed by the last statement of the cursor"""
+    # async adapted cursors buffer selected rows, rowcount is only set for DML
+    rows = getattr(cursor, '_rows', None)
+    return len(rows) if rows is not None else cursor.rowcount
 
 
 class Database:
-    def __init__(self) -> None:
+    def __init__(self, url: str | None = None, replica_urls: list[str] | None = None) -> None:
         self.config = config
-        self.engine = create_async_engine(config.postgres_connection_string)
+        url = url or config.database_url
+        if replica_urls is None:
+            replica_urls = config.DATABASE_REPLICA_URLS
+        self.engine = create_async_engine(url, **self._engine_options(url))
+        self.replicas = ReplicaSet(
+            [create_async_engine(u, **self._engine_options(u)) for u in replica_urls],
+            balancing=config.DB_REPLICA_BALANCING,
+            check_timeout=config.DB_READINESS_TIMEOUT,
+        )
         self.async_session_factory = async_sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False
+            self.engine, class_=SerializedAsyncSession, expire_on_commit=False
         )
-        self.listen_for_events()
+        self.query_log = QueryLog(
+            sample_rate=1.0 if self.config.LISTEN_SQL_QUERIES else self.config.SQL_LOG_SAMPLE_RATE,
+            slow_threshold=(
+                self.config.SQL_LOG_SLOW_THRESHOLD_MS / 1000
+                if self.config.SQL_LOG_SLOW_THRESHOLD_MS is not None else None
+            ),
+            log_parameters=self.config.SQL_LOG_PARAMETERS,
+        )
+        for engine in self.engines:
+            self.log_statements(engine)
+            self.trace_statements(engine)
+            self.count_statements(engine)
+            self.record_statements(engine)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        """Primary engine followed by engines of the read replicas"""
+        return [self.engine, *(replica.engine for replica in self.replicas.replicas)]
+
+    def _route(self, route: Route) -> AsyncEngine:
+        replica = self.replicas.choose() if route == 'read' else None
+        if self.replicas:
+            SESSIONS.labels(replica.name if replica else PRIMARY, route).inc()
+        return replica.engine if replica is not None else self.engine
+
+    def session(self) -> SerializedAsyncSession:
+        """
+        Session of the current operation: on a healthy replica when the operation
+        only reads, otherwise on the primary
+        """
+        engine = self._route(current_route.get())
+        if engine is self.engine:
+            return self.async_session_factory()
+        return self.async_session_factory(bind=engine)
+
+    def read_engine(self) -> AsyncEngine:
+        """Engine of a healthy replica for reads that may lag behind, else the primary"""
+        return self._route('read')
+
+    def _engine_options(self, url: str) -> dict[str, Any]:
+        _url = make_url(url)
+        if _url.get_backend_name() == 'sqlite' and _url.database in (None, '', ':memory:'):
+            # in-memory SQLite lives in a single connection, pooling does not apply
+            return {}
+        options: dict[str, Any] = {
+            'poolclass': InstrumentedAsyncAdaptedQueuePool,
+            'pool_size': self.config.DB_POOL_SIZE,
+            'max_overflow': self.config.DB_MAX_OVERFLOW,
+            'pool_timeout': self.config.DB_POOL_TIMEOUT,
+            'pool_recycle': self.config.DB_POOL_RECYCLE,
+            'pool_pre_ping': self.config.DB_POOL_PRE_PING,
+        }
+        if _url.get_driver_name() == 'asyncpg':
+            options['connect_args'] = {
+                'prepared_statement_cache_size': self.config.DB_STATEMENT_CACHE_SIZE,
+                'statement_cache_size': self.config.DB_STATEMENT_CACHE_SIZE,
+            }
+        return options
+
+    def pool_metrics(self) -> dict[str, Any]:
+        pool = self.engine.pool
+        if isinstance(pool, InstrumentedAsyncAdaptedQueuePool):
+            return pool.metrics()
+        return {}
+
+    async def warm_up(self, connections: int | None = None) -> int:
+        """
+        Open connections ahead of traffic, they are returned to the pool right away.
+        Returns number of opened connections
+        """
+        if connections is None:
+            connections = self.config.DB_POOL_WARM_UP
+        if connections is None:
+            connections = self.config.DB_POOL_SIZE
+        if not isinstance(self.engine.pool, InstrumentedAsyncAdaptedQueuePool):
+            return 0
+        try:
+            opened = await asyncio.gather(*(self.engine.connect() for _ in range(connections)))
+        except Exception as e:
+            logger.warning(f'Connection pool warm up failed: {e!r}')
+            return 0
+        await asyncio.gather(*(conn.close() for conn in opened))
+        logger.info(f'Connection pool warmed up with {len(opened)} connections')
+        return len(opened)
+
+    async def ping(self, timeout: float | None = None) -> bool:
+        """Check that database accepts queries within timeout"""
+        async def execute() -> None:
+            async with self.engine.connect() as conn:
+                await conn.execute(sql.text('SELECT 1'))
+
+        try:
+            await asyncio.wait_for(execute(), timeout or self.config.DB_READINESS_TIMEOUT)
+        except Exception as e:
+            logger.warning(f'Database is not ready: {e!r}')
+            return False
+        return True
 
     def init(self):
         asyncio.run(self.create())
@@ -33,10 +152,89 @@ class Database:
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
 
-    def listen_for_events(self) -> None:
-        if self.config.LISTEN_SQL_QUERIES:
-            @event.listens_for(self.engine.sync_engine, 'before_execute')
-            def sql_statement_listener(conn, clauseelement, multiparams, params):
-                if config.DEBUG:
-                    print(f'{'SQL stmt':-^40}\n{clauseelement}\n{'':-^40}')
-                logger.info(f'SQL stmt: {clauseelement}')
+    def log_statements(self, engine: AsyncEngine) -> None:
+        """
+        Time statements and pass them to the SQL log, listeners are not installed
+        when neither sampling nor the slow statement threshold is configured
+        """
+        if not self.query_log.enabled:
+            return
+        sync_engine = engine.sync_engine
+        query_log = self.query_log
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def start_statement(conn, cursor, statement, parameters, context, executemany):
+            context._query_log_start = time.perf_counter()
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def log_statement(conn, cursor, statement, parameters, context, executemany):
+            duration = time.perf_counter() - context._query_log_start
+            query_log.record(
+                statement, parameters, duration, fetched_rows(cursor), executemany=executemany,
+            )
+
+        @event.listens_for(sync_engine, 'handle_error')
+        def log_failed_statement(exception_context):
+            context = exception_context.execution_context
+            start = getattr(context, '_query_log_start', None) if context is not None else None
+            if start is not None:
+                query_log.record(
+                    exception_context.statement,
+                    exception_context.parameters,
+                    time.perf_counter() - start,
+                    executemany=context.executemany,
+                    error=exception_context.original_exception,
+                )
+
+    def trace_statements(self, engine: AsyncEngine) -> None:
+        """Record a span for every statement sent to the database while tracing is enabled"""
+        sync_engine = engine.sync_engine
+        system = sync_engine.dialect.name
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def start_statement_span(conn, cursor, statement, parameters, context, executemany):
+            if tracer.enabled:
+                context._trace_span = tracer.start_span(
+                    'sql', {'db.system': system, 'db.statement': statement},
+                )
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def end_statement_span(conn, cursor, statement, parameters, context, executemany):
+            span = getattr(context, '_trace_span', None)
+            if span is not None:
+                span.set_attribute('db.rows', fetched_rows(cursor))
+                tracer.end_span(span)
+                context._trace_span = None
+
+        @event.listens_for(sync_engine, 'handle_error')
+        def end_failed_statement_span(exception_context):
+            context = exception_context.execution_context
+            span = getattr(context, '_trace_span', None)
+            if span is not None:
+                tracer.end_span(span, exception_context.original_exception)
+                context._trace_span = None
+
+    def count_statements(self, engine: AsyncEngine) -> None:
+        """Count statements and fetched rows of the current GraphQL operation"""
+        @event.listens_for(engine.sync_engine, 'after_cursor_execute')
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            stats = current_operation_stats.get()
+            if stats is not None:
+                stats.statements += 1
+                stats.rows += max(fetched_rows(cursor), 0)
+
+    def record_statements(self, engine: AsyncEngine) -> None:
+        """Add statements to the SQL trace of the current operation when it is traced"""
+        sync_engine = engine.sync_engine
+
+        @event.listens_for(sync_engine, 'before_cursor_execute')
+        def start_statement(conn, cursor, statement, parameters, context, executemany):
+            if current_sql_trace.get() is not None:
+                context._sql_trace_start = time.perf_counter()
+
+        @event.listens_for(sync_engine, 'after_cursor_execute')
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            trace = current_sql_trace.get()
+            start = getattr(context, '_sql_trace_start', None)
+            if trace is not None and start is not None:
+                trace.record(statement, time.perf_counter() - start, fetched_rows(cursor))
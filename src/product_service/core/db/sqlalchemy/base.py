@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Any
+from typing import Any, AsyncIterator, Sequence
 
 import sqlalchemy as sql
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,10 +10,11 @@ class BaseSQLAlchemyGateway:
         self.session = session
 
     @abstractmethod
-    def _construct_select_query(self, *args, **queries) -> sql.Select:
+    def _construct_select_query(self, *args, **queries) -> tuple[sql.Select, dict[str, Any]]:
         """
         Implement the method to make "_execute_query" work,
-        params can be overriden with specific ones
+        params can be overriden with specific ones.
+        Returns statement with bind parameters and values for them
         """
 
     async def _execute_query(
@@ -22,8 +23,25 @@ class BaseSQLAlchemyGateway:
         first: bool = False,
         **kwargs,
     ) -> list[tuple[Any, ...]] | tuple[Any, ...]:
-        stmt = self._construct_select_query(*args, **kwargs)
-        result = await self.session.execute(stmt)
+        stmt, parameters = self._construct_select_query(*args, **kwargs)
+        result = await self.session.execute(stmt, parameters)
         if first:
             return result.first()  # type: ignore
         return result.all()  # type: ignore
+
+    async def _stream_query(
+        self,
+        *args,
+        batch_size: int,
+        **kwargs,
+    ) -> AsyncIterator[Sequence[tuple[Any, ...]]]:
+        """
+        Same query as "_execute_query", rows are fetched from a server-side cursor
+        and yielded in batches of `batch_size` rows
+        """
+        stmt, parameters = self._construct_select_query(*args, **kwargs)
+        result = await self.session.stream(
+            stmt.execution_options(yield_per=batch_size), parameters,
+        )
+        async for rows in result.partitions():
+            yield rows
@@ -0,0 +1,193 @@
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Literal
+
+import sqlalchemy as sql
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from . import Database
+from .constraints import column_converter
+from .models import TABLES
+
+Format = Literal['csv', 'ndjson']
+
+FORMATS: dict[str, Format] = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+DEFAULT_CHUNK_SIZE = 10_000
+# Rejected rows kept in the report, the rest are only counted
+MAX_REPORTED_REJECTS = 20
+
+
+@dataclass(slots=True)
+class RejectedRow:
+    line: int
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    table: str
+    imported: int = 0
+    rejected: int = 0
+    rejects: list[RejectedRow] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejects) < MAX_REPORTED_REJECTS:
+            self.rejects.append(RejectedRow(line, reason))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'table': self.table,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'seconds': round(self.elapsed, 3),
+            'rowsPerSecond': round(self.rows_per_second, 1),
+            'rejects': [{'line': r.line, 'reason': r.reason} for r in self.rejects],
+        }
+
+
+def read_rows(path: str | Path, format: Format | None = None) -> Iterator[tuple[int, dict]]:
+    """Yields line numbers with rows of a CSV file with a header or of a NDJSON file"""
+    path = Path(path)
+    format = format or FORMATS.get(path.suffix.lower())
+    if format is None:
+        raise ValueError(f'Unknown format of {path}, expected one of {", ".join(FORMATS)}')
+    with path.open(newline='' if format == 'csv' else None, encoding='utf-8') as file:
+        if format == 'csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line, text in enumerate(file, start=1):
+            if text.strip():
+                yield line, json.loads(text)
+
+
+def import_columns(table: sql.Table, header: Iterable[str]) -> tuple[str, ...]:
+    """Columns filled by the import: all columns, primary key only when the file has it"""
+    header = set(header)
+    return tuple(c.key for c in table.columns if not c.primary_key or c.key in header)
+
+
+def validate_rows(
+    table: sql.Table,
+    columns: tuple[str, ...],
+    rows: Iterable[tuple[int, dict]],
+    report: ImportReport,
+) -> Iterator[tuple[int, tuple]]:
+    """Yields line numbers with records of converted values, invalid rows are rejected"""
+    converters = [(key, column_converter(table.c[key])) for key in columns]
+    for line, row in rows:
+        try:
+            record = tuple(convert(row.get(key)) for key, convert in converters)
+        except (TypeError, ValueError) as e:
+            report.reject(line, str(e))
+            continue
+        yield line, record
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+async def reject_missing_references(
+    conn: AsyncConnection,
+    table: sql.Table,
+    columns: tuple[str, ...],
+    chunk: list[tuple[int, tuple]],
+    report: ImportReport,
+) -> list[tuple[int, tuple]]:
+    """Drop records that reference rows that do not exist, one query per foreign key"""
+    for index, key in enumerate(columns):
+        for foreign_key in table.c[key].foreign_keys:
+            referenced = foreign_key.column
+            ids = {record[index] for _, record in chunk}
+            result = await conn.execute(sql.select(referenced).where(referenced.in_(ids)))
+            existing = set(result.scalars())
+            valid = []
+            for line, record in chunk:
+                if record[index] in existing:
+                    valid.append((line, record))
+                else:
+                    report.reject(line, f'{referenced.table.name} {record[index]} does not exist')
+            chunk = valid
+    return chunk
+
+
+async def write_records(
+    conn: AsyncConnection,
+    table: sql.Table,
+    columns: tuple[str, ...],
+    records: list[tuple],
+) -> None:
+    """Binary COPY with asyncpg, batched INSERT with other drivers"""
+    if conn.dialect.driver == 'asyncpg':
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+            table.name, records=records, columns=columns,
+        )
+        return
+    await conn.execute(table.insert(), [dict(zip(columns, record)) for record in records])
+
+
+async def reset_sequence(conn: AsyncConnection, table: sql.Table) -> None:
+    """Move the id sequence past imported ids, Postgres does not do it for explicit ids"""
+    if conn.dialect.name == 'postgresql':
+        await conn.execute(sql.text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f'coalesce(max(id), 0) + 1, false) FROM {table.name}'
+        ))
+
+
+async def import_file(
+    db: Database,
+    table_name: str,
+    path: str | Path,
+    format: Format | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """
+    Stream rows of the file into the table. Rows are read, validated and written
+    chunk by chunk, so memory does not grow with the file. Every chunk is committed
+    separately, an interrupted import keeps the chunks written before
+    """
+    table = TABLES[table_name]
+    report = ImportReport(table=table_name)
+    rows = read_rows(path, format)
+    first = next(rows, None)
+    if first is None:
+        report.finished = time.perf_counter()
+        return report
+    columns = import_columns(table, first[1])
+    records = validate_rows(table, columns, chain([first], rows), report)
+    async with db.engine.connect() as conn:
+        for chunk in chunked(records, chunk_size):
+            async with conn.begin():
+                chunk = await reject_missing_references(conn, table, columns, chunk, report)
+                if chunk:
+                    await write_records(conn, table, columns, [record for _, record in chunk])
+            report.imported += len(chunk)
+            if on_progress is not None:
+                on_progress(report)
+        if 'id' in columns:
+            async with conn.begin():
+                await reset_sequence(conn, table)
+    report.finished = time.perf_counter()
+    return report
@@ -0,0 +1,23 @@
+from typing import Any, Callable
+
+import sqlalchemy as sql
+
+
+def column_converter(column: sql.Column) -> Callable[[Any], Any]:
+    """
+    Converts values written to the column, raises ValueError for values the column
+    does not accept, checked before writing since SQLite does not enforce lengths
+    """
+    length = getattr(column.type, 'length', None)
+    integer = isinstance(column.type, sql.Integer)
+
+    def convert(value: Any) -> Any:
+        if value is None or (value == '' and integer):
+            raise ValueError(f'"{column.key}" is required')
+        if integer:
+            return int(value)
+        value = str(value)
+        if length is not None and len(value) > length:
+            raise ValueError(f'"{column.key}" is longer than {length} characters')
+        return value
+    return convert
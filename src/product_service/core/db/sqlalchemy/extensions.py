@@ -1,12 +1,31 @@
-from typing import Any, Callable, Type, TypeVar
+import dataclasses
+from typing import Any, Callable, Iterator, Sequence, Type, TypeVar
 
 import sqlalchemy as sql
+from sqlalchemy.orm.attributes import InstrumentedAttribute
 
-from product_service.core.exceptions import ObjectDoesNotExistException
-from product_service.core.dto import BaseDTO, Entity, UserDTO, ReviewDTO, ProductDTO, SelectedFields
+from product_service.core.exceptions import (
+    ApplicationException,
+    InvalidValueException,
+    ObjectDoesNotExistException,
+)
+from product_service.core.dto import (
+    BaseDTO,
+    Entity,
+    ProductDTO,
+    ProductRow,
+    ReviewDTO,
+    ReviewRow,
+    SelectedFields,
+    UserDTO,
+    UserRow,
+)
+from product_service.core.settings import config
 from product_service.core.utils import raise_exc
 
+from .constraints import column_converter
 from .models import UserORM, ProductORM, ReviewORM
+from .statements import query_shape, statement_cache
 
 
 MODELS_RELATED_TO_DTO = {
@@ -15,6 +34,12 @@ MODELS_RELATED_TO_DTO = {
     ReviewORM: ReviewDTO,
 }
 
+MODELS_RELATED_TO_ROW = {
+    UserORM: UserRow,
+    ProductORM: ProductRow,
+    ReviewORM: ReviewRow,
+}
+
 SQLAlchemyModel = TypeVar('SQLAlchemyModel', bound=UserORM | ProductORM | ReviewORM)
 TypeDTO = TypeVar('TypeDTO', bound=BaseDTO)
 
@@ -26,7 +51,9 @@ def sqlalchemy_crud(
     add: bool = True,
     update: bool = True,
     delete: bool = True,
+    count: bool = True,
     query_executor: bool = True,
+    bulk: bool = True,
 ) -> Callable | type:
     """
     Extend repository class with the following methods:
@@ -34,6 +61,12 @@ def sqlalchemy_crud(
     * add
     * update
     * delete
+    * count
+
+    if `bulk=True`:
+    * add_many
+    * update_many
+    * delete_many
 
     if `query_executor=True`:
     * _construct_select_query
@@ -61,6 +94,12 @@ def sqlalchemy_crud(
             setattr(cls, 'update', _update_method(model=_model))
         if get:
             setattr(cls, 'get', _get_method(model=_model))
+        if count:
+            setattr(cls, 'count', _count_method(model=_model))
+        if bulk:
+            setattr(cls, 'add_many', _add_many_method(model=_model))
+            setattr(cls, 'update_many', _update_many_method(model=_model))
+            setattr(cls, 'delete_many', _delete_many_method(model=_model))
         if query_executor:
             setattr(cls, '_construct_select_query', _select_query_constructor(model=_model))
             setattr(cls, '_execute_query', _query_executor())
@@ -86,15 +125,15 @@ def _add_method(model: Type[SQLAlchemyModel]) -> Callable:
 
 
 def _get_method(model: Type[SQLAlchemyModel]) -> Callable:
-    async def get(self, id: int, fields: list[SelectedFields]) -> TypeDTO:
+    async def get(self, id: int, fields: list[SelectedFields]) -> Any:
         values = await self._execute_query(fields=fields, id=id, first=True)
         if not values:
             raise ObjectDoesNotExistException(model.__name__, object_id=id)
         data = {}
         for i, field in enumerate(fields[0].fields):
             data[field] = values[i]
-        dto_class = MODELS_RELATED_TO_DTO[model]
-        return dto_class(**data)
+        row_class = MODELS_RELATED_TO_ROW[model]
+        return row_class(**data)
     return get
 
 
@@ -131,6 +170,184 @@ def _delete_method(model: Type[SQLAlchemyModel]) -> Callable:
     return delete
 
 
+def _count_method(model: Type[SQLAlchemyModel]) -> Callable:
+    async def count(self) -> int:
+        stmt = sql.select(sql.func.count()).select_from(model)
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+    return count
+
+
+def _chunks(items: Sequence[Any], size: int | None) -> Iterator[tuple[int, Sequence[Any]]]:
+    """Yields offsets of chunks of `items` with the chunks"""
+    size = size or config.BULK_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def _invalid_values(
+    model: Type[SQLAlchemyModel],
+    rows: Sequence[dict[str, Any]],
+) -> dict[int, ApplicationException]:
+    """Returns errors by index of `rows` with values that columns of `model` do not accept"""
+    converters = {
+        column.key: column_converter(column)
+        for column in model.__table__.columns
+        if not column.primary_key
+    }
+    errors: dict[int, ApplicationException] = {}
+    for i, row in enumerate(rows):
+        try:
+            for key, value in row.items():
+                if key in converters:
+                    converters[key](value)
+        except (TypeError, ValueError) as e:
+            errors[i] = InvalidValueException(str(e))
+    return errors
+
+
+async def _missing_references(
+    session: Any,
+    model: Type[SQLAlchemyModel],
+    rows: Sequence[dict[str, Any]],
+) -> dict[int, ApplicationException]:
+    """
+    Returns errors by index of `rows` that reference rows that do not exist,
+    every foreign key is checked with one query
+    """
+    errors: dict[int, ApplicationException] = {}
+    for column in model.__table__.columns:
+        for foreign_key in column.foreign_keys:
+            ids = {row[column.key] for row in rows if column.key in row}
+            if not ids:
+                continue
+            referenced = foreign_key.column
+            result = await session.execute(sql.select(referenced).where(referenced.in_(ids)))
+            existing = set(result.scalars())
+            referenced_model = next(
+                m for m in MODELS_RELATED_TO_DTO if m.__table__ is referenced.table
+            )
+            for i, row in enumerate(rows):
+                if i not in errors and column.key in row and row[column.key] not in existing:
+                    errors[i] = ObjectDoesNotExistException(
+                        referenced_model.__name__, object_id=row[column.key],
+                    )
+    return errors
+
+
+async def _item_errors(
+    session: Any,
+    model: Type[SQLAlchemyModel],
+    rows: Sequence[dict[str, Any]],
+) -> dict[int, ApplicationException]:
+    """Errors by index of `rows` that can not be written, the rest of a batch is written"""
+    errors = await _missing_references(session, model, rows)
+    errors.update(_invalid_values(model, rows))
+    return errors
+
+
+def _add_many_method(model: Type[SQLAlchemyModel]) -> Callable:
+    async def add_many(
+        self,
+        dtos: Sequence[TypeDTO],
+        chunk_size: int | None = None,
+    ) -> list[TypeDTO | ApplicationException]:
+        """
+        Insert entities with one multi-row INSERT ... RETURNING per chunk in one transaction.
+        Returns the entities with ids or errors of the entities that were not inserted
+        """
+        results: list[TypeDTO | ApplicationException] = list(dtos)
+        for start, chunk in _chunks(dtos, chunk_size):
+            rows = [dto.model_dump(exclude={'id'}) for dto in chunk]
+            errors = await _item_errors(self.session, model, rows)
+            valid = [i for i in range(len(chunk)) if i not in errors]
+            if valid:
+                stmt = sql.insert(model).returning(model.id, sort_by_parameter_order=True)
+                result = await self.session.execute(stmt, [rows[i] for i in valid])
+                for i, id in zip(valid, result.scalars()):
+                    chunk[i].id = id
+            for i, error in errors.items():
+                results[start + i] = error
+        await self.session.commit()
+        return results
+    return add_many
+
+
+def _update_many_method(model: Type[SQLAlchemyModel]) -> Callable:
+    async def update_many(
+        self,
+        items: Sequence[tuple[int, TypeDTO]],
+        chunk_size: int | None = None,
+    ) -> list[TypeDTO | ApplicationException]:
+        """
+        Update entities by primary key in one transaction: existing rows of a chunk are
+        selected with one query and updated with one executemany UPDATE.
+        Returns updated entities or errors of the entities that were not updated
+        """
+        dto_class = MODELS_RELATED_TO_DTO[model]
+        results: list[TypeDTO | ApplicationException] = []
+        for _, chunk in _chunks(items, chunk_size):
+            rows = [{**dto.model_dump(exclude={'id'}), 'id': id} for id, dto in chunk]
+            errors = await _item_errors(self.session, model, rows)
+            result = await self.session.execute(
+                sql.select(model).where(model.id.in_([id for id, _ in chunk])),
+            )
+            existing = {entity.id: entity.as_dict() for entity in result.scalars()}
+            for i, row in enumerate(rows):
+                if i not in errors and row['id'] not in existing:
+                    errors[i] = ObjectDoesNotExistException(model.__name__, object_id=row['id'])
+            valid = [row for i, row in enumerate(rows) if i not in errors]
+            if valid:
+                await self.session.execute(sql.update(model), valid)
+            results.extend(
+                errors[i] if i in errors else dto_class(**{**existing[row['id']], **row})
+                for i, row in enumerate(rows)
+            )
+        await self.session.commit()
+        return results
+    return update_many
+
+
+def _delete_many_method(model: Type[SQLAlchemyModel]) -> Callable:
+    async def delete_many(
+        self,
+        ids: Sequence[int],
+        chunk_size: int | None = None,
+    ) -> list[int | ApplicationException]:
+        """
+        Delete entities and rows of their cascaded relationships
+        with one DELETE ... RETURNING per table and chunk in one transaction.
+        Returns deleted ids or errors of the ids that were not found
+        """
+        cascaded = [
+            (relationship.mapper.class_, next(iter(relationship.remote_side)))
+            for relationship in sql.inspect(model).relationships
+            if relationship.cascade.delete
+        ]
+        results: list[int | ApplicationException] = []
+        for _, chunk in _chunks(ids, chunk_size):
+            for related_model, parent_column in cascaded:
+                await self.session.execute(
+                    sql.delete(related_model)
+                    .where(parent_column.in_(chunk))
+                    .execution_options(synchronize_session=False)
+                )
+            result = await self.session.execute(
+                sql.delete(model)
+                .where(model.id.in_(chunk))
+                .returning(model.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted = set(result.scalars())
+            results.extend(
+                id if id in deleted else ObjectDoesNotExistException(model.__name__, object_id=id)
+                for id in chunk
+            )
+        await self.session.commit()
+        return results
+    return delete_many
+
+
 def _query_executor() -> Callable:
     async def execute_query(
         self,
@@ -138,8 +355,8 @@ def _query_executor() -> Callable:
         first: bool = False,
         **kwargs,
     ) -> list[tuple[Any]] | tuple[Any]:
-        stmt = self._construct_select_query(*args, **kwargs)
-        result = await self.session.execute(stmt)
+        stmt, parameters = self._construct_select_query(*args, **kwargs)
+        result = await self.session.execute(stmt, parameters)
         if first:
             return result.first()  # type: ignore
         return result.all()  # type: ignore
@@ -147,26 +364,37 @@ def _query_executor() -> Callable:
 
 
 def _select_query_constructor(model: Type[SQLAlchemyModel]):
+    def build_select_query(
+        columns: tuple[str, ...],
+        filter_name: str | None,
+        paging: tuple[str, ...],
+    ) -> sql.Select:
+        stmt = sql.select(*(getattr(model, f) for f in columns))
+        if filter_name == 'id':
+            stmt = stmt.where(model.id == sql.bindparam('id'))
+        elif filter_name == 'ids':
+            stmt = stmt.where(model.id.in_(sql.bindparam('ids', expanding=True)))
+        if 'after' in paging:
+            stmt = stmt.where(model.id > sql.bindparam('after'))
+        if 'limit' in paging:
+            stmt = stmt.order_by(model.id).limit(sql.bindparam('limit', type_=sql.Integer))
+        return stmt
+
     def construct_select_query(
         self,
         fields: list[SelectedFields],
         **queries,
-    ) -> sql.Select:
-        object_id = queries.get('id', None)
+    ) -> tuple[sql.Select, dict[str, Any]]:
         _fields = fields[0].fields if len(fields) > 0 else raise_exc(
             Exception('Fields not selected'),
         )
-        fields_to_select = [getattr(model, f) for f in _fields]
-        offset = queries.get('offset', None)
-        limit = queries.get('limit', None)
-        stmt = sql.select(*fields_to_select)
-        if object_id is not None:
-            stmt = stmt.where(model.id == object_id)
-        if offset is not None:
-            stmt = stmt.offset(offset)
-        if limit is not None:
-            stmt = stmt.limit(limit)
-        return stmt
+        columns = tuple(_fields)
+        filter_name, paging, parameters = query_shape(queries, filters=('id', 'ids'))
+        stmt = statement_cache.get(
+            (model, columns, filter_name, paging),
+            lambda: build_select_query(columns, filter_name, paging),
+        )
+        return stmt, parameters
     return construct_select_query
 
 
@@ -187,3 +415,86 @@ def models_to_join(fields: list[SelectedFields]) -> tuple[bool, bool, bool]:
         elif field.owner.lower() in Entity.REVIEW + 's':
             join_review = True
     return join_user, join_product, join_review
+
+
+def with_primary_key(fields: list[SelectedFields]) -> list[SelectedFields]:
+    """
+    Returns copy of `fields` where the root selection contains `id`,
+    batch queries need it to match rows with requested keys
+    """
+    root = fields[0] if len(fields) > 0 else raise_exc(Exception('Fields not selected'))
+    if 'id' in root.fields:
+        return fields
+    root = SelectedFields(owner=root.owner, all=root.all, fields=['id', *root.fields])
+    return [root, *fields[1:]]
+
+
+def project_columns(
+    fields: list[SelectedFields],
+    model: Type[SQLAlchemyModel],
+) -> list[SelectedFields]:
+    """
+    Returns copy of `fields` where the root selection keeps only columns of `model`
+    and always starts with the primary key
+    """
+    root = fields[0] if len(fields) > 0 else raise_exc(Exception('Fields not selected'))
+    columns = model.__table__.columns
+    projected = ['id', *(f for f in root.fields if f != 'id' and f in columns)]
+    if projected == root.fields:
+        return fields
+    root = dataclasses.replace(root, fields=projected)
+    return [root, *fields[1:]]
+
+
+def related_columns(
+    fields: list[SelectedFields],
+    owner: str,
+    model: Type[SQLAlchemyModel],
+) -> tuple[str, ...]:
+    """
+    Returns columns of `model` selected by nested selections of `owner`,
+    primary key included, or empty tuple when `owner` is not selected
+    """
+    related = [f for f in fields[1:] if f.owner == owner]
+    if not related:
+        return ()
+    columns = model.__table__.columns
+    selected = {f for field in related for f in field.fields if f in columns}
+    return ('id', *sorted(selected - {'id'}))
+
+
+def related_to_prefetch(fields: list[SelectedFields], owner: str) -> list[SelectedFields] | None:
+    """
+    Returns selection of the related list that can be loaded together with its parents:
+    fields of the list followed by selections nested into it.
+
+    `None` when the list is not requested or requested several times,
+    e.g. with aliases and different arguments
+    """
+    related = [f for f in fields if f.owner == owner]
+    if len(related) != 1:
+        return None
+    return fields[fields.index(related[0]):]
+
+
+def rank_per_parent(
+    stmt: sql.Select,
+    parent_column: InstrumentedAttribute,
+    parent_ids: Sequence[int] | sql.BindParameter,
+    order_by: InstrumentedAttribute,
+) -> sql.Subquery:
+    """
+    Returns `stmt` filtered by `parent_ids` as subquery with extra `position` column,
+    rows of every parent are numbered separately with a window function
+    """
+    position = sql.func.row_number().over(partition_by=parent_column, order_by=order_by)
+    stmt = stmt.add_columns(position.label('position')).where(parent_column.in_(parent_ids))
+    return stmt.subquery()
+
+
+def page_per_parent(
+    ranked: sql.Subquery,
+    limit: int | sql.BindParameter,
+) -> sql.ColumnElement[bool]:
+    """Returns criteria that keep first `limit` rows for each parent of `rank_per_parent`"""
+    return ranked.c.position <= limit
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import sqlalchemy as sql
+
+from . import Database
+
+
+class SchemaVersionMismatch(Exception):
+    def __init__(self, database: set[str], expected: set[str]) -> None:
+        self.database = database
+        self.expected = expected
+        super().__init__(
+            f'Database schema is at revision {", ".join(sorted(database)) or "none"}, '
+            f'expected {", ".join(sorted(expected))}, run "alembic upgrade head"'
+        )
+
+
+def head_revisions(config_path: str | Path = 'alembic.ini') -> set[str]:
+    """Head revisions of the migration scripts, read without connecting to the database"""
+    # alembic takes a tenth of a second to import, commands other than serve do not need it
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    config_path = Path(config_path)
+    config = AlembicConfig(str(config_path))
+    location = config.get_main_option('script_location') or 'alembic'
+    config.set_main_option('script_location', str(config_path.parent / location))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+async def database_revisions(db: Database) -> set[str]:
+    """Revisions stamped in the database, empty when migrations were never applied"""
+    async with db.engine.connect() as conn:
+        exists = await conn.run_sync(
+            lambda sync_conn: sql.inspect(sync_conn).has_table('alembic_version'),
+        )
+        if not exists:
+            return set()
+        result = await conn.execute(sql.text('SELECT version_num FROM alembic_version'))
+        return set(result.scalars())
+
+
+async def check_schema_version(db: Database, config_path: str | Path = 'alembic.ini') -> str:
+    """
+    Compare the revision of the database with the head of the migrations,
+    nothing is created or migrated on start. Returns the revision
+    """
+    expected = head_revisions(config_path)
+    revisions = await database_revisions(db)
+    if revisions != expected:
+        raise SchemaVersionMismatch(revisions, expected)
+    return ', '.join(sorted(revisions))
@@ -1,6 +1,6 @@
 from typing import Any
 
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String, Table
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase, relationship
 
 
@@ -30,6 +30,10 @@ class UserORM(Base):
 
 class ReviewORM(Base):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        Index('ix_reviews_user_id_id', 'user_id', 'id'),
+        Index('ix_reviews_product_id_id', 'product_id', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     content: Mapped[str]
@@ -76,3 +80,10 @@ class ProductORM(Base):
             'description': self.description,
         }
         return data
+
+
+# Tables by name, for exports and bulk imports
+TABLES: dict[str, Table] = {
+    model.__tablename__: model.__table__  # type: ignore[misc]
+    for model in (UserORM, ProductORM, ReviewORM)
+}
@@ -0,0 +1,60 @@
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    connects: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    overflow_max: int = 0
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that counts checkouts, timeouts and new connections,
+    wait time covers everything between the request for a connection and its checkout
+    """
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+        self.stats.checkouts += 1
+        self.stats.overflow_max = max(self.stats.overflow_max, self.overflow())
+        return connection
+
+    def _create_connection(self) -> Any:
+        self.stats.connects += 1
+        return super()._create_connection()
+
+    def recreate(self) -> 'InstrumentedAsyncAdaptedQueuePool':
+        pool: InstrumentedAsyncAdaptedQueuePool = super().recreate()  # type: ignore[assignment]
+        pool.stats = self.stats
+        return pool
+
+    def metrics(self) -> dict[str, Any]:
+        """Current state of the pool together with counters collected since start"""
+        return {
+            'size': self.size(),
+            'checked_in': self.checkedin(),
+            'checked_out': self.checkedout(),
+            'overflow': max(self.overflow(), 0),
+            **asdict(self.stats),
+        }
@@ -0,0 +1,124 @@
+import json
+import logging
+import queue
+import random
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+
+from product_service.core import logger
+from product_service.core.tracing import current_span
+
+from .sql_trace import current_field_path
+
+query_logger = logger.getChild('sql')
+
+# Parameters of batched statements past this many are summarized by count
+MAX_LOGGED_BATCH = 10
+
+
+def redact(parameters: Any) -> Any:
+    """Parameters with values replaced by their type names"""
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    return type(parameters).__name__
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, structured fields are taken from `record.fields`"""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'fields', {}),
+        }
+        return json.dumps(payload, default=str)
+
+
+@dataclass
+class QueryLog:
+    """
+    Structured log of SQL statements. Statements slower than `slow_threshold` seconds are
+    always logged, the rest are logged with probability `sample_rate`.
+    Nothing is formatted for statements that are not logged
+    """
+    sample_rate: float = 0.0
+    slow_threshold: float | None = 0.5
+    log_parameters: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_threshold is not None
+
+    def is_slow(self, duration: float) -> bool:
+        return self.slow_threshold is not None and duration >= self.slow_threshold
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        duration: float,
+        rows: int | None = None,
+        executemany: bool = False,
+        error: BaseException | None = None,
+    ) -> None:
+        slow = self.is_slow(duration)
+        if not (slow or error is not None or random.random() < self.sample_rate):
+            return
+        level = logging.WARNING if slow or error is not None else logging.INFO
+        if not query_logger.isEnabledFor(level):
+            return
+        fields: dict[str, Any] = {
+            'statement': statement,
+            'durationMs': round(duration * 1000, 3),
+            'rows': rows,
+            'slow': slow,
+            'path': current_field_path.get(),
+        }
+        if executemany:
+            fields['batch'] = len(parameters)
+            parameters = parameters[:MAX_LOGGED_BATCH]
+        fields['parameters'] = parameters if self.log_parameters else redact(parameters)
+        if error is not None:
+            fields['error'] = type(error).__name__
+        span = current_span.get()
+        if span is not None:
+            fields['traceId'] = span.trace_id
+        query_logger.log(level, 'slow SQL statement' if slow else 'SQL statement', extra={
+            'fields': fields,
+        })
+
+
+class QueryLogWriter:
+    """
+    Write records of the SQL log from a background thread: the event loop only puts
+    records to a queue, formatting and I/O happen in the listener thread
+    """
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path
+        self._queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self._handler = QueueHandler(self._queue)
+        self._listener: QueueListener | None = None
+
+    def start(self) -> None:
+        target = logging.FileHandler(self.path) if self.path else logging.StreamHandler()
+        target.setFormatter(JSONFormatter())
+        self._listener = QueueListener(self._queue, target)
+        self._listener.start()
+        query_logger.addHandler(self._handler)
+        query_logger.setLevel(logging.INFO)
+        query_logger.propagate = False
+
+    def stop(self) -> None:
+        if self._listener is None:
+            return
+        query_logger.removeHandler(self._handler)
+        query_logger.propagate = True
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+from contextvars import ContextVar
+from typing import Any, Literal
+
+import sqlalchemy as sql
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from product_service.core import logger
+from product_service.core.metrics import Counter, registry
+
+Balancing = Literal['round_robin', 'least_connections']
+# "read" sessions go to a replica, "write" and "read_your_writes" ones to the primary
+Route = Literal['write', 'read', 'read_your_writes']
+
+PRIMARY = 'primary'
+
+# Route of sessions opened by the current operation
+current_route: ContextVar[Route] = ContextVar('current_route', default='write')
+
+SESSIONS = registry.register(Counter(
+    'db_sessions',
+    'Database sessions by the database they were opened on and their route',
+    ('database', 'route'),
+))
+
+
+class Replica:
+    __slots__ = ('name', 'engine', 'healthy', 'failures')
+
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.failures = 0
+
+    @property
+    def connections(self) -> int:
+        """Connections in use"""
+        checkedout = getattr(self.engine.pool, 'checkedout', None)
+        return checkedout() if checkedout is not None else 0
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            'healthy': self.healthy,
+            'failures': self.failures,
+            'connections': self.connections,
+        }
+
+
+class ReplicaSet:
+    """
+    Read replicas behind the primary. Sessions are balanced over healthy replicas
+    round-robin or to the replica with the fewest connections in use; replicas are
+    marked unhealthy when a health check fails and healthy again when one passes
+    """
+    def __init__(
+        self,
+        engines: list[AsyncEngine],
+        balancing: Balancing = 'round_robin',
+        check_timeout: float = 2.0,
+    ) -> None:
+        self.replicas = [Replica(f'replica{i}', engine) for i, engine in enumerate(engines)]
+        self.balancing = balancing
+        self.check_timeout = check_timeout
+        self._next = itertools.cycle(self.replicas)
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def choose(self) -> Replica | None:
+        """Healthy replica for the next session, None when there is none"""
+        if self.balancing == 'least_connections':
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            return min(healthy, key=lambda r: r.connections) if healthy else None
+        for _ in range(len(self.replicas)):
+            replica = next(self._next)
+            if replica.healthy:
+                return replica
+        return None
+
+    async def _check(self, replica: Replica) -> None:
+        async def execute() -> None:
+            async with replica.engine.connect() as conn:
+                await conn.execute(sql.text('SELECT 1'))
+
+        try:
+            await asyncio.wait_for(execute(), self.check_timeout)
+        except Exception as e:
+            replica.failures += 1
+            if replica.healthy:
+                logger.warning(f'Read replica {replica.name} is unhealthy: {e!r}')
+            replica.healthy = False
+            return
+        if not replica.healthy:
+            logger.info(f'Read replica {replica.name} is healthy again')
+        replica.healthy = True
+
+    async def check(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def run_health_checks(self, interval: float) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    def metrics(self) -> dict[str, Any]:
+        return {replica.name: replica.metrics() for replica in self.replicas}
@@ -0,0 +1,204 @@
+"""
+Full-text search: stored tsvector columns with GIN indexes on Postgres,
+FTS5 tables kept in sync by triggers on SQLite. Indexes are created together
+with their tables by `Base.metadata.create_all` and by the alembic migration
+"""
+import re
+from dataclasses import dataclass
+from typing import Any
+
+import sqlalchemy as sql
+from sqlalchemy import event
+
+from .models import ProductORM, ReviewORM
+
+# Text search configuration of the tsvector columns, queries must use the same one
+TEXT_SEARCH_CONFIG = 'english'
+# Rank of the row, selected after the requested columns
+RANK_LABEL = 'search_rank'
+
+WORD = re.compile(r'\w+')
+
+
+@dataclass(frozen=True, slots=True)
+class SearchIndex:
+    """
+    Searched columns of a table, most relevant first, with their weights.
+    `trigram` column also matches by similarity, for prefixes and typos on Postgres
+    """
+    table: sql.Table
+    columns: tuple[str, ...]
+    weights: tuple[float, ...]
+    trigram: str | None = None
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+    @property
+    def fts_table(self) -> str:
+        return f'{self.name}_fts'
+
+
+PRODUCT_SEARCH = SearchIndex(
+    ProductORM.__table__, ('title', 'description'), (10.0, 1.0), trigram='title',  # type: ignore
+)
+REVIEW_SEARCH = SearchIndex(ReviewORM.__table__, ('content',), (1.0,))  # type: ignore[arg-type]
+
+
+def postgres_ddl(index: SearchIndex) -> list[str]:
+    weighted = ' || '.join(
+        f"setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(index.columns, 'ABCD')
+    )
+    statements = [
+        f'ALTER TABLE {index.name} ADD COLUMN search_vector tsvector '
+        f'GENERATED ALWAYS AS ({weighted}) STORED',
+        f'CREATE INDEX ix_{index.name}_search_vector ON {index.name} USING gin (search_vector)',
+    ]
+    if index.trigram is not None:
+        statements += [
+            'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+            f'CREATE INDEX ix_{index.name}_{index.trigram}_trgm '
+            f'ON {index.name} USING gin ({index.trigram} gin_trgm_ops)',
+        ]
+    return statements
+
+
+def sqlite_ddl(index: SearchIndex) -> list[str]:
+    fts, columns = index.fts_table, ', '.join(index.columns)
+    new = ', '.join(f'new.{column}' for column in index.columns)
+    old = ', '.join(f'old.{column}' for column in index.columns)
+    insert = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new});'
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+    return [
+        f'CREATE VIRTUAL TABLE {fts} USING fts5({columns}, '
+        f"content='{index.name}', content_rowid='id', tokenize='porter unicode61')",
+        f'CREATE TRIGGER {fts}_insert AFTER INSERT ON {index.name} BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_delete AFTER DELETE ON {index.name} BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_update AFTER UPDATE ON {index.name} BEGIN {delete} {insert} END',
+    ]
+
+
+def install(index: SearchIndex) -> None:
+    """Create the search index after its table and drop the FTS5 table before it"""
+    for dialect, statements in (
+        ('postgresql', postgres_ddl(index)),
+        ('sqlite', sqlite_ddl(index)),
+    ):
+        for statement in statements:
+            ddl = sql.DDL(statement).execute_if(dialect=dialect)
+            event.listen(index.table, 'after_create', ddl)
+    event.listen(
+        index.table,
+        'before_drop',
+        sql.DDL(f'DROP TABLE IF EXISTS {index.fts_table}').execute_if(dialect='sqlite'),
+    )
+
+
+for _index in (PRODUCT_SEARCH, REVIEW_SEARCH):
+    install(_index)
+
+
+def is_search_object(type_: str, name: str | None) -> bool:
+    """
+    Columns, indexes and tables created for the search indexes, they are not
+    declared on the models and alembic autogenerate has to leave them alone
+    """
+    if name is None:
+        return False
+    if type_ == 'column':
+        return name == 'search_vector'
+    if type_ == 'index':
+        return name.endswith(('_search_vector', '_trgm'))
+    if type_ == 'table':
+        return any(
+            name == index.fts_table or name.startswith(f'{index.fts_table}_')
+            for index in (PRODUCT_SEARCH, REVIEW_SEARCH)
+        )
+    return False
+
+
+def fts5_query(text: str) -> str:
+    """Every word of the text as a quoted prefix, FTS5 syntax of the text is not interpreted"""
+    return ' '.join(f'"{word}"*' for word in WORD.findall(text))
+
+
+def search_clauses(
+    index: SearchIndex,
+    dialect: str,
+) -> tuple[sql.ColumnElement[bool], sql.ColumnElement[float], sql.TableClause | None]:
+    """Match condition, rank of matching rows and the FTS5 table to join on SQLite"""
+    query = sql.bindparam('query', type_=sql.String)
+    if dialect == 'postgresql':
+        vector = sql.literal_column(f'{index.name}.search_vector')
+        tsquery = sql.func.websearch_to_tsquery(
+            sql.literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), query,
+        )
+        match = vector.op('@@')(tsquery)
+        rank = sql.func.ts_rank_cd(vector, tsquery, type_=sql.Float)
+        if index.trigram is not None:
+            column = index.table.c[index.trigram]
+            match = sql.or_(match, query.op('<%')(column))
+            rank = rank + sql.func.word_similarity(query, column, type_=sql.Float)
+        return match, rank, None
+    if dialect == 'sqlite':
+        fts = sql.table(index.fts_table, sql.column('rowid'))
+        match = sql.literal_column(index.fts_table).op('MATCH')(query)
+        # bm25 is lower for better matches
+        rank = -sql.func.bm25(sql.literal_column(index.fts_table), *index.weights, type_=sql.Float)
+        return match, rank, fts
+    raise NotImplementedError(f'Full-text search is not supported on {dialect}')
+
+
+def ranked_search(
+    index: SearchIndex,
+    dialect: str,
+    stmt: sql.Select,
+    after: bool = False,
+) -> sql.Select:
+    """
+    Rows of `stmt` that match the "query" parameter, selected columns followed by the rank.
+    Ordered by rank and id, pages after the "after_rank" and "after" parameters
+    """
+    match, rank, fts = search_clauses(index, dialect)
+    id_column = index.table.c.id
+    if fts is not None:
+        stmt = stmt.join(fts, fts.c.rowid == id_column)
+    ranked = stmt.add_columns(rank.label(RANK_LABEL)).where(match).subquery('ranked')
+    rank_column, id = ranked.c[RANK_LABEL], ranked.c.id
+    stmt = sql.select(*ranked.c)
+    if after:
+        after_rank = sql.bindparam('after_rank', type_=sql.Float)
+        stmt = stmt.where(sql.or_(
+            rank_column < after_rank,
+            sql.and_(rank_column == after_rank, id > sql.bindparam('after')),
+        ))
+    return stmt.order_by(rank_column.desc(), id).limit(sql.bindparam('limit', type_=sql.Integer))
+
+
+def search_count(index: SearchIndex, dialect: str, stmt: sql.Select) -> sql.Select:
+    """Count of rows of `stmt` that match the "query" parameter"""
+    match, _, fts = search_clauses(index, dialect)
+    if fts is not None:
+        stmt = stmt.join(fts, fts.c.rowid == index.table.c.id)
+    return stmt.where(match)
+
+
+def search_parameters(
+    dialect: str,
+    text: str,
+    limit: int | None = None,
+    after: tuple[float, int] | None = None,
+) -> dict[str, Any] | None:
+    """Values of the search parameters, None when the text has no words to search for"""
+    if WORD.search(text) is None:
+        return None
+    parameters: dict[str, Any] = {
+        'query': fts5_query(text) if dialect == 'sqlite' else text.strip(),
+    }
+    if limit is not None:
+        parameters['limit'] = limit
+    if after is not None:
+        parameters['after_rank'], parameters['after'] = after
+    return parameters
@@ -0,0 +1,40 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar('T')
+
+
+def _serialized(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    @functools.wraps(method)
+    async def wrapper(self: 'SerializedAsyncSession', *args: Any, **kwargs: Any) -> T:
+        async with self.lock:
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+class SerializedAsyncSession(AsyncSession):
+    """
+    AsyncSession that can be shared by concurrently resolved GraphQL fields,
+    operations that use the connection wait for each other instead of failing
+    with "concurrent operations are not permitted"
+    """
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.lock = asyncio.Lock()
+
+    # "scalars" and "stream_scalars" delegate to "execute" and "stream"
+    execute = _serialized(AsyncSession.execute)  # type: ignore[assignment]
+    scalar = _serialized(AsyncSession.scalar)  # type: ignore[assignment]
+    stream = _serialized(AsyncSession.stream)  # type: ignore[assignment]
+    get = _serialized(AsyncSession.get)  # type: ignore[assignment]
+    get_one = _serialized(AsyncSession.get_one)  # type: ignore[assignment]
+    refresh = _serialized(AsyncSession.refresh)
+    merge = _serialized(AsyncSession.merge)
+    delete = _serialized(AsyncSession.delete)
+    flush = _serialized(AsyncSession.flush)
+    commit = _serialized(AsyncSession.commit)
+    rollback = _serialized(AsyncSession.rollback)
+    run_sync = _serialized(AsyncSession.run_sync)  # type: ignore[assignment]
@@ -0,0 +1,120 @@
+import re
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+# Placeholders of the paramstyles of the supported drivers and their expanded IN lists
+_PARAMETER = r'(?:\?|\$\d+|%\(\w+\)s|:\w+)'
+_PARAMETER_LIST = re.compile(rf'\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with IN lists of any length collapsed to one placeholder"""
+    return _PARAMETER_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+@dataclass(slots=True)
+class TracedStatement:
+    statement: str
+    shape: str
+    path: str | None
+    duration_ms: float
+    rows: int
+
+
+@dataclass(slots=True)
+class LazyLoad:
+    attribute: str
+    path: str | None
+
+
+class NPlusOneDetected(AssertionError):
+    ...
+
+
+@dataclass(eq=False)
+class SQLTrace:
+    """
+    Statements executed for one GraphQL operation with the field path that triggered them.
+    Statement shapes executed `threshold` times or more and implicit lazy loads
+    of relationships are reported as N+1 queries
+    """
+    threshold: int = 3
+    statements: list[TracedStatement] = field(default_factory=list)
+    lazy_loads: list[LazyLoad] = field(default_factory=list)
+
+    def record(self, statement: str, duration: float, rows: int) -> None:
+        self.statements.append(TracedStatement(
+            statement=statement,
+            shape=statement_shape(statement),
+            path=current_field_path.get(),
+            duration_ms=round(duration * 1000, 3),
+            rows=rows,
+        ))
+
+    def repeated(self) -> list[dict[str, Any]]:
+        by_shape: dict[str, list[TracedStatement]] = defaultdict(list)
+        for statement in self.statements:
+            by_shape[statement.shape].append(statement)
+        return [
+            {
+                'shape': shape,
+                'count': len(statements),
+                'paths': sorted({s.path for s in statements if s.path is not None}),
+            }
+            for shape, statements in by_shape.items()
+            if len(statements) >= self.threshold
+        ]
+
+    def problems(self) -> list[str]:
+        problems = [
+            f'{item["count"]} statements of the same shape: {item["shape"]}'
+            for item in self.repeated()
+        ]
+        problems.extend(
+            f'lazy load of {lazy_load.attribute} at {lazy_load.path or "operation"}'
+            for lazy_load in self.lazy_loads
+        )
+        return problems
+
+    def assert_no_n_plus_one(self) -> None:
+        problems = self.problems()
+        if problems:
+            raise NPlusOneDetected('N+1 queries detected: ' + '; '.join(problems))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'count': len(self.statements),
+            'durationMs': round(sum(s.duration_ms for s in self.statements), 3),
+            'statements': [
+                {
+                    'sql': s.statement,
+                    'path': s.path,
+                    'durationMs': s.duration_ms,
+                    'rows': s.rows,
+                }
+                for s in self.statements
+            ],
+            'repeated': self.repeated(),
+            'lazyLoads': [{'attribute': ll.attribute, 'path': ll.path} for ll in self.lazy_loads],
+        }
+
+
+current_sql_trace: ContextVar[SQLTrace | None] = ContextVar('current_sql_trace', default=None)
+# Path of the GraphQL field being resolved, e.g. "products.edges.0.node.reviews"
+current_field_path: ContextVar[str | None] = ContextVar('current_field_path', default=None)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _record_lazy_load(orm_execute_state: ORMExecuteState) -> None:
+    trace = current_sql_trace.get()
+    if trace is None or orm_execute_state.lazy_loaded_from is None:
+        return
+    relationship = orm_execute_state.loader_strategy_path[-1]
+    attribute = f'{relationship.parent.class_.__name__}.{relationship.key}'
+    trace.lazy_loads.append(LazyLoad(attribute=attribute, path=current_field_path.get()))
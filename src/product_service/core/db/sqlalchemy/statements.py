@@ -0,0 +1,97 @@
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Sequence
+
+import sqlalchemy as sql
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import compiler
+
+from product_service.core.settings import config
+
+
+def query_shape(
+    queries: dict[str, Any],
+    filters: Sequence[str],
+    pagination: Sequence[str] = ('after', 'limit'),
+) -> tuple[str | None, tuple[str, ...], dict[str, Any]]:
+    """
+    Returns first filter from `filters` present in `queries`,
+    pagination arguments present in `queries` and values to bind for both
+    """
+    filter_name = next((name for name in filters if queries.get(name) is not None), None)
+    paging = tuple(name for name in pagination if queries.get(name) is not None)
+    names = (filter_name, *paging) if filter_name is not None else paging
+    return filter_name, paging, {name: queries[name] for name in names}
+
+
+class StatementCache:
+    """
+    Select statements built once for every query shape:
+    model, selected columns, filter and pagination.
+    Values are bound on execution, so one statement object serves every call
+    and SQLAlchemy computes its cache key only once.
+    Shapes depend on client selections, so at most `maxsize` statements are kept
+    """
+    def __init__(self, maxsize: int = config.STATEMENT_CACHE_MAX_SIZE) -> None:
+        self.maxsize = maxsize
+        self._statements: OrderedDict[Hashable, sql.Select] = OrderedDict()
+        # statements compiled for each engine, forked workers inherit them from the master
+        self._compiled: weakref.WeakKeyDictionary[Any, int] = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, key: Hashable, build: Callable[[], sql.Select]) -> sql.Select:
+        stmt = self._statements.get(key)
+        if stmt is not None:
+            self.hits += 1
+            self._statements.move_to_end(key)
+            return stmt
+        self.misses += 1
+        stmt = build()
+        stmt._generate_cache_key()
+        stmt = self._statements.setdefault(key, stmt)
+        while len(self._statements) > self.maxsize:
+            self._statements.popitem(last=False)
+            self.evictions += 1
+        return stmt
+
+    def compile(self, engine: AsyncEngine) -> int:
+        """
+        Compile cached statements into the compiled cache of the engine,
+        first executions of the statements then skip SQL compilation.
+        Returns number of compiled statements
+        """
+        sync_engine = engine.sync_engine
+        dialect = sync_engine.dialect
+        if sync_engine._compiled_cache is None or not dialect._supports_statement_cache:
+            return 0
+        if self._compiled.get(sync_engine) == len(self._statements):
+            return len(self._statements)
+        for stmt in list(self._statements.values()):
+            stmt._compile_w_cache(
+                dialect=dialect,
+                compiled_cache=sync_engine._compiled_cache,
+                column_keys=sorted(stmt.compile().params),
+                for_executemany=False,
+                linting=dialect.compiler_linting | compiler.WARN_LINTING,
+            )
+        self._compiled[sync_engine] = len(self._statements)
+        return len(self._statements)
+
+    def metrics(self) -> dict[str, int]:
+        return {
+            'size': len(self), 'hits': self.hits, 'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def clear(self) -> None:
+        self._statements.clear()
+        self._compiled.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+statement_cache = StatementCache()
@@ -1,7 +1,10 @@
 from typing import AsyncGenerator
 from dishka import AnyOf, Provider, provide, Scope
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from product_service.core.broker import Broker, InMemoryBroker
 from product_service.core.db.sqlalchemy import Database
+from product_service.core.settings import config
 from product_service.api.graphql.v1.resolvers.product import StrawberryProductResolver
 from product_service.api.graphql.v1.resolvers.review import StrawberryReviewResolver
 from product_service.api.graphql.v1.resolvers.user import StrawberryUserResolver
@@ -17,58 +20,62 @@ from product_service.gateways.sqlalchemy.user import SQLAlchemyAggregatedUserGat
 
 
 class AppContainer(Provider):
+    """
+    Everything below the database is created once per request, i.e. per GraphQL operation:
+    gateways share one session and so one pooled connection,
+    field resolvers and batch loaders get the same resolver instances
+    """
     @provide(scope=Scope.APP)
     def database(self) -> Database:
         return Database()
 
-    @provide(scope=Scope.REQUEST, cache=False)
-    async def user_repository(
+    @provide(scope=Scope.APP)
+    def broker(self) -> AnyOf[Broker, InMemoryBroker]:
+        return InMemoryBroker(
+            maxsize=config.SUBSCRIPTION_QUEUE_SIZE,
+            overflow=config.SUBSCRIPTION_OVERFLOW,
+            publish_timeout=config.SUBSCRIPTION_PUBLISH_TIMEOUT,
+        )
+
+    @provide(scope=Scope.REQUEST)
+    async def session(self, db: Database) -> AsyncGenerator[AsyncSession, None]:
+        async with db.session() as session:
+            yield session
+
+    @provide(scope=Scope.REQUEST)
+    def user_repository(
         self,
-        db: Database,
-    ) -> AnyOf[
-        AsyncGenerator[UserGateway, None],
-        AsyncGenerator[SQLAlchemyAggregatedUserGateway, None],
-    ]:
-        session = db.async_session_factory()
-        async with session:
-            yield SQLAlchemyAggregatedUserGateway(session)
+        session: AsyncSession,
+    ) -> AnyOf[UserGateway, SQLAlchemyAggregatedUserGateway]:
+        return SQLAlchemyAggregatedUserGateway(session)
 
-    @provide(scope=Scope.REQUEST, cache=False)
-    async def product_repository(
+    @provide(scope=Scope.REQUEST)
+    def product_repository(
         self,
-        db: Database,
-    ) -> AnyOf[
-        AsyncGenerator[ProductGateway, None],
-        AsyncGenerator[SQLAlchemyAggregatedProductGateway, None],
-    ]:
-        session = db.async_session_factory()
-        async with session:
-            yield SQLAlchemyAggregatedProductGateway(session)
+        session: AsyncSession,
+    ) -> AnyOf[ProductGateway, SQLAlchemyAggregatedProductGateway]:
+        return SQLAlchemyAggregatedProductGateway(session)
 
-    @provide(scope=Scope.REQUEST, cache=False)
-    async def review_repository(
-        self, db: Database,
-    ) -> AnyOf[
-        AsyncGenerator[ReviewGateway, None],
-        AsyncGenerator[SQLAlchemyAggregatedReviewGateway, None],
-    ]:
-        session = db.async_session_factory()
-        async with session:
-            yield SQLAlchemyAggregatedReviewGateway(session)
+    @provide(scope=Scope.REQUEST)
+    def review_repository(
+        self,
+        session: AsyncSession,
+    ) -> AnyOf[ReviewGateway, SQLAlchemyAggregatedReviewGateway]:
+        return SQLAlchemyAggregatedReviewGateway(session)
 
-    @provide(scope=Scope.REQUEST, cache=False)
+    @provide(scope=Scope.REQUEST)
     def strawberry_review_resolver(
-        self, repository: ReviewGateway,
+        self, repository: ReviewGateway, broker: Broker,
     ) -> StrawberryReviewResolver:
-        return StrawberryReviewResolver(repository)
+        return StrawberryReviewResolver(repository, broker)
 
-    @provide(scope=Scope.REQUEST, cache=False)
+    @provide(scope=Scope.REQUEST)
     def strawberry_product_resolver(
         self, repository: ProductGateway,
     ) -> StrawberryProductResolver:
         return StrawberryProductResolver(repository)
 
-    @provide(scope=Scope.REQUEST, cache=False)
+    @provide(scope=Scope.REQUEST)
     def strawberry_user_resolver(
         self, repository: UserGateway,
     ) -> StrawberryUserResolver:
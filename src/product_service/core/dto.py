@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
+from typing import Any, Iterable
 
 from pydantic import BaseModel, ConfigDict
 
@@ -20,6 +21,16 @@ class SelectedFields:
     owner: Entity | str
     all: bool = False
     fields: list[str] = field(default_factory=list)
+    arguments: dict[str, Any] = field(default_factory=dict)
+
+
+def canonical_fields(fields: Iterable[str]) -> list[str]:
+    """
+    Fields without repeats, `id` first and the rest sorted: the same selection
+    written in any order or with aliases selects the same columns in the same order
+    """
+    unique = set(fields)
+    return ['id', *sorted(unique - {'id'})] if 'id' in unique else sorted(unique)
 
 
 class UserDTO(BaseDTO):
@@ -39,3 +50,32 @@ class CreateReviewDTO(BaseDTO):
 class ProductDTO(BaseDTO):
     title: str = ''
     description: str = ''
+
+
+# Read path: values come straight from the database, so they are trusted
+# and stored in slotted dataclasses without pydantic validation
+
+
+@dataclass(slots=True)
+class UserRow:
+    id: int | None = None
+    username: str = ''
+    reviews: list['ReviewRow'] | None = None
+
+
+@dataclass(slots=True)
+class ProductRow:
+    id: int | None = None
+    title: str = ''
+    description: str = ''
+    reviews: list['ReviewRow'] | None = None
+
+
+@dataclass(slots=True)
+class ReviewRow:
+    id: int | None = None
+    content: str = ''
+    user_id: int | None = None
+    product_id: int | None = None
+    user: UserRow | None = None
+    product: ProductRow | None = None
@@ -23,3 +23,11 @@ class IDNotProvided(ApplicationException):
         if self.custom_message:
             msg = f'{msg}: {self.custom_message}'
         return msg
+
+
+@dataclass(eq=False)
+class InvalidValueException(ApplicationException):
+    message: str
+
+    def __str__(self) -> str:
+        return self.message
@@ -0,0 +1,229 @@
+import math
+import re
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Sequence, TypeVar
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+M = TypeVar('M', bound='Metric')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SAMPLE_NAME = re.compile(r'[a-zA-Z_:][a-zA-Z0-9_:]*')
+
+
+@dataclass(slots=True)
+class OperationStats:
+    """SQL volume of the current operation, filled by listeners of the database engine"""
+    statements: int = 0
+    rows: int = 0
+
+
+current_operation_stats: ContextVar[OperationStats | None] = ContextVar(
+    'current_operation_stats', default=None,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _render_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+
+def _with_labels(line: str, labels: str) -> str:
+    """Sample line with rendered labels put before its own ones"""
+    if line.startswith('#'):
+        return line
+    match = SAMPLE_NAME.match(line)
+    assert match is not None
+    end = match.end()
+    if line[end] == '{':
+        return f'{line[:end + 1]}{labels},{line[end + 1:]}'
+    return f'{line[:end]}{{{labels}}}{line[end:]}'
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    type: str = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @property
+    def sample_name(self) -> str:
+        return f'{self.name}_total' if self.type == 'counter' else self.name
+
+    def header(self) -> Iterator[str]:
+        yield f'# HELP {self.sample_name} {self.documentation}'
+        yield f'# TYPE {self.sample_name} {self.type}'
+
+    def collect(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class _LabelledMetric(Metric):
+    """
+    Metric with pre-bound label children: labels are rendered once when the child is
+    created, recording a value is a dictionary lookup and an addition
+    """
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):  # type: ignore[no-untyped-def]
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}')
+            child = self._children[values] = self._new_child(
+                _render_labels(self.labelnames, values),
+            )
+        return child
+
+    def _new_child(self, labels: str) -> object:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        self._children.clear()
+
+
+class CounterChild:
+    __slots__ = ('labels', 'value')
+
+    def __init__(self, labels: str) -> None:
+        self.labels = labels
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_LabelledMetric):
+    type = 'counter'
+
+    def _new_child(self, labels: str) -> CounterChild:
+        return CounterChild(labels)
+
+    def labels(self, *values: str) -> CounterChild:
+        return super().labels(*values)  # type: ignore[no-any-return]
+
+    def collect(self) -> Iterator[str]:
+        yield from self.header()
+        for child in self._children.values():
+            assert isinstance(child, CounterChild)
+            yield f'{self.sample_name}{child.labels} {_format(child.value)}'
+
+
+class HistogramChild:
+    __slots__ = ('labels', 'buckets', 'counts', 'sum')
+
+    def __init__(self, labels: str, buckets: tuple[float, ...]) -> None:
+        self.labels = labels
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Histogram(_LabelledMetric):
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._le = [
+            f'le="{_format(bound)}"' for bound in (*self.buckets, math.inf)
+        ]
+
+    def _new_child(self, labels: str) -> HistogramChild:
+        return HistogramChild(labels, self.buckets)
+
+    def labels(self, *values: str) -> HistogramChild:
+        return super().labels(*values)  # type: ignore[no-any-return]
+
+    def collect(self) -> Iterator[str]:
+        yield from self.header()
+        for child in self._children.values():
+            assert isinstance(child, HistogramChild)
+            inner = child.labels[1:-1] + ',' if child.labels else ''
+            cumulative = 0
+            for le, count in zip(self._le, child.counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{inner}{le}}} {cumulative}'
+            yield f'{self.name}_sum{child.labels} {_format(child.sum)}'
+            yield f'{self.name}_count{child.labels} {cumulative}'
+
+
+class CallbackMetric(Metric):
+    """Gauge or counter read at collection time, callback returns label values and values"""
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Iterable[tuple[Sequence[str], float]]],
+        labelnames: Sequence[str] = (),
+        type: str = 'gauge',
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type = type
+
+    def collect(self) -> Iterator[str]:
+        samples = list(self.callback())
+        if not samples:
+            return
+        yield from self.header()
+        for values, value in samples:
+            labels = _render_labels(self.labelnames, values)
+            yield f'{self.sample_name}{labels} {_format(value)}'
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._labels = ''
+
+    def set_labels(self, **labels: str) -> None:
+        """Labels added to every sample, e.g. the worker process that collected it"""
+        self._labels = _render_labels(tuple(labels), tuple(labels.values()))[1:-1]
+
+    def register(self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str) -> None:
+        self._metrics.pop(name, None)
+
+    def collect(self, extra: Iterable[Metric] = ()) -> str:
+        """Metrics in Prometheus text exposition format"""
+        lines: list[str] = []
+        for metric in (*self._metrics.values(), *extra):
+            lines.extend(metric.collect())
+        if self._labels:
+            lines = [_with_labels(line, self._labels) for line in lines]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
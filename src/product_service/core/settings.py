@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,8 +8,9 @@ from . import constants
 class Config(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', extra='allow')
 
-    LISTEN_SQL_QUERIES: bool = True
-    DEBUG: bool = True
+    # Log every SQL statement, same as SQL_LOG_SAMPLE_RATE=1
+    LISTEN_SQL_QUERIES: bool = False
+    DEBUG: bool = False
 
     # Postgres
     POSTGRES_DIALECT: str = 'postgresql+asyncpg'
@@ -18,6 +19,103 @@ class Config(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
+    # Full SQLAlchemy URL used instead of the Postgres settings, e.g. sqlite+aiosqlite:///local.db
+    DATABASE_URL: str | None = None
+    # Read replicas, JSON list of SQLAlchemy URLs. Query operations are balanced over
+    # healthy replicas, mutations and reads right after a client's mutation use the primary
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_BALANCING: Literal['round_robin', 'least_connections'] = 'round_robin'
+    # Seconds between health checks of the replicas
+    DB_REPLICA_CHECK_INTERVAL: float = 5.0
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Connection pool
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Connections opened at startup, defaults to DB_POOL_SIZE
+    DB_POOL_WARM_UP: int | None = None
+    # asyncpg prepared statement cache, set to 0 behind pgbouncer in transaction mode
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_READINESS_TIMEOUT: float = 2.0
+    # Compile statements of the known query shapes at startup
+    DB_PRECOMPILE_STATEMENTS: bool = True
+    # Statements kept by query shape, least recently used are evicted
+    STATEMENT_CACHE_MAX_SIZE: int = 1000
+
+    # Production server: workers default to available cores, a warning is logged when
+    # a worker accepts connections later than the budget (seconds) after the master started
+    SERVER_WORKERS: int | None = None
+    SERVER_STARTUP_BUDGET: float = 1.0
+    # Worker N of the production server also accepts connections on this port + N,
+    # its /metrics are labelled worker="N". Not bound when METRICS_ENABLED=false
+    SERVER_METRICS_PORT: int = 9100
+    # Migrations whose head revision the database must be at to serve
+    ALEMBIC_CONFIG: str = 'alembic.ini'
+
+    # Bulk mutations: items written per statement and items accepted by one mutation
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 10_000
+
+    # Longest text accepted by searchProducts and searchReviews
+    SEARCH_MAX_QUERY_LENGTH: int = 256
+
+    # Rows fetched from the server-side cursor per batch of NDJSON exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Subscriptions: messages buffered per subscriber, when the buffer is full publishers
+    # wait up to the timeout for the subscriber ("wait") or drop it right away ("drop")
+    SUBSCRIPTION_QUEUE_SIZE: int = 100
+    SUBSCRIPTION_OVERFLOW: Literal['wait', 'drop'] = 'wait'
+    SUBSCRIPTION_PUBLISH_TIMEOUT: float = 1.0
+
+    # Persisted queries, allowlist is a JSON file with hashes mapped to queries
+    PERSISTED_QUERIES_ALLOWLIST: str | None = None
+    # Reject every operation that is not in the allowlist
+    PERSISTED_QUERIES_STRICT: bool = False
+    PERSISTED_QUERIES_CACHE_SIZE: int = 1000
+
+    # Response cache of query operations, TTLs in seconds by entity
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESPONSE_CACHE_TTL: dict[str, float] = {'user': 300.0, 'product': 300.0, 'review': 60.0}
+    RESPONSE_CACHE_DEFAULT_TTL: float = 60.0
+    # Expired responses are served while they are refreshed in background
+    RESPONSE_CACHE_STALE_TTL: float = 30.0
+
+    # Operation cost limits, depth counts nested objects without connection edges and nodes
+    QUERY_MAX_DEPTH: int = 6
+    QUERY_MAX_PAGE_SIZE: int = 100
+    QUERY_MAX_COST: int = 10_000
+
+    # Prometheus metrics of operations, resolvers, SQL volume, pool and caches at /metrics
+    METRICS_ENABLED: bool = True
+
+    # Structured SQL log written from a background thread: share of statements logged,
+    # statements slower than the threshold are always logged, None disables the threshold
+    SQL_LOG_SAMPLE_RATE: float = 0.0
+    SQL_LOG_SLOW_THRESHOLD_MS: float | None = 500.0
+    # Log parameter values instead of their types
+    SQL_LOG_PARAMETERS: bool = False
+    # JSON lines file of the SQL log, stderr by default
+    SQL_LOG_FILE: str | None = None
+
+    # Share of operations that return their SQL statements in "extensions" of the response,
+    # statement shapes repeated this many times are reported as N+1 queries
+    SQL_TRACE_SAMPLE_RATE: float = 0.0
+    SQL_TRACE_REPEAT_THRESHOLD: int = 3
+    # Fail operations with N+1 queries or lazy loads of relationships
+    SQL_TRACE_STRICT: bool = False
+
+    # Tracing of operations, resolvers, dependencies, gateways and SQL statements,
+    # spans are exported to an OTLP/HTTP collector or appended to a JSON lines file
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: Literal['otlp', 'file'] = 'otlp'
+    TRACING_OTLP_ENDPOINT: str = 'http://localhost:4318/v1/traces'
+    TRACING_FILE: str = 'traces.jsonl'
+    TRACING_SERVICE_NAME: str = 'product-service'
 
     @property
     def postgres_connection_string(self) -> str:
@@ -26,6 +124,10 @@ class Config(BaseSettings):
         connection_string = f'{self.POSTGRES_DIALECT}://{user_pwd}@{host_port}/{self.POSTGRES_DB}'
         return connection_string
 
+    @property
+    def database_url(self) -> str:
+        return self.DATABASE_URL or self.postgres_connection_string
+
     @property
     def app_config(self) -> dict[str, Any]:
         conf = {}
@@ -0,0 +1,313 @@
+import functools
+import inspect
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, Protocol, Sequence, TypeVar
+
+from product_service.core import logger
+
+T = TypeVar('T')
+AttributeValue = str | bool | int | float
+
+current_span: ContextVar['Span | None'] = ContextVar('current_span', default=None)
+
+
+def _random_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+@dataclass(eq=False, slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Span in OTLP/JSON encoding"""
+        span: dict[str, Any] = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': 1,
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns),
+            'attributes': otlp_attributes(self.attributes),
+            'status': {'code': 2, 'message': self.error} if self.error else {'code': 1},
+        }
+        if self.parent_id is not None:
+            span['parentSpanId'] = self.parent_id
+        return span
+
+
+def otlp_attributes(attributes: dict[str, AttributeValue]) -> list[dict[str, Any]]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded_value: dict[str, Any] = {'boolValue': value}
+        elif isinstance(value, int):
+            encoded_value = {'intValue': str(value)}
+        elif isinstance(value, float):
+            encoded_value = {'doubleValue': value}
+        else:
+            encoded_value = {'stringValue': str(value)}
+        encoded.append({'key': key, 'value': encoded_value})
+    return encoded
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Span]) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans, for tests"""
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self.spans.extend(spans)
+
+    def shutdown(self) -> None:
+        ...
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def names(self) -> list[str]:
+        return [span.name for span in self.spans]
+
+
+class FileSpanExporter:
+    """Appends spans to a file as JSON lines in OTLP/JSON span encoding"""
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        with self.path.open('a') as file:
+            file.writelines(json.dumps(span.to_otlp()) + '\n' for span in spans)
+
+    def shutdown(self) -> None:
+        ...
+
+
+class OTLPSpanExporter:
+    """Sends spans to an OpenTelemetry collector with OTLP/HTTP JSON protocol"""
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str,
+        headers: dict[str, str] | None = None,
+        timeout: float = 10.0,
+    ) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self.timeout = timeout
+
+    def export(self, spans: Sequence[Span]) -> None:
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': otlp_attributes({'service.name': self.service_name})},
+                'scopeSpans': [{
+                    'scope': {'name': 'product_service'},
+                    'spans': [span.to_otlp() for span in spans],
+                }],
+            }],
+        }
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(payload).encode(), headers=self.headers, method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+    def shutdown(self) -> None:
+        ...
+
+
+class SpanProcessor(Protocol):
+    def on_end(self, span: Span) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        ...
+
+
+class SimpleSpanProcessor:
+    """Export every span as soon as it ends"""
+    def __init__(self, exporter: SpanExporter) -> None:
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class BatchSpanProcessor:
+    """
+    Export spans in batches from a background thread, so request handling never waits
+    for the exporter. Spans are dropped when the queue is full
+    """
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_batch_size: int = 512,
+        schedule_delay: float = 5.0,
+    ) -> None:
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped = 0
+        self._queue: queue.Queue[Span | None] = queue.Queue(max_queue_size)
+        self._thread = threading.Thread(target=self._worker, name='span-exporter', daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _worker(self) -> None:
+        running = True
+        while running:
+            batch: list[Span] = []
+            deadline = time.monotonic() + self.schedule_delay
+            while len(batch) < self.max_batch_size:
+                try:
+                    span = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if span is None:
+                    running = False
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    logger.warning(f'Failed to export {len(batch)} spans: {e!r}')
+
+    def shutdown(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """
+    Records nested spans, parent of a new span is the span of the current context.
+    Nothing is recorded until a processor is added
+    """
+    def __init__(self) -> None:
+        self.processors: list[SpanProcessor] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.processors)
+
+    def add_processor(self, processor: SpanProcessor) -> None:
+        self.processors.append(processor)
+
+    def start_span(self, name: str, attributes: dict[str, AttributeValue] | None = None) -> Span:
+        parent = current_span.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else _random_id(16),
+            span_id=_random_id(8),
+            parent_id=parent.span_id if parent is not None else None,
+            start_ns=time.time_ns(),
+            attributes=dict(attributes or {}),
+        )
+
+    def end_span(self, span: Span, error: BaseException | None = None) -> None:
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.error = repr(error)
+        for processor in self.processors:
+            processor.on_end(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes: AttributeValue) -> Iterator[Span | None]:
+        """Record the block as a child of the current span, yields None when tracing is disabled"""
+        if not self.processors:
+            yield None
+            return
+        span = self.start_span(name, attributes)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+        finally:
+            current_span.reset(token)
+
+    def shutdown(self) -> None:
+        for processor in self.processors:
+            processor.shutdown()
+        self.processors.clear()
+
+
+tracer = Tracer()
+
+
+class TracedContainer:
+    """Dependency container proxy that records a span for every resolved dependency"""
+    def __init__(self, container: Any) -> None:
+        self._container = container
+
+    async def get(self, dependency_type: Any, *args: Any, **kwargs: Any) -> Any:
+        name = getattr(dependency_type, '__name__', repr(dependency_type))
+        with tracer.span(f'di.get {name}'):
+            return await self._container.get(dependency_type, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._container, name)
+
+
+def traced_methods(cls: type[T]) -> type[T]:
+    """Record a span for every public coroutine method defined by the class"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, _traced(method, f'{cls.__name__}.{name}'))
+    return cls
+
+
+def _traced(method: Callable[..., Awaitable[T]], name: str) -> Callable[..., Awaitable[T]]:
+    @functools.wraps(method)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        if not tracer.processors:
+            return await method(*args, **kwargs)
+        with tracer.span(name):
+            return await method(*args, **kwargs)
+    return wrapper
@@ -1,21 +1,44 @@
-from typing import Protocol
+from typing import AsyncIterator, Protocol, Sequence
 
-from product_service.core.dto import ProductDTO, ReviewDTO, SelectedFields, UserDTO
+from product_service.core.dto import (
+    CreateReviewDTO,
+    ProductDTO,
+    ProductRow,
+    ReviewDTO,
+    ReviewRow,
+    SelectedFields,
+    UserDTO,
+    UserRow,
+)
+from product_service.core.exceptions import ApplicationException
 
 
 class UserGateway(Protocol):
-    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> UserDTO:
+    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> UserRow:
         ...
 
-    async def get(self, id: int, fields: list[SelectedFields]) -> UserDTO:
+    async def get(self, id: int, fields: list[SelectedFields]) -> UserRow:
+        raise NotImplementedError
+
+    async def get_many(self, ids: Sequence[int], fields: list[SelectedFields]) -> list[UserRow]:
+        raise NotImplementedError
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> dict[int, UserRow]:
         raise NotImplementedError
 
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-    ) -> list[UserDTO]:
+        after: int | None = None,
+    ) -> list[UserRow]:
+        raise NotImplementedError
+
+    async def count(self) -> int:
         raise NotImplementedError
 
     async def add(self, dto: UserDTO) -> UserDTO:
@@ -27,24 +50,75 @@ class UserGateway(Protocol):
     async def delete(self, id: int) -> bool:
         raise NotImplementedError
 
+    async def add_many(
+        self,
+        dtos: Sequence[UserDTO],
+        chunk_size: int | None = None,
+    ) -> list[UserDTO | ApplicationException]:
+        raise NotImplementedError
+
+    async def update_many(
+        self,
+        items: Sequence[tuple[int, UserDTO]],
+        chunk_size: int | None = None,
+    ) -> list[UserDTO | ApplicationException]:
+        raise NotImplementedError
+
+    async def delete_many(
+        self,
+        ids: Sequence[int],
+        chunk_size: int | None = None,
+    ) -> list[int | ApplicationException]:
+        raise NotImplementedError
+
 
 class ProductGateway(Protocol):
     async def get_by_review_id(
         self,
         review_id: int,
         fields: list[SelectedFields],
-    ) -> ProductDTO | None:
+    ) -> ProductRow | None:
         ...
 
-    async def get(self, id: int, fields: list[SelectedFields]) -> ProductDTO:
+    async def get(self, id: int, fields: list[SelectedFields]) -> ProductRow:
+        raise NotImplementedError
+
+    async def get_many(
+        self,
+        ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> list[ProductRow]:
+        raise NotImplementedError
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> dict[int, ProductRow]:
         raise NotImplementedError
 
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-    ) -> list[ProductDTO]:
+        after: int | None = None,
+    ) -> list[ProductRow]:
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    async def search(
+        self,
+        query: str,
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[ProductRow, float]]:
+        """Products matching the query with their rank, best first, after the (rank, id)"""
+        raise NotImplementedError
+
+    async def search_count(self, query: str) -> int:
         raise NotImplementedError
 
     async def add(self, dto: ProductDTO) -> ProductDTO:
@@ -56,19 +130,91 @@ class ProductGateway(Protocol):
     async def delete(self, id: int) -> bool:
         raise NotImplementedError
 
+    async def add_many(
+        self,
+        dtos: Sequence[ProductDTO],
+        chunk_size: int | None = None,
+    ) -> list[ProductDTO | ApplicationException]:
+        raise NotImplementedError
+
+    async def update_many(
+        self,
+        items: Sequence[tuple[int, ProductDTO]],
+        chunk_size: int | None = None,
+    ) -> list[ProductDTO | ApplicationException]:
+        raise NotImplementedError
+
+    async def delete_many(
+        self,
+        ids: Sequence[int],
+        chunk_size: int | None = None,
+    ) -> list[int | ApplicationException]:
+        raise NotImplementedError
+
 
 class ReviewGateway(Protocol):
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
+        after: int | None = None,
         product_id: int | None = None,
         user_id: int | None = None,
-    ) -> list[ReviewDTO]:
+    ) -> list[ReviewRow]:
         ...
 
-    async def get(self, id: int, fields: list[SelectedFields]) -> ReviewDTO:
+    def stream_by_product(
+        self,
+        product_id: int,
+        fields: list[SelectedFields],
+        batch_size: int,
+        after: int | None = None,
+    ) -> AsyncIterator[list[ReviewRow]]:
+        """Reviews of the product ordered by id in batches read from a server-side cursor"""
+        raise NotImplementedError
+
+    async def get(self, id: int, fields: list[SelectedFields]) -> ReviewRow:
+        raise NotImplementedError
+
+    async def get_many_by_product_ids(
+        self,
+        product_ids: Sequence[int],
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: int | None = None,
+    ) -> dict[int, list[ReviewRow]]:
+        raise NotImplementedError
+
+    async def get_many_by_user_ids(
+        self,
+        user_ids: Sequence[int],
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: int | None = None,
+    ) -> dict[int, list[ReviewRow]]:
+        raise NotImplementedError
+
+    async def count(self, product_id: int | None = None, user_id: int | None = None) -> int:
+        raise NotImplementedError
+
+    async def count_many_by_product_ids(self, product_ids: Sequence[int]) -> dict[int, int]:
+        raise NotImplementedError
+
+    async def count_many_by_user_ids(self, user_ids: Sequence[int]) -> dict[int, int]:
+        raise NotImplementedError
+
+    async def search(
+        self,
+        query: str,
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+        product_id: int | None = None,
+    ) -> list[tuple[ReviewRow, float]]:
+        """Reviews matching the query with their rank, best first, after the (rank, id)"""
+        raise NotImplementedError
+
+    async def search_count(self, query: str, product_id: int | None = None) -> int:
         raise NotImplementedError
 
     async def add(self, dto: ReviewDTO) -> ReviewDTO:
@@ -79,3 +225,24 @@ class ReviewGateway(Protocol):
 
     async def delete(self, id: int) -> bool:
         raise NotImplementedError
+
+    async def add_many(
+        self,
+        dtos: Sequence[CreateReviewDTO],
+        chunk_size: int | None = None,
+    ) -> list[CreateReviewDTO | ApplicationException]:
+        raise NotImplementedError
+
+    async def update_many(
+        self,
+        items: Sequence[tuple[int, ReviewDTO]],
+        chunk_size: int | None = None,
+    ) -> list[ReviewDTO | ApplicationException]:
+        raise NotImplementedError
+
+    async def delete_many(
+        self,
+        ids: Sequence[int],
+        chunk_size: int | None = None,
+    ) -> list[int | ApplicationException]:
+        raise NotImplementedError
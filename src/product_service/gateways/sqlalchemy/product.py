@@ -1,119 +1,228 @@
 from typing import Any, Sequence
 
 import sqlalchemy as sql
-from sqlalchemy.orm import joinedload
 
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 from product_service.core.db.sqlalchemy.base import BaseSQLAlchemyGateway
-from product_service.core.db.sqlalchemy.extensions import models_to_join, sqlalchemy_crud
+from product_service.core.db.sqlalchemy.extensions import (
+    project_columns,
+    related_to_prefetch,
+    sqlalchemy_crud,
+    with_primary_key,
+)
 from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM
+from product_service.core.db.sqlalchemy.search import (
+    PRODUCT_SEARCH,
+    ranked_search,
+    search_count,
+    search_parameters,
+)
+from product_service.core.db.sqlalchemy.statements import query_shape, statement_cache
 from product_service.core.exceptions import ObjectDoesNotExistException
+from product_service.core.tracing import traced_methods
 from product_service.core.utils import raise_exc
-from product_service.core.dto import SelectedFields, ProductDTO, ReviewDTO
+from product_service.core.dto import SelectedFields, ProductRow
+from product_service.gateways.sqlalchemy.review import SQLAlchemyAggregatedReviewGateway
 
 
+@traced_methods
 @sqlalchemy_crud(query_executor=False, model=ProductORM)
 class SQLAlchemyProductGateway(BaseSQLAlchemyGateway):
-    def _construct_select_query(
+    def _build_select_query(
         self,
-        fields: list[SelectedFields],
-        **queries,
+        columns: tuple[str, ...],
+        filter_name: str | None,
+        paging: tuple[str, ...],
     ) -> sql.Select:
-        product_id = queries.get('id', None)
-        review_id = queries.get('review_id', None)
-        _fields = fields[0] if len(fields) > 0 else raise_exc(Exception('No fields'))
-        fields_to_select = [getattr(ProductORM, f) for f in _fields.fields]
-        offset = queries.get('offset', None)
-        limit = queries.get('limit', None)
-        stmt = sql.select(*fields_to_select)
-
-        if product_id is not None:
-            stmt = stmt.where(ProductORM.id == product_id)
-        elif review_id is not None:
+        stmt = sql.select(*(getattr(ProductORM, f) for f in columns))
+        if filter_name == 'id':
+            stmt = stmt.where(ProductORM.id == sql.bindparam('id'))
+        elif filter_name == 'ids':
+            stmt = stmt.where(ProductORM.id.in_(sql.bindparam('ids', expanding=True)))
+        elif filter_name == 'review_id':
             stmt = stmt.join(ReviewORM)
-            stmt = stmt.where(ReviewORM.id == review_id)
-        if offset is not None:
-            stmt = stmt.offset(offset)
-        if limit is not None:
-            stmt = stmt.limit(limit)
+            stmt = stmt.where(ReviewORM.id == sql.bindparam('review_id'))
+        elif filter_name == 'review_ids':
+            stmt = stmt.add_columns(ReviewORM.id).join(ReviewORM)
+            stmt = stmt.where(ReviewORM.id.in_(sql.bindparam('review_ids', expanding=True)))
+        if 'after' in paging:
+            stmt = stmt.where(ProductORM.id > sql.bindparam('after'))
+        if 'limit' in paging:
+            stmt = stmt.order_by(ProductORM.id).limit(sql.bindparam('limit', type_=sql.Integer))
         return stmt
 
-    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> ProductDTO:
+    def _construct_select_query(
+        self,
+        fields: list[SelectedFields],
+        **queries,
+    ) -> tuple[sql.Select, dict[str, Any]]:
+        _fields = fields[0].fields if len(fields) > 0 else raise_exc(Exception('No fields'))
+        columns = tuple(_fields)
+        filter_name, paging, parameters = query_shape(
+            queries, filters=('id', 'ids', 'review_id', 'review_ids'),
+        )
+        stmt = statement_cache.get(
+            (ProductORM, columns, filter_name, paging),
+            lambda: self._build_select_query(columns, filter_name, paging),
+        )
+        return stmt, parameters
+
+    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> ProductRow:
         values = await self._execute_query(fields=fields, review_id=review_id, first=True)
         if not values:
             raise ObjectDoesNotExistException('ProductORM')
         data: dict[str, Any] = {f: v for f, v in zip(fields[0].fields, values)}
-        return ProductDTO(**data)
+        return ProductRow(**data)
+
+    async def get_many(
+        self,
+        ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> list[ProductRow]:
+        fields = with_primary_key(fields)
+        list_values = await self._execute_query(fields=fields, ids=ids)
+        return [ProductRow(**dict(zip(fields[0].fields, values))) for values in list_values]
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> dict[int, ProductRow]:
+        list_values = await self._execute_query(fields=fields, review_ids=review_ids)
+        products: dict[int, ProductRow] = {}
+        for *values, review_id in list_values:
+            products[review_id] = ProductRow(**dict(zip(fields[0].fields, values)))
+        return products
 
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-    ) -> list[ProductDTO]:
-        list_values = await self._execute_query(fields=fields, offset=offset, limit=limit)
+        after: int | None = None,
+    ) -> list[ProductRow]:
+        list_values = await self._execute_query(fields=fields, limit=limit, after=after)
         dto_list = []
         for values in list_values:
             data = {f: v for f, v in zip(fields[0].fields, values)}
-            dto_list.append(ProductDTO(**data))
+            dto_list.append(ProductRow(**data))
         return dto_list
 
+    async def search(
+        self,
+        query: str,
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[ProductRow, float]]:
+        dialect = self.session.get_bind().dialect.name
+        parameters = search_parameters(dialect, query, limit=limit, after=after)
+        if parameters is None:
+            return []
+        fields = with_primary_key(fields)
+        columns = tuple(fields[0].fields)
+        paging = ('after',) if after is not None else ()
+        stmt = statement_cache.get(
+            (ProductORM, columns, 'search', paging, dialect),
+            lambda: ranked_search(
+                PRODUCT_SEARCH,
+                dialect,
+                sql.select(*(getattr(ProductORM, f) for f in columns)),
+                after=after is not None,
+            ),
+        )
+        result = await self.session.execute(stmt, parameters)
+        return [(ProductRow(**dict(zip(columns, values))), rank) for *values, rank in result]
+
+    async def search_count(self, query: str) -> int:
+        dialect = self.session.get_bind().dialect.name
+        parameters = search_parameters(dialect, query)
+        if parameters is None:
+            return 0
+        stmt = search_count(
+            PRODUCT_SEARCH, dialect, sql.select(sql.func.count()).select_from(ProductORM),
+        )
+        result = await self.session.execute(stmt, parameters)
+        return result.scalar_one()
+
 
+@traced_methods
 class SQLAlchemyAggregatedProductGateway(SQLAlchemyProductGateway):
-    async def _fetch_one_with_related(self, join_reviews: bool, **filters) -> ProductORM | None:
-        product_id = filters.get('id', None)
-        review_id = filters.get('review_id', None)
-        stmt: sql.Select = sql.Select(ProductORM)
-        if join_reviews:
-            stmt = stmt.options(joinedload(ProductORM.reviews))
-        if product_id is not None:
-            stmt = stmt.where(ProductORM.id == product_id)
-        elif review_id is not None:
-            stmt = stmt.join(ProductORM.reviews)
-            stmt = stmt.where(ReviewORM.id == review_id)
-        result = await self.session.execute(stmt)
-        return result.unique().scalar_one_or_none()
-
-    async def _fetch_many_with_related(self, join_reviews: bool, **filters) -> Sequence[ProductORM]:
-        offset = filters.get('offset', 0)
-        limit = filters.get('limit', 20)
-        stmt: sql.Select = sql.Select(ProductORM).offset(offset).limit(limit)
-        if join_reviews:
-            stmt = stmt.options(joinedload(ProductORM.reviews))
-        result = await self.session.execute(stmt)
-        return result.unique().scalars().all()
-
-    async def get(self, id: int, fields: list[SelectedFields]) -> ProductDTO:
-        _, _, join_review = models_to_join(fields)
-        _product = await self._fetch_one_with_related(id=id, join_reviews=join_review)
-        if not _product:
-            raise ObjectDoesNotExistException(ProductORM.__name__, object_id=id)
-        product = ProductDTO(**_product.as_dict())
-        if join_review:
-            reviews = [ReviewDTO(**r.as_dict()) for r in _product.reviews]
-            product.reviews = reviews  # type: ignore
-        return product
-
-    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> ProductDTO:
-        review = await self.session.get(ReviewORM, review_id)
-        if not review:
-            raise ObjectDoesNotExistException('ReviewORM', object_id=review_id)
-        return await self.get(id=review.product_id, fields=fields)
+    """
+    Selects only requested columns of products, reviews requested together with products
+    are loaded for all of them with one more query
+    """
+
+    async def _prefetch_reviews(
+        self,
+        products: list[ProductRow],
+        fields: list[SelectedFields],
+    ) -> list[ProductRow]:
+        """
+        Loads reviews of products when requested, every product gets a page of `first` reviews
+        and one more to tell whether the next page exists
+        """
+        reviews_fields = related_to_prefetch(fields, owner='reviews')
+        if reviews_fields is None or not products:
+            return products
+        product_ids: list[int] = list(dict.fromkeys(p.id for p in products))  # type: ignore
+        review_gateway = SQLAlchemyAggregatedReviewGateway(self.session)
+        reviews = await review_gateway.get_many_by_product_ids(
+            product_ids=product_ids,
+            fields=reviews_fields,
+            limit=reviews_fields[0].arguments.get('first', DEFAULT_PAGE_SIZE) + 1,
+            after=reviews_fields[0].arguments.get('after', None),
+        )
+        for product in products:
+            product.reviews = reviews[product.id]  # type: ignore[index]
+        return products
+
+    async def get(self, id: int, fields: list[SelectedFields]) -> ProductRow:
+        product = await super().get(id=id, fields=project_columns(fields, ProductORM))
+        products = await self._prefetch_reviews([product], fields=fields)
+        return products[0]
+
+    async def get_many(self, ids: Sequence[int], fields: list[SelectedFields]) -> list[ProductRow]:
+        products = await super().get_many(ids=ids, fields=project_columns(fields, ProductORM))
+        return await self._prefetch_reviews(products, fields=fields)
+
+    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> ProductRow:
+        product = await super().get_by_review_id(
+            review_id=review_id, fields=project_columns(fields, ProductORM),
+        )
+        products = await self._prefetch_reviews([product], fields=fields)
+        return products[0]
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> dict[int, ProductRow]:
+        products = await super().get_many_by_review_ids(
+            review_ids=review_ids, fields=project_columns(fields, ProductORM),
+        )
+        await self._prefetch_reviews(list(products.values()), fields=fields)
+        return products
 
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-    ) -> list[ProductDTO]:
-        _, _, join_review = models_to_join(fields)
-        _products = await self._fetch_many_with_related(
-            offset=offset, limit=limit, join_reviews=join_review,
+        after: int | None = None,
+    ) -> list[ProductRow]:
+        products = await super().get_list(
+            fields=project_columns(fields, ProductORM), limit=limit, after=after,
         )
-        products: list[ProductDTO] = []
-        for _product in _products:
-            product = ProductDTO(**_product.as_dict())
-            if join_review:
-                reviews = [ReviewDTO(**r.as_dict()) for r in _product.reviews]
-                product.reviews = reviews  # type: ignore
-            products.append(product)
-        return products
+        return await self._prefetch_reviews(products, fields=fields)
+
+    async def search(
+        self,
+        query: str,
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+    ) -> list[tuple[ProductRow, float]]:
+        found = await super().search(
+            query, fields=project_columns(fields, ProductORM), limit=limit, after=after,
+        )
+        await self._prefetch_reviews([product for product, _ in found], fields=fields)
+        return found
@@ -1,157 +1,340 @@
-from typing import Sequence
+from typing import Any, AsyncIterator, Sequence
 
 import sqlalchemy as sql
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import InstrumentedAttribute
 
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 from product_service.core.db.sqlalchemy.base import BaseSQLAlchemyGateway
 from product_service.core.db.sqlalchemy.extensions import (
-    models_to_join,
+    page_per_parent,
+    project_columns,
     raise_exc,
+    rank_per_parent,
+    related_columns,
     sqlalchemy_crud,
+    with_primary_key,
 )
-from product_service.core.db.sqlalchemy.models import ReviewORM
-from product_service.core.dto import SelectedFields, UserDTO, ProductDTO, ReviewDTO
+from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM, UserORM
+from product_service.core.db.sqlalchemy.search import (
+    REVIEW_SEARCH,
+    ranked_search,
+    search_count,
+    search_parameters,
+)
+from product_service.core.db.sqlalchemy.statements import query_shape, statement_cache
+from product_service.core.dto import Entity, SelectedFields, UserRow, ProductRow, ReviewRow
+from product_service.core.exceptions import ObjectDoesNotExistException
+from product_service.core.tracing import traced_methods
+
+# Columns of the joined user and product of every review, empty when they are not joined
+JoinedColumns = tuple[tuple[str, ...], tuple[str, ...]]
 
 
-@sqlalchemy_crud(query_executor=False, model=ReviewORM)
+@traced_methods
+@sqlalchemy_crud(query_executor=False, get=False, count=False, model=ReviewORM)
 class SQLAlchemyReviewGateway(BaseSQLAlchemyGateway):
-    def _construct_select_query(self, fields: list[SelectedFields], **queries) -> sql.Select:
+    @staticmethod
+    def _select(columns: tuple[str, ...], joined: JoinedColumns) -> sql.Select:
+        """Review columns followed by the columns of the joined user and product"""
+        user_columns, product_columns = joined
+        stmt = sql.select(
+            *(getattr(ReviewORM, f) for f in columns),
+            *(getattr(UserORM, f).label(f'user__{f}') for f in user_columns),
+            *(getattr(ProductORM, f).label(f'product__{f}') for f in product_columns),
+        )
+        if user_columns:
+            stmt = stmt.join(ReviewORM.user)
+        if product_columns:
+            stmt = stmt.join(ReviewORM.product)
+        return stmt
+
+    def _build_select_query(
+        self,
+        columns: tuple[str, ...],
+        filter_name: str | None,
+        paging: tuple[str, ...],
+        parent_column: InstrumentedAttribute | None = None,
+        joined: JoinedColumns = ((), ()),
+    ) -> sql.Select:
+        stmt = self._select(columns, joined)
+        if 'after' in paging:
+            stmt = stmt.where(ReviewORM.id > sql.bindparam('after'))
+        if filter_name == 'parent_ids':
+            ranked = rank_per_parent(
+                stmt.add_columns(parent_column),
+                parent_column=parent_column,
+                parent_ids=sql.bindparam('parent_ids', expanding=True),
+                order_by=ReviewORM.id,
+            )
+            ranked_columns = list(ranked.c)[:-1]
+            return (
+                sql.select(*ranked_columns)
+                .where(page_per_parent(ranked, limit=sql.bindparam('limit', type_=sql.Integer)))
+                .order_by(ranked_columns[-1], ranked.c.position)
+            )
+        if filter_name == 'id':
+            return stmt.where(ReviewORM.id == sql.bindparam('id'))
+        elif filter_name == 'user_id':
+            stmt = stmt.where(ReviewORM.user_id == sql.bindparam('user_id'))
+        elif filter_name == 'product_id':
+            stmt = stmt.where(ReviewORM.product_id == sql.bindparam('product_id'))
+        stmt = stmt.order_by(ReviewORM.id)
+        if 'limit' in paging:
+            stmt = stmt.limit(sql.bindparam('limit', type_=sql.Integer))
+        return stmt
+
+    def _construct_select_query(
+        self,
+        fields: list[SelectedFields],
+        **queries,
+    ) -> tuple[sql.Select, dict[str, Any]]:
         _fields = fields[0] if len(fields) > 0 else raise_exc(Exception('No fields'))
-        fields_to_select = [getattr(ReviewORM, f) for f in _fields.fields]
-        review_id = queries.get('id', None)
-        product_id = queries.get('product_id', None)
-        user_id = queries.get('user_id', None)
-        offset = queries.get('offset', None)
-        limit = queries.get('limit', None)
-        stmt = sql.select(*fields_to_select)
-
-        if review_id is not None:
-            return stmt.where(ReviewORM.id == review_id)
-        elif user_id is not None:
+        columns = tuple(_fields.fields)
+        parent_column = queries.get('parent_column', None)
+        joined: JoinedColumns = queries.get('joined', ((), ()))
+        filter_name, paging, parameters = query_shape(
+            queries, filters=('parent_ids', 'id', 'user_id', 'product_id'),
+        )
+        if filter_name == 'parent_ids':
+            parameters['limit'] = queries.get('limit', None) or DEFAULT_PAGE_SIZE
+        elif filter_name == 'id':
+            paging = ()
+            parameters = {'id': queries['id']}
+        stmt = statement_cache.get(
+            (
+                ReviewORM,
+                columns,
+                filter_name,
+                paging,
+                parent_column.key if parent_column is not None else None,
+                joined,
+            ),
+            lambda: self._build_select_query(columns, filter_name, paging, parent_column, joined),
+        )
+        return stmt, parameters
+
+    def _projection(
+        self,
+        fields: list[SelectedFields],
+    ) -> tuple[list[SelectedFields], JoinedColumns]:
+        """Returns fields to select for reviews and columns of users and products to join"""
+        return fields, ((), ())
+
+    @staticmethod
+    def _to_row(values: Sequence[Any], columns: list[str], joined: JoinedColumns) -> ReviewRow:
+        user_columns, product_columns = joined
+        review = ReviewRow(**dict(zip(columns, values)))
+        offset = len(columns)
+        if user_columns:
+            review.user = UserRow(**dict(zip(user_columns, values[offset:])))
+            offset += len(user_columns)
+        if product_columns:
+            review.product = ProductRow(**dict(zip(product_columns, values[offset:])))
+        return review
+
+    async def get(self, id: int, fields: list[SelectedFields]) -> ReviewRow:
+        fields, joined = self._projection(fields)
+        values = await self._execute_query(fields=fields, id=id, joined=joined, first=True)
+        if not values:
+            raise ObjectDoesNotExistException(ReviewORM.__name__, object_id=id)
+        return self._to_row(values, fields[0].fields, joined)
+
+    def _construct_count_query(self, **filters) -> sql.Select:
+        product_id = filters.get('product_id', None)
+        user_id = filters.get('user_id', None)
+        parent_column = filters.get('parent_column', None)
+        parent_ids = filters.get('parent_ids', None)
+        if parent_ids is not None:
+            return (
+                sql.select(parent_column, sql.func.count())
+                .where(parent_column.in_(parent_ids))
+                .group_by(parent_column)
+            )
+        stmt = sql.select(sql.func.count()).select_from(ReviewORM)
+        if user_id is not None:
             stmt = stmt.where(ReviewORM.user_id == user_id)
         elif product_id is not None:
             stmt = stmt.where(ReviewORM.product_id == product_id)
-        if offset is not None:
-            stmt = stmt.offset(offset)
-        if limit is not None:
-            stmt = stmt.limit(limit)
         return stmt
 
+    async def count(self, product_id: int | None = None, user_id: int | None = None) -> int:
+        stmt = self._construct_count_query(product_id=product_id, user_id=user_id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+
+    async def _count_many_by_parent_ids(
+        self,
+        parent_column: InstrumentedAttribute,
+        parent_ids: Sequence[int],
+    ) -> dict[int, int]:
+        stmt = self._construct_count_query(parent_column=parent_column, parent_ids=parent_ids)
+        result = await self.session.execute(stmt)
+        counts: dict[int, int] = {id: 0 for id in parent_ids}
+        counts.update({parent_id: count for parent_id, count in result.all()})
+        return counts
+
+    async def count_many_by_product_ids(self, product_ids: Sequence[int]) -> dict[int, int]:
+        return await self._count_many_by_parent_ids(
+            parent_column=ReviewORM.product_id, parent_ids=product_ids,
+        )
+
+    async def count_many_by_user_ids(self, user_ids: Sequence[int]) -> dict[int, int]:
+        return await self._count_many_by_parent_ids(
+            parent_column=ReviewORM.user_id, parent_ids=user_ids,
+        )
+
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
+        after: int | None = None,
         product_id: int | None = None,
         user_id: int | None = None,
-    ) -> list[ReviewDTO]:
+    ) -> list[ReviewRow]:
+        fields, joined = self._projection(fields)
         list_values = await self._execute_query(
             fields=fields,
-            offset=offset,
             limit=limit,
+            after=after,
             product_id=product_id,
             user_id=user_id,
+            joined=joined,
         )
-        dto_list = []
-        for values in list_values:
-            data = {f: v for f, v in zip(fields[0].fields, values)}
-            dto_list.append(ReviewDTO(**data))
-        return dto_list
+        return [self._to_row(values, fields[0].fields, joined) for values in list_values]
 
+    async def search(
+        self,
+        query: str,
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: tuple[float, int] | None = None,
+        product_id: int | None = None,
+    ) -> list[tuple[ReviewRow, float]]:
+        dialect = self.session.get_bind().dialect.name
+        parameters = search_parameters(dialect, query, limit=limit, after=after)
+        if parameters is None:
+            return []
+        fields, joined = self._projection(with_primary_key(fields))
+        columns = tuple(fields[0].fields)
+        paging = ('after',) if after is not None else ()
+        filter_name = 'product_id' if product_id is not None else None
+        if product_id is not None:
+            parameters['product_id'] = product_id
 
-class SQLAlchemyAggregatedReviewGateway(SQLAlchemyReviewGateway):
-    """
-    Special repository that allows to `solve N+1 problem`
-    when retrieve single or mutiple models from the database
-    """
+        def build() -> sql.Select:
+            stmt = self._select(columns, joined)
+            if product_id is not None:
+                stmt = stmt.where(ReviewORM.product_id == sql.bindparam('product_id'))
+            return ranked_search(REVIEW_SEARCH, dialect, stmt, after=after is not None)
 
-    def _construct_join_statement(
-        self,
-        stmt: sql.Select,
-        join_user: bool,
-        join_product: bool,
-    ) -> sql.Select:
-        if join_user:
-            stmt = stmt.options(joinedload(ReviewORM.user))
-        if join_product:
-            stmt = stmt.options(joinedload(ReviewORM.product))
-        return stmt
+        stmt = statement_cache.get(
+            (ReviewORM, columns, 'search', filter_name, paging, dialect, joined), build,
+        )
+        result = await self.session.execute(stmt, parameters)
+        return [
+            (self._to_row(values, fields[0].fields, joined), rank)
+            for *values, rank in result
+        ]
 
-    async def _fetch_many_with_related(
-        self,
-        join_user: bool,
-        join_product: bool,
-        **filters,
-    ) -> Sequence[ReviewORM]:
-        offset = filters.get('offset', 0)
-        limit = filters.get('limit', 20)
-        user_id = filters.get('user_id', None)
-        product_id = filters.get('product_id', None)
-        stmt = self._construct_join_statement(
-            sql.select(ReviewORM).offset(offset).limit(limit), join_user, join_product,
+    async def search_count(self, query: str, product_id: int | None = None) -> int:
+        dialect = self.session.get_bind().dialect.name
+        parameters = search_parameters(dialect, query)
+        if parameters is None:
+            return 0
+        stmt = search_count(
+            REVIEW_SEARCH, dialect, sql.select(sql.func.count()).select_from(ReviewORM),
         )
-        if user_id is not None:
-            stmt = stmt.where(ReviewORM.user_id == user_id)
         if product_id is not None:
             stmt = stmt.where(ReviewORM.product_id == product_id)
+        result = await self.session.execute(stmt, parameters)
+        return result.scalar_one()
 
-        reviews = await self.session.execute(stmt)
-        return reviews.scalars().all()
+    async def stream_by_product(
+        self,
+        product_id: int,
+        fields: list[SelectedFields],
+        batch_size: int,
+        after: int | None = None,
+    ) -> AsyncIterator[list[ReviewRow]]:
+        fields, joined = self._projection(fields)
+        batches = self._stream_query(
+            fields=fields,
+            after=after,
+            product_id=product_id,
+            joined=joined,
+            batch_size=batch_size,
+        )
+        async for list_values in batches:
+            yield [self._to_row(values, fields[0].fields, joined) for values in list_values]
 
-    async def _fetch_one_with_related(
+    async def _get_many_by_parent_ids(
         self,
-        join_user: bool = False,
-        join_product: bool = False,
-        **filters,
-    ) -> ReviewORM | None:
-        review_id = filters.get('id', None)
-        stmt = self._construct_join_statement(sql.select(ReviewORM), join_user, join_product)
-        if review_id is not None:
-            stmt = stmt.where(ReviewORM.id == review_id)
-        review = await self.session.execute(stmt)
-        return review.scalar_one_or_none()
-
-    async def get(self, id: int, fields: list[SelectedFields]) -> ReviewDTO | None:
-        join_user, join_product, _ = models_to_join(fields)
-        _review = await self._fetch_one_with_related(
-            join_product=join_product, join_user=join_user, id=id,
+        fields: list[SelectedFields],
+        limit: int,
+        after: int | None,
+        parent_column: InstrumentedAttribute,
+        parent_ids: Sequence[int],
+    ) -> dict[int, list[ReviewRow]]:
+        fields, joined = self._projection(fields)
+        list_values = await self._execute_query(
+            fields=fields,
+            limit=limit,
+            after=after,
+            parent_column=parent_column,
+            parent_ids=parent_ids,
+            joined=joined,
         )
-        if not _review:
-            return None
-        review = ReviewDTO(**_review.as_dict())
-        if join_product:
-            product = ProductDTO(**_review.product.as_dict())
-            review.product = product  # type: ignore
-        if join_user:
-            user = UserDTO(**_review.user.as_dict())
-            review.user = user  # type: ignore
-        return review
+        reviews: dict[int, list[ReviewRow]] = {id: [] for id in parent_ids}
+        for *values, parent_id in list_values:
+            reviews[parent_id].append(self._to_row(values, fields[0].fields, joined))
+        return reviews
 
-    async def get_list(
+    async def get_many_by_product_ids(
         self,
+        product_ids: Sequence[int],
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-        product_id: int | None = None,
-        user_id: int | None = None,
-    ) -> list[ReviewDTO]:
-        join_user, join_product, _ = models_to_join(fields)
-        _reviews = await self._fetch_many_with_related(
-            join_product=join_product,
-            join_user=join_user,
-            product_id=product_id,
-            user_id=user_id,
-            offset=offset,
+        after: int | None = None,
+    ) -> dict[int, list[ReviewRow]]:
+        return await self._get_many_by_parent_ids(
+            fields=fields,
             limit=limit,
+            after=after,
+            parent_column=ReviewORM.product_id,
+            parent_ids=product_ids,
         )
-        reviews: list[ReviewDTO] = []
-        for _review in _reviews:
-            review = ReviewDTO(**_review.as_dict())
-            if join_product:
-                product = ProductDTO(**_review.product.as_dict())
-                review.product = product  # type: ignore
-            if join_user:
-                user = UserDTO(**_review.user.as_dict())
-                review.user = user  # type: ignore
-            reviews.append(review)
-        return reviews
+
+    async def get_many_by_user_ids(
+        self,
+        user_ids: Sequence[int],
+        fields: list[SelectedFields],
+        limit: int = 20,
+        after: int | None = None,
+    ) -> dict[int, list[ReviewRow]]:
+        return await self._get_many_by_parent_ids(
+            fields=fields,
+            limit=limit,
+            after=after,
+            parent_column=ReviewORM.user_id,
+            parent_ids=user_ids,
+        )
+
+
+@traced_methods
+class SQLAlchemyAggregatedReviewGateway(SQLAlchemyReviewGateway):
+    """
+    Special repository that allows to `solve N+1 problem`
+    when retrieve single or mutiple models from the database:
+    only requested columns are selected and users and products requested
+    together with reviews are joined to the same query
+    """
+
+    def _projection(
+        self,
+        fields: list[SelectedFields],
+    ) -> tuple[list[SelectedFields], JoinedColumns]:
+        joined = (
+            related_columns(fields, owner=Entity.USER, model=UserORM),
+            related_columns(fields, owner=Entity.PRODUCT, model=ProductORM),
+        )
+        return project_columns(fields, ReviewORM), joined
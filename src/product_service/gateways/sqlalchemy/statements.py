@@ -0,0 +1,61 @@
+from typing import Any, Type
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from product_service.core.db.sqlalchemy.base import BaseSQLAlchemyGateway
+from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM, UserORM
+from product_service.core.db.sqlalchemy.statements import statement_cache
+from product_service.core.dto import SelectedFields, canonical_fields
+from product_service.gateways.sqlalchemy.product import SQLAlchemyProductGateway
+from product_service.gateways.sqlalchemy.review import SQLAlchemyReviewGateway
+from product_service.gateways.sqlalchemy.user import SQLAlchemyUserGateway
+
+# Filters and pagination the gateways query with, values only define the shape
+KNOWN_QUERIES: tuple[tuple[Type[BaseSQLAlchemyGateway], Any, tuple[dict[str, Any], ...]], ...] = (
+    (
+        SQLAlchemyUserGateway,
+        UserORM,
+        ({'id': 0}, {'ids': [0]}, {'review_id': 0}, {'review_ids': [0]}, {'limit': 1}),
+    ),
+    (
+        SQLAlchemyProductGateway,
+        ProductORM,
+        ({'id': 0}, {'ids': [0]}, {'review_id': 0}, {'review_ids': [0]}, {'limit': 1}),
+    ),
+    (
+        SQLAlchemyReviewGateway,
+        ReviewORM,
+        (
+            {'id': 0},
+            {'limit': 1},
+            {'limit': 1, 'user_id': 0},
+            {'limit': 1, 'product_id': 0},
+            {'limit': 1, 'parent_column': ReviewORM.product_id, 'parent_ids': [0]},
+            {'limit': 1, 'parent_column': ReviewORM.user_id, 'parent_ids': [0]},
+        ),
+    ),
+)
+
+
+def build_known_statements() -> int:
+    """
+    Build statements of the known query shapes, selecting either the primary key
+    or every column. Returns number of cached statements
+    """
+    for gateway_class, model, queries in KNOWN_QUERIES:
+        gateway = gateway_class(session=None)  # type: ignore[arg-type]
+        for columns in (['id'], canonical_fields(c.key for c in model.__table__.columns)):
+            fields = [SelectedFields(owner=model.__tablename__, fields=columns)]
+            for query in queries:
+                for paging in ({}, {'after': 0}) if 'limit' in query else ({},):
+                    gateway._construct_select_query(fields, **query, **paging)
+    return len(statement_cache)
+
+
+def precompile_statements(engine: AsyncEngine) -> int:
+    """
+    Build statements of the known query shapes and compile them for the engine.
+    Returns number of compiled statements
+    """
+    build_known_statements()
+    return statement_cache.compile(engine)
@@ -1,54 +1,92 @@
 from typing import Any, Sequence
 
 import sqlalchemy as sql
-from sqlalchemy.orm import joinedload
-from sqlalchemy.orm.attributes import InstrumentedAttribute
 
+from product_service.core.constants import DEFAULT_PAGE_SIZE
 from product_service.core.db.sqlalchemy.base import BaseSQLAlchemyGateway
-from product_service.core.db.sqlalchemy.extensions import (models_to_join, raise_exc,
-                                               sqlalchemy_crud)
+from product_service.core.db.sqlalchemy.extensions import (project_columns, raise_exc,
+                                               related_to_prefetch, sqlalchemy_crud,
+                                               with_primary_key)
 from product_service.core.db.sqlalchemy.models import ReviewORM, UserORM
-from product_service.core.dto import ReviewDTO, SelectedFields, UserDTO
+from product_service.core.db.sqlalchemy.statements import query_shape, statement_cache
+from product_service.core.dto import SelectedFields, UserRow
 from product_service.core.exceptions import ObjectDoesNotExistException
+from product_service.core.tracing import traced_methods
+from product_service.gateways.sqlalchemy.review import SQLAlchemyAggregatedReviewGateway
 
 
+@traced_methods
 @sqlalchemy_crud(query_executor=False, model=UserORM)
 class SQLAlchemyUserGateway(BaseSQLAlchemyGateway):
+    def _build_select_query(
+        self,
+        columns: tuple[str, ...],
+        filter_name: str | None,
+        paging: tuple[str, ...],
+    ) -> sql.Select:
+        stmt = sql.select(*(getattr(UserORM, f) for f in columns))
+        if filter_name == 'id':
+            stmt = stmt.where(UserORM.id == sql.bindparam('id'))
+        elif filter_name == 'ids':
+            stmt = stmt.where(UserORM.id.in_(sql.bindparam('ids', expanding=True)))
+        elif filter_name == 'review_id':
+            stmt = stmt.join(ReviewORM)
+            stmt = stmt.where(ReviewORM.id == sql.bindparam('review_id'))
+        elif filter_name == 'review_ids':
+            stmt = stmt.add_columns(ReviewORM.id).join(ReviewORM)
+            stmt = stmt.where(ReviewORM.id.in_(sql.bindparam('review_ids', expanding=True)))
+        if 'after' in paging:
+            stmt = stmt.where(UserORM.id > sql.bindparam('after'))
+        if 'limit' in paging:
+            stmt = stmt.order_by(UserORM.id).limit(sql.bindparam('limit', type_=sql.Integer))
+        return stmt
+
     def _construct_select_query(
         self,
         fields: list[SelectedFields],
         **queries,
-    ) -> sql.Select:
-        user_id = queries.get('id', None)
-        offset = queries.get('offset', None)
-        limit = queries.get('limit', None)
+    ) -> tuple[sql.Select, dict[str, Any]]:
         _fields = fields[0].fields if len(fields) > 0 else raise_exc(Exception('No fields'))
-        fields_to_select: list[InstrumentedAttribute] = [getattr(UserORM, f) for f in _fields]
-        stmt = sql.select(*fields_to_select)
-
-        if user_id is not None:
-            stmt = stmt.where(UserORM.id == user_id)
-        if offset is not None:
-            stmt = stmt.offset(offset)
-        if limit is not None:
-            stmt = stmt.limit(limit)
-
-        return stmt
+        columns = tuple(_fields)
+        filter_name, paging, parameters = query_shape(
+            queries, filters=('id', 'ids', 'review_id', 'review_ids'),
+        )
+        stmt = statement_cache.get(
+            (UserORM, columns, filter_name, paging),
+            lambda: self._build_select_query(columns, filter_name, paging),
+        )
+        return stmt, parameters
 
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-    ) -> list[UserDTO]:
-        list_values = await self._execute_query(fields=fields, offset=offset, limit=limit)
-        dto_list: list[UserDTO] = []
+        after: int | None = None,
+    ) -> list[UserRow]:
+        list_values = await self._execute_query(fields=fields, limit=limit, after=after)
+        dto_list: list[UserRow] = []
         for values in list_values:
             data = {field: value for field, value in zip(fields[0].fields, values)}
-            dto_list.append(UserDTO(**data))
+            dto_list.append(UserRow(**data))
         return dto_list
 
-    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> UserDTO:
+    async def get_many(self, ids: Sequence[int], fields: list[SelectedFields]) -> list[UserRow]:
+        fields = with_primary_key(fields)
+        list_values = await self._execute_query(fields=fields, ids=ids)
+        return [UserRow(**dict(zip(fields[0].fields, values))) for values in list_values]
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> dict[int, UserRow]:
+        list_values = await self._execute_query(fields=fields, review_ids=review_ids)
+        users: dict[int, UserRow] = {}
+        for *values, review_id in list_values:
+            users[review_id] = UserRow(**dict(zip(fields[0].fields, values)))
+        return users
+
+    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> UserRow:
         values = await self._execute_query(
             fields=fields, review_id=review_id, first=True
         )
@@ -57,65 +95,74 @@ class SQLAlchemyUserGateway(BaseSQLAlchemyGateway):
         data: dict[str, Any] = {}
         for value_index, field in enumerate(fields[0].fields):
             data[field] = values[value_index]
-        return UserDTO(**data)
+        return UserRow(**data)
 
 
+@traced_methods
 class SQLAlchemyAggregatedUserGateway(SQLAlchemyUserGateway):
-    async def _fetch_one_with_related(self, join_reviews: bool, **filters) -> UserORM | None:
-        user_id = filters.get('id', None)
-        review_id = filters.get('review_id', None)
-        stmt: sql.Select = sql.Select(UserORM)
-        if join_reviews:
-            stmt = stmt.options(joinedload(UserORM.reviews))
-        if user_id is not None:
-            stmt = stmt.where(UserORM.id == user_id)
-        elif review_id is not None:
-            stmt = stmt.join(UserORM.reviews)
-            stmt = stmt.where(ReviewORM.id == review_id)
-        result = await self.session.execute(stmt)
-        return result.unique().scalar_one_or_none()
-
-    async def _fetch_many_with_related(self, join_reviews: bool, **filters) -> Sequence[UserORM]:
-        offset = filters.get('offset', 0)
-        limit = filters.get('limit', 20)
-        stmt: sql.Select = sql.Select(UserORM).offset(offset).limit(limit)
-        if join_reviews:
-            stmt = stmt.options(joinedload(UserORM.reviews))
-        result = await self.session.execute(stmt)
-        return result.unique().scalars().all()
-
-    async def get(self, id: int, fields: list[SelectedFields]) -> UserDTO:
-        _, _, join_review = models_to_join(fields)
-        _user = await self._fetch_one_with_related(id=id, join_reviews=join_review)
-        if not _user:
-            raise ObjectDoesNotExistException(UserORM.__name__, object_id=id)
-        user = UserDTO(**_user.as_dict())
-        if join_review:
-            reviews = [ReviewDTO(**r.as_dict()) for r in _user.reviews]
-            user.reviews = reviews  # type: ignore
-        return user
-
-    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> UserDTO:
-        review: ReviewORM | None = await self.session.get(ReviewORM, review_id)
-        if not review:
-            raise ObjectDoesNotExistException('Review', object_id=review_id)
-        return await self.get(id=review.user_id, fields=fields)
+    """
+    Selects only requested columns of users, reviews requested together with users
+    are loaded for all of them with one more query
+    """
+
+    async def _prefetch_reviews(
+        self,
+        users: list[UserRow],
+        fields: list[SelectedFields],
+    ) -> list[UserRow]:
+        """
+        Loads reviews of users when requested, every user gets a page of `first` reviews
+        and one more to tell whether the next page exists
+        """
+        reviews_fields = related_to_prefetch(fields, owner='reviews')
+        if reviews_fields is None or not users:
+            return users
+        user_ids: list[int] = list(dict.fromkeys(user.id for user in users))  # type: ignore
+        review_gateway = SQLAlchemyAggregatedReviewGateway(self.session)
+        reviews = await review_gateway.get_many_by_user_ids(
+            user_ids=user_ids,
+            fields=reviews_fields,
+            limit=reviews_fields[0].arguments.get('first', DEFAULT_PAGE_SIZE) + 1,
+            after=reviews_fields[0].arguments.get('after', None),
+        )
+        for user in users:
+            user.reviews = reviews[user.id]  # type: ignore[index]
+        return users
+
+    async def get(self, id: int, fields: list[SelectedFields]) -> UserRow:
+        user = await super().get(id=id, fields=project_columns(fields, UserORM))
+        users = await self._prefetch_reviews([user], fields=fields)
+        return users[0]
+
+    async def get_many(self, ids: Sequence[int], fields: list[SelectedFields]) -> list[UserRow]:
+        users = await super().get_many(ids=ids, fields=project_columns(fields, UserORM))
+        return await self._prefetch_reviews(users, fields=fields)
+
+    async def get_by_review_id(self, review_id: int, fields: list[SelectedFields]) -> UserRow:
+        user = await super().get_by_review_id(
+            review_id=review_id, fields=project_columns(fields, UserORM),
+        )
+        users = await self._prefetch_reviews([user], fields=fields)
+        return users[0]
+
+    async def get_many_by_review_ids(
+        self,
+        review_ids: Sequence[int],
+        fields: list[SelectedFields],
+    ) -> dict[int, UserRow]:
+        users = await super().get_many_by_review_ids(
+            review_ids=review_ids, fields=project_columns(fields, UserORM),
+        )
+        await self._prefetch_reviews(list(users.values()), fields=fields)
+        return users
 
     async def get_list(
         self,
         fields: list[SelectedFields],
-        offset: int = 0,
         limit: int = 20,
-    ) -> list[UserDTO]:
-        _, _, join_review = models_to_join(fields)
-        _users = await self._fetch_many_with_related(
-            offset=offset, limit=limit, join_reviews=join_review,
+        after: int | None = None,
+    ) -> list[UserRow]:
+        users = await super().get_list(
+            fields=project_columns(fields, UserORM), limit=limit, after=after,
         )
-        users: list[UserDTO] = []
-        for _user in _users:
-            user = UserDTO(**_user.as_dict())
-            if join_review:
-                reviews = [ReviewDTO(**r.as_dict()) for r in _user.reviews]
-                user.reviews = reviews  # type: ignore
-            users.append(user)
-        return users
+        return await self._prefetch_reviews(users, fields=fields)
@@ -1,16 +1,41 @@
 import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 import strawberry
 from dishka import make_async_container
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
+from strawberry.extensions import SchemaExtension
 from strawberry.fastapi import GraphQLRouter
 
+from product_service.api.graphql.v1.cost import QueryCostLimiter
+from product_service.api.graphql.v1.introspection import IntrospectionCache
 from product_service.api.graphql.v1.mutations.mutation import Mutation
+from product_service.api.graphql.v1.persisted_queries import (
+    PersistedQueryCache,
+    PersistedQueryRouter,
+    PersistedQueryStore,
+)
 from product_service.api.graphql.v1.queries.query import Query
+from product_service.api.graphql.v1.response_cache import ResponseCacheExtension
+from product_service.api.graphql.v1.subscriptions.subscription import Subscription
+from product_service.api.graphql.v1.utils import OperationState
+from product_service.api.export import router as export_router
+from product_service.api.health import router as health_router
 from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.query_log import QueryLogWriter
 from product_service.core.di import AppContainer
 from product_service.core.settings import config
+from product_service.core.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    OTLPSpanExporter,
+    SpanExporter,
+    tracer,
+)
+from product_service.gateways.sqlalchemy.statements import precompile_statements
 
 container = make_async_container(AppContainer())
 
@@ -22,17 +47,111 @@ def init_db():
     asyncio.run(wrapper())
 
 
-def graphql_app_factory() -> GraphQLRouter:
-    schema = strawberry.Schema(query=Query, mutation=Mutation)
-    graphql: GraphQLRouter = GraphQLRouter(
-        schema, context_getter=lambda: {'container': container},  # type: ignore
+def persisted_query_store_factory() -> PersistedQueryStore:
+    if config.PERSISTED_QUERIES_ALLOWLIST:
+        return PersistedQueryStore.from_file(
+            config.PERSISTED_QUERIES_ALLOWLIST,
+            strict=config.PERSISTED_QUERIES_STRICT,
+            maxsize=config.PERSISTED_QUERIES_CACHE_SIZE,
+        )
+    return PersistedQueryStore(
+        strict=config.PERSISTED_QUERIES_STRICT, maxsize=config.PERSISTED_QUERIES_CACHE_SIZE,
+    )
+
+
+def span_exporter_factory() -> SpanExporter:
+    if config.TRACING_EXPORTER == 'file':
+        return FileSpanExporter(config.TRACING_FILE)
+    return OTLPSpanExporter(config.TRACING_OTLP_ENDPOINT, service_name=config.TRACING_SERVICE_NAME)
+
+
+@functools.cache
+def schema_factory(extensions: tuple[type[SchemaExtension], ...] = ()) -> strawberry.Schema:
+    """Schema is built once for every combination of extensions, routers share it"""
+    return strawberry.Schema(
+        query=Query, mutation=Mutation, subscription=Subscription, extensions=extensions,
+    )
+
+
+def graphql_app_factory(
+    store: PersistedQueryStore | None = None,
+    cache_responses: bool | None = None,
+    trace: bool | None = None,
+    collect_metrics: bool | None = None,
+    trace_sql: bool | None = None,
+    route_reads: bool | None = None,
+) -> GraphQLRouter:
+    if store is None:
+        store = persisted_query_store_factory()
+    if cache_responses is None:
+        cache_responses = config.RESPONSE_CACHE_ENABLED
+    if trace is None:
+        trace = config.TRACING_ENABLED
+    if collect_metrics is None:
+        collect_metrics = config.METRICS_ENABLED
+    if trace_sql is None:
+        trace_sql = config.SQL_TRACE_SAMPLE_RATE > 0
+    if route_reads is None:
+        route_reads = bool(config.DATABASE_REPLICA_URLS)
+    extensions: list[type[SchemaExtension]] = [
+        OperationState, PersistedQueryCache, IntrospectionCache, QueryCostLimiter,
+    ]
+    # modules of optional extensions are imported only when they are turned on
+    if trace:
+        from product_service.api.graphql.v1.tracing import TracingExtension
+        extensions.insert(0, TracingExtension)
+    if collect_metrics:
+        from product_service.api.graphql.v1.metrics import MetricsExtension
+        extensions.insert(0, MetricsExtension)
+    if trace_sql:
+        from product_service.api.graphql.v1.sql_trace import SQLTraceExtension
+        extensions.append(SQLTraceExtension)
+    if cache_responses:
+        extensions.append(ResponseCacheExtension)
+    if route_reads:
+        from product_service.api.graphql.v1.replicas import ReplicaRouting
+        extensions.append(ReplicaRouting)
+    graphql: GraphQLRouter = PersistedQueryRouter(
+        schema_factory(tuple(extensions)),
+        store=store,
+        context_getter=lambda: {'container': container},  # type: ignore
     )
 
     return graphql
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    if config.TRACING_ENABLED:
+        tracer.add_processor(BatchSpanProcessor(span_exporter_factory()))
+    db = await container.get(Database)
+    query_log_writer = QueryLogWriter(config.SQL_LOG_FILE)
+    if db.query_log.enabled:
+        query_log_writer.start()
+    await db.warm_up()
+    if config.DB_PRECOMPILE_STATEMENTS:
+        for engine in db.engines:
+            precompile_statements(engine)
+    health_checks = None
+    if db.replicas:
+        health_checks = asyncio.create_task(
+            db.replicas.run_health_checks(config.DB_REPLICA_CHECK_INTERVAL),
+        )
+    yield
+    if health_checks is not None:
+        health_checks.cancel()
+    await container.close()
+    tracer.shutdown()
+    query_log_writer.stop()
+
+
 def fastapi_app_factory() -> FastAPI:
-    app = FastAPI(**config.app_config)
+    app = FastAPI(**config.app_config, lifespan=lifespan)
     app.include_router(graphql_app_factory(), prefix='/graphql')
+    app.include_router(health_router, prefix='/health')
+    app.include_router(export_router, prefix='/export')
+    if config.METRICS_ENABLED:
+        from product_service.api.metrics import router as metrics_router
+        app.include_router(metrics_router, prefix='/metrics')
     setup_dishka(container, app)
     return app
@@ -0,0 +1,148 @@
+"""
+Pre-fork server for production: the application with its GraphQL schema is imported
+and built once in the master process, workers are forked from it and accept
+connections on the socket bound by the master. Worker N also accepts connections
+on its own port, metrics port + N, which Prometheus scrapes for the metrics of that worker
+"""
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any
+
+import uvicorn
+
+from product_service.core.metrics import registry
+
+# Configured by uvicorn, startup reports go next to its own messages
+logger = logging.getLogger('uvicorn.error')
+
+# Workers that exit sooner after they were forked are restarted with a delay
+MIN_WORKER_LIFETIME = 1.0
+# Exit code of workers whose application failed to start
+STARTUP_FAILURE = 3
+
+
+def default_workers() -> int:
+    """Cores the process may run on, limited by the CPU affinity of the container"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class Worker(uvicorn.Server):
+    """Uvicorn server of one worker, reports how long it took to accept connections"""
+    def __init__(self, config: uvicorn.Config, master_started: float, budget: float) -> None:
+        super().__init__(config)
+        self.master_started = master_started
+        self.budget = budget
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        forked = time.perf_counter()
+        await super().startup(sockets=sockets)
+        if self.should_exit:
+            return
+        ready = time.perf_counter()
+        log = logger.warning if ready - self.master_started > self.budget else logger.info
+        log(
+            'Worker [%d] ready in %.0f ms, %.0f ms after the master started '
+            '(budget %.0f ms)',
+            os.getpid(),
+            (ready - forked) * 1000,
+            (ready - self.master_started) * 1000,
+            self.budget * 1000,
+        )
+
+
+class PreforkServer:
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        started: float,
+        budget: float = 1.0,
+        metrics_port: int | None = None,
+    ) -> None:
+        self.config = config
+        self.workers = workers
+        self.started = started
+        self.budget = budget
+        self.metrics_port = metrics_port
+        # pid -> slot of the worker and when it was forked, restarted workers keep the slot
+        self.children: dict[int, tuple[int, float]] = {}
+        self.stopping = False
+        self.socket: socket.socket | None = None
+        self.metrics_sockets: list[socket.socket] = []
+
+    def run(self) -> int:
+        self.config.load()
+        self.socket = self.config.bind_socket()
+        if self.metrics_port is not None:
+            family = socket.AF_INET6 if ':' in self.config.host else socket.AF_INET
+            self.metrics_sockets = [
+                socket.create_server((self.config.host, self.metrics_port + slot), family=family)
+                for slot in range(self.workers)
+            ]
+        # objects of the master are shared copy-on-write, keep the collector off them
+        gc.collect()
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for slot in range(self.workers):
+            self.spawn(slot)
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self.children.pop(pid, None)
+            if self.stopping or child is None:
+                continue
+            slot, forked = child
+            logger.warning(
+                'Worker [%d] exited with code %d, restarting',
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            if time.perf_counter() - forked < MIN_WORKER_LIFETIME:
+                time.sleep(MIN_WORKER_LIFETIME)
+            if not self.stopping:
+                self.spawn(slot)
+        for sock in (self.socket, *self.metrics_sockets):
+            sock.close()
+        return 0
+
+    def spawn(self, slot: int) -> None:
+        assert self.socket is not None
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (slot, time.perf_counter())
+            return
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # series of the workers are told apart, their counters are not summed by the master
+        registry.set_labels(worker=str(slot))
+        sockets = [self.socket]
+        if self.metrics_sockets:
+            sockets.append(self.metrics_sockets[slot])
+        code = 1
+        try:
+            worker = Worker(self.config, self.started, self.budget)
+            worker.run(sockets=sockets)
+            code = 0 if worker.started else STARTUP_FAILURE
+        except BaseException:
+            logger.exception('Worker [%d] failed', os.getpid())
+        finally:
+            os._exit(code)
+
+    def stop(self, signum: int, frame: Any) -> None:
+        """Graceful shutdown: workers finish requests in flight and the master exits"""
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,135 @@
+import os
+from typing import AsyncGenerator
+
+# Settings require Postgres credentials even when tests run against SQLite
+for _name, _default in (
+    ('POSTGRES_DB', 'postgres'),
+    ('POSTGRES_PORT', '5432'),
+    ('POSTGRES_HOST', 'localhost'),
+    ('POSTGRES_USER', 'postgres'),
+    ('POSTGRES_PASSWORD', 'postgres'),
+    ('LISTEN_SQL_QUERIES', 'false'),
+):
+    os.environ.setdefault(_name, _default)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from dishka import AsyncContainer, Provider, Scope, make_async_container, provide  # noqa: E402
+from dishka.integrations.fastapi import setup_dishka  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from product_service.api.export import router as export_router  # noqa: E402
+from product_service.api.graphql.v1.persisted_queries import PersistedQueryStore  # noqa: E402
+from product_service.api.health import router as health_router  # noqa: E402
+from product_service.api.metrics import router as metrics_router  # noqa: E402
+from product_service.core.db.sqlalchemy import Database  # noqa: E402
+from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM, UserORM  # noqa: E402
+from product_service.core.di import AppContainer  # noqa: E402
+from product_service.main import graphql_app_factory  # noqa: E402
+
+USERS_COUNT = 5
+PRODUCTS_COUNT = 5
+REVIEWS_PER_PRODUCT = 4
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path) -> AsyncGenerator[Database, None]:
+    db = Database(url=f'sqlite+aiosqlite:///{tmp_path / "test.db"}')
+    await db.create()
+    async with db.async_session_factory() as session:
+        session.add_all(UserORM(id=i, username=f'user{i}') for i in range(1, USERS_COUNT + 1))
+        session.add_all(
+            ProductORM(id=i, title=f'product{i}', description=f'description{i}')
+            for i in range(1, PRODUCTS_COUNT + 1)
+        )
+        review_id = 1
+        for product_id in range(1, PRODUCTS_COUNT + 1):
+            for _ in range(REVIEWS_PER_PRODUCT):
+                session.add(ReviewORM(
+                    id=review_id,
+                    content=f'content{review_id}',
+                    user_id=review_id % USERS_COUNT + 1,
+                    product_id=product_id,
+                ))
+                review_id += 1
+        await session.commit()
+    yield db
+    await db.engine.dispose()
+
+
+@pytest.fixture
+def sql_statements(database: Database) -> list[str]:
+    """Collects every SQL statement sent to the test database"""
+    statements: list[str] = []
+
+    @event.listens_for(database.engine.sync_engine, 'before_cursor_execute')
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    return statements
+
+
+@pytest.fixture
+def persisted_query_store() -> PersistedQueryStore:
+    return PersistedQueryStore()
+
+
+@pytest.fixture
+def cache_responses() -> bool:
+    return False
+
+
+@pytest.fixture
+def trace() -> bool:
+    return False
+
+
+@pytest.fixture
+def trace_sql() -> bool:
+    return False
+
+
+@pytest.fixture
+def route_reads() -> bool:
+    return False
+
+
+@pytest_asyncio.fixture
+async def container(database: Database) -> AsyncGenerator[AsyncContainer, None]:
+    class TestDatabaseProvider(Provider):
+        @provide(scope=Scope.APP)
+        def database(self) -> Database:
+            return database
+
+    container = make_async_container(AppContainer(), TestDatabaseProvider())
+    yield container
+    await container.close()
+
+
+@pytest_asyncio.fixture
+async def client(
+    container: AsyncContainer,
+    persisted_query_store: PersistedQueryStore,
+    cache_responses: bool,
+    trace: bool,
+    trace_sql: bool,
+    route_reads: bool,
+) -> AsyncGenerator[httpx.AsyncClient, None]:
+    app = FastAPI()
+    graphql_app = graphql_app_factory(
+        store=persisted_query_store,
+        cache_responses=cache_responses,
+        trace=trace,
+        trace_sql=trace_sql,
+        route_reads=route_reads,
+    )
+    app.include_router(graphql_app, prefix='/graphql')
+    app.include_router(health_router, prefix='/health')
+    app.include_router(export_router, prefix='/export')
+    app.include_router(metrics_router, prefix='/metrics')
+    setup_dishka(container, app)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        yield client
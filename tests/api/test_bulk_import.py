@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func, select
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.bulk_import import ImportReport, import_file
+from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM
+
+
+async def count(database: Database, model: type) -> int:
+    async with database.async_session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_import_csv_with_ids(database: Database, tmp_path: Path):
+    path = tmp_path / 'products.csv'
+    path.write_text('id,title,description\n100,imported,\n101,imported,text\nx,invalid,\n')
+    progress: list[int] = []
+
+    report = await import_file(
+        database, 'products', path, chunk_size=1,
+        on_progress=lambda report: progress.append(report.imported),
+    )
+
+    assert (report.imported, report.rejected) == (2, 1)
+    assert report.rejects[0].line == 4
+    assert progress == [1, 2]
+    async with database.async_session_factory() as session:
+        product = await session.get(ProductORM, 100)
+    assert (product.title, product.description) == ('imported', '')
+
+
+@pytest.mark.asyncio
+async def test_import_ndjson_rejects_missing_references(database: Database, tmp_path: Path):
+    path = tmp_path / 'reviews.ndjson'
+    rows = [
+        {'content': 'first', 'user_id': 1, 'product_id': 1},
+        {'content': 'unknown product', 'user_id': 1, 'product_id': 100},
+        {'content': 'no user', 'product_id': 1},
+        {'content': 'second', 'user_id': 2, 'product_id': 3},
+    ]
+    path.write_text('\n'.join(json.dumps(row) for row in rows) + '\n')
+    before = await count(database, ReviewORM)
+
+    report: ImportReport = await import_file(database, 'reviews', path, chunk_size=3)
+
+    assert (report.imported, report.rejected) == (2, 2)
+    assert sorted((r.line, r.reason) for r in report.rejects) == [
+        (2, 'products 100 does not exist'),
+        (3, '"user_id" is required'),
+    ]
+    assert await count(database, ReviewORM) == before + 2
+    assert report.as_dict()['rowsPerSecond'] > 0
@@ -0,0 +1,201 @@
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.models import ProductORM, ReviewORM
+from product_service.core.settings import config
+
+CREATE_REVIEWS_MUTATION = """
+mutation CreateReviews($input: [ReviewInput!]!) {
+  reviews {
+    createReviews(input: $input) {
+      items {
+        id
+        content
+        user {
+          ... on User {
+            username
+          }
+        }
+      }
+      errors {
+        index
+        code
+        message
+      }
+    }
+  }
+}
+"""
+
+UPDATE_PRODUCTS_MUTATION = """
+mutation UpdateProducts($input: [UpdateProductItemInput!]!) {
+  products {
+    updateProducts(input: $input) {
+      items {
+        id
+        title
+        description
+      }
+      errors {
+        index
+        code
+      }
+    }
+  }
+}
+"""
+
+CREATE_PRODUCTS_MUTATION = """
+mutation CreateProducts($input: [ProductInput!]!) {
+  products {
+    createProducts(input: $input) {
+      items {
+        title
+      }
+      errors {
+        index
+        code
+        message
+      }
+    }
+  }
+}
+"""
+
+DELETE_PRODUCTS_MUTATION = """
+mutation DeleteProducts($ids: [ID!]!) {
+  products {
+    deleteProducts(ids: $ids) {
+      deletedIds
+      errors {
+        index
+        code
+      }
+    }
+  }
+}
+"""
+
+
+async def count_reviews(database: Database, **filters: int) -> int:
+    async with database.async_session_factory() as session:
+        stmt = select(func.count()).select_from(ReviewORM).filter_by(**filters)
+        return (await session.execute(stmt)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_create_reviews_reports_missing_references(
+    client: httpx.AsyncClient, database: Database,
+):
+    reviews = [
+        {'content': 'first', 'userId': 1, 'productId': 2},
+        {'content': 'unknown user', 'userId': 100, 'productId': 2},
+        {'content': 'second', 'userId': 2, 'productId': 2},
+    ]
+
+    response = await client.post(
+        '/graphql', json={'query': CREATE_REVIEWS_MUTATION, 'variables': {'input': reviews}},
+    )
+
+    payload = response.json()['data']['reviews']['createReviews']
+    assert [(r['content'], r['user']['username']) for r in payload['items']] == [
+        ('first', 'user1'), ('second', 'user2'),
+    ]
+    assert payload['errors'] == [
+        {'index': 1, 'code': 'NOT_FOUND', 'message': 'UserORM not found, id: 100'},
+    ]
+    assert await count_reviews(database, product_id=2) == 4 + 2
+
+
+@pytest.mark.asyncio
+async def test_invalid_items_do_not_fail_the_batch(client: httpx.AsyncClient, database: Database):
+    too_long = 't' * 51
+    products = [
+        {'title': 'first', 'description': 'd'},
+        {'title': too_long, 'description': 'd'},
+        {'title': 'second', 'description': 'd'},
+    ]
+
+    response = await client.post(
+        '/graphql', json={'query': CREATE_PRODUCTS_MUTATION, 'variables': {'input': products}},
+    )
+    created = response.json()['data']['products']['createProducts']
+    response = await client.post(
+        '/graphql',
+        json={
+            'query': UPDATE_PRODUCTS_MUTATION,
+            'variables': {'input': [
+                {'id': 1, 'title': too_long, 'description': 'd'},
+                {'id': 2, 'title': 'renamed', 'description': 'd'},
+            ]},
+        },
+    )
+    updated = response.json()['data']['products']['updateProducts']
+
+    assert created['items'] == [{'title': 'first'}, {'title': 'second'}]
+    assert created['errors'] == [{
+        'index': 1, 'code': 'INVALID', 'message': '"title" is longer than 50 characters',
+    }]
+    assert [item['title'] for item in updated['items']] == ['renamed']
+    assert updated['errors'] == [{'index': 0, 'code': 'INVALID'}]
+    async with database.async_session_factory() as session:
+        titles = (await session.execute(select(ProductORM.title))).scalars().all()
+    assert too_long not in titles
+    assert {'product1', 'renamed', 'first', 'second'} <= set(titles)
+
+
+@pytest.mark.asyncio
+async def test_update_products_in_chunks(
+    client: httpx.AsyncClient,
+    sql_statements: list[str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(config, 'BULK_CHUNK_SIZE', 2)
+    products = [
+        {'id': 1, 'title': 'new1', 'description': 'd1'},
+        {'id': 100, 'title': 'missing'},
+        {'id': 3, 'title': 'new3', 'description': 'd3'},
+    ]
+
+    response = await client.post(
+        '/graphql', json={'query': UPDATE_PRODUCTS_MUTATION, 'variables': {'input': products}},
+    )
+
+    payload = response.json()['data']['products']['updateProducts']
+    assert payload['items'] == [
+        {'id': '1', 'title': 'new1', 'description': 'd1'},
+        {'id': '3', 'title': 'new3', 'description': 'd3'},
+    ]
+    assert payload['errors'] == [{'index': 1, 'code': 'NOT_FOUND'}]
+    # one existence check and one executemany UPDATE per chunk
+    assert [s.split()[0] for s in sql_statements] == ['SELECT', 'UPDATE', 'SELECT', 'UPDATE']
+
+
+@pytest.mark.asyncio
+async def test_delete_products_with_their_reviews(
+    client: httpx.AsyncClient, database: Database,
+):
+    response = await client.post(
+        '/graphql', json={'query': DELETE_PRODUCTS_MUTATION, 'variables': {'ids': [1, 100, 2]}},
+    )
+
+    payload = response.json()['data']['products']['deleteProducts']
+    assert payload == {'deletedIds': ['1', '2'], 'errors': [{'index': 1, 'code': 'NOT_FOUND'}]}
+    assert await count_reviews(database) == 4 * 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_mutations_are_limited(
+    client: httpx.AsyncClient, database: Database, monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(config, 'BULK_MAX_ITEMS', 2)
+
+    response = await client.post(
+        '/graphql', json={'query': DELETE_PRODUCTS_MUTATION, 'variables': {'ids': [1, 2, 3]}},
+    )
+
+    [error] = response.json()['errors']
+    assert error['message'] == 'Bulk mutations accept at most 2 items, got 3'
+    assert await count_reviews(database) == 4 * 5
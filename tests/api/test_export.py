@@ -0,0 +1,55 @@
+import gzip
+import json
+
+import httpx
+import pytest
+
+from product_service.api.export import export_statement, stream_ndjson
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.bulk_import import TABLES
+
+
+@pytest.mark.asyncio
+async def test_export_selected_columns_by_id_range(client: httpx.AsyncClient):
+    response = await client.get(
+        '/export/reviews',
+        params={'columns': 'id,product_id', 'min_id': 4, 'max_id': 6},
+        headers={'Accept-Encoding': 'identity'},
+    )
+
+    assert response.status_code == 200
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {'id': 4, 'product_id': 1}, {'id': 5, 'product_id': 2}, {'id': 6, 'product_id': 2},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_export_is_compressed(client: httpx.AsyncClient):
+    response = await client.get('/export/users', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['content-encoding'] == 'gzip'
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert users[0] == {'id': 1, 'username': 'user1'}
+    assert len(users) == 5
+
+
+@pytest.mark.asyncio
+async def test_rows_are_streamed_in_batches(database: Database):
+    stmt = export_statement(TABLES['products'], ('id',))
+
+    chunks = [chunk async for chunk in stream_ndjson(database, stmt, gzip=True, batch_size=2)]
+
+    lines = gzip.decompress(b''.join(chunks)).decode().splitlines()
+    assert lines == [f'{{"id":{i}}}' for i in range(1, 6)]
+    # batches of 2, 2 and 1 rows and the end of the gzip stream
+    assert len(chunks) == 4
+
+
+@pytest.mark.asyncio
+async def test_unknown_columns_are_rejected(client: httpx.AsyncClient):
+    response = await client.get('/export/users', params={'columns': 'id,password'})
+
+    assert response.status_code == 400
+    assert response.json() == {'detail': 'Unknown columns of users: password'}
+    assert (await client.get('/export/orders')).status_code == 404
@@ -0,0 +1,44 @@
+import httpx
+import pytest
+
+from product_service.core.db.sqlalchemy import Database
+
+
+@pytest.mark.asyncio
+async def test_ready_reports_pool_metrics(client: httpx.AsyncClient):
+    response = await client.get('/health/ready')
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['status'] == 'ready'
+    assert body['pool']['checkouts'] >= 1
+    assert body['pool']['checked_out'] == 0
+
+
+@pytest.mark.asyncio
+async def test_ready_fails_when_database_is_unavailable(
+    client: httpx.AsyncClient,
+    database: Database,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    async def ping(timeout: float | None = None) -> bool:
+        return False
+
+    monkeypatch.setattr(database, 'ping', ping)
+
+    response = await client.get('/health/ready')
+
+    assert response.status_code == 503
+    assert response.json()['status'] == 'unavailable'
+
+
+@pytest.mark.asyncio
+async def test_warm_up_fills_pool(database: Database):
+    await database.engine.dispose()
+
+    opened = await database.warm_up(connections=3)
+
+    metrics = database.pool_metrics()
+    assert opened == 3
+    assert metrics['checked_in'] == 3
+    assert metrics['connects'] >= 3
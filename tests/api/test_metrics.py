@@ -0,0 +1,163 @@
+import re
+
+import httpx
+import pytest
+
+from product_service.api.graphql.v1.metrics import (
+    ERRORS,
+    OPERATION_DURATION,
+    OPERATION_SQL_ROWS,
+    OPERATION_SQL_STATEMENTS,
+    RESOLVER_DURATION,
+    MetricsExtension,
+    operation_fingerprint,
+)
+from product_service.core.metrics import Counter, Histogram, Registry
+
+GET_PRODUCT_QUERY = """
+query Product($id: ID!) {
+  product(id: $id) {
+    title
+    reviews(first: 2) {
+      edges {
+        node {
+          content
+        }
+      }
+    }
+  }
+}
+"""
+
+DELETE_REVIEW_MUTATION = """
+mutation {
+  reviews {
+    deleteReview(id: 1000) {
+      success
+    }
+  }
+}
+"""
+
+INVALID_ID_QUERY = '{ product(id: "x") { title } }'
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    for metric in (
+        OPERATION_DURATION, RESOLVER_DURATION, OPERATION_SQL_STATEMENTS, OPERATION_SQL_ROWS, ERRORS,
+    ):
+        metric.clear()
+    MetricsExtension.operations.clear()
+    MetricsExtension._resolver_children.clear()
+
+
+def sample(body: str, name: str, **labels: str) -> float:
+    rendered = ','.join(f'{key}="{value}"' for key, value in labels.items())
+    rendered = f'{{{rendered}}}' if rendered else ''
+    match = re.search(rf'^{name}{re.escape(rendered)} (\S+)$', body, re.MULTILINE)
+    assert match is not None, f'{name} {labels} not found'
+    return float(match.group(1))
+
+
+def test_histogram_is_rendered_cumulatively():
+    registry = Registry()
+    histogram = registry.register(Histogram('latency', 'Latency', ('operation',), buckets=(1, 5)))
+    counter = registry.register(Counter('errors', 'Errors', ('type',)))
+    child = histogram.labels('a"b')
+
+    for value in (0.5, 2, 10):
+        child.observe(value)
+    counter.labels('ValueError').inc()
+
+    assert histogram.labels('a"b') is child
+    assert registry.collect().splitlines() == [
+        '# HELP latency Latency',
+        '# TYPE latency histogram',
+        'latency_bucket{operation="a\\"b",le="1"} 1',
+        'latency_bucket{operation="a\\"b",le="5"} 2',
+        'latency_bucket{operation="a\\"b",le="+Inf"} 3',
+        'latency_sum{operation="a\\"b"} 12.5',
+        'latency_count{operation="a\\"b"} 3',
+        '# HELP errors_total Errors',
+        '# TYPE errors_total counter',
+        'errors_total{type="ValueError"} 1',
+    ]
+
+
+def test_registry_labels_are_added_to_every_sample():
+    registry = Registry()
+    histogram = registry.register(Histogram('latency', 'Latency', buckets=(1,)))
+    counter = registry.register(Counter('errors', 'Errors', ('type',)))
+    histogram.labels().observe(0.5)
+    counter.labels('ValueError').inc()
+
+    registry.set_labels(worker='1')
+
+    assert registry.collect().splitlines() == [
+        '# HELP latency Latency',
+        '# TYPE latency histogram',
+        'latency_bucket{worker="1",le="1"} 1',
+        'latency_bucket{worker="1",le="+Inf"} 1',
+        'latency_sum{worker="1"} 0.5',
+        'latency_count{worker="1"} 1',
+        '# HELP errors_total Errors',
+        '# TYPE errors_total counter',
+        'errors_total{worker="1",type="ValueError"} 1',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_operation_metrics(client: httpx.AsyncClient):
+    for id in (1, 2):
+        await client.post('/graphql', json={'query': GET_PRODUCT_QUERY, 'variables': {'id': id}})
+
+    response = await client.get('/metrics')
+
+    body = response.text
+    assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+    operation = operation_fingerprint(GET_PRODUCT_QUERY, 'Product')
+    assert operation.startswith('Product:')
+    assert sample(body, 'graphql_operation_duration_seconds_count', operation=operation) == 2
+    for field in ('Query.product', 'Product.reviews'):
+        assert sample(
+            body, 'graphql_resolver_duration_seconds_count', operation=operation, field=field,
+        ) == 2
+    assert 'field="Product.title"' not in body
+    # product and its reviews
+    assert sample(body, 'graphql_operation_sql_statements_sum', operation=operation) == 4
+    assert sample(body, 'graphql_operation_sql_rows_sum', operation=operation) == 2 + 6
+    assert sample(body, 'statement_cache_misses_total') > 0
+    assert 'db_pool_checkouts_total' in body
+
+
+@pytest.mark.asyncio
+async def test_resolvers_are_recorded_by_their_own_operation(client: httpx.AsyncClient):
+    await client.post('/graphql', json={'query': INVALID_ID_QUERY})
+    await client.post('/graphql', json={'query': GET_PRODUCT_QUERY, 'variables': {'id': 1}})
+
+    body = (await client.get('/metrics')).text
+
+    for query, operation_name in ((INVALID_ID_QUERY, None), (GET_PRODUCT_QUERY, 'Product')):
+        operation = operation_fingerprint(query, operation_name)
+        assert sample(
+            body,
+            'graphql_resolver_duration_seconds_count',
+            operation=operation,
+            field='Query.product',
+        ) == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_counted_by_type(client: httpx.AsyncClient):
+    for query in (DELETE_REVIEW_MUTATION, DELETE_REVIEW_MUTATION, INVALID_ID_QUERY):
+        await client.post('/graphql', json={'query': query})
+
+    body = (await client.get('/metrics')).text
+
+    for query, error_type, count in (
+        (DELETE_REVIEW_MUTATION, 'NoResultFound', 2),
+        (INVALID_ID_QUERY, 'ValueError', 1),
+    ):
+        operation = operation_fingerprint(query, None)
+        assert sample(body, 'graphql_errors_total', operation=operation, type=error_type) == count
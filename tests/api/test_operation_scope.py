@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from sqlalchemy import event
+
+from product_service.core.db.sqlalchemy import Database
+
+CONCURRENT_FIELDS_QUERY = """
+query Query {
+  users(first: 5) {
+    totalCount
+    edges {
+      node {
+        username
+        reviews(first: 2) {
+          totalCount
+          edges {
+            node {
+              product {
+                ... on Product {
+                  title
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+  products(first: 5) {
+    totalCount
+  }
+}
+"""
+
+
+@pytest.mark.asyncio
+async def test_operation_uses_one_connection(client: httpx.AsyncClient, database: Database):
+    checkouts: list[object] = []
+
+    @event.listens_for(database.engine.sync_engine, 'checkout')
+    def collect(dbapi_connection, connection_record, connection_proxy):
+        checkouts.append(dbapi_connection)
+
+    response = await client.post('/graphql', json={'query': CONCURRENT_FIELDS_QUERY})
+
+    body = response.json()
+    assert 'errors' not in body
+    assert body['data']['users']['totalCount'] == 5
+    assert body['data']['products']['totalCount'] == 5
+    assert all(
+        edge['node']['reviews']['totalCount'] == 4 for edge in body['data']['users']['edges']
+    )
+    assert len(checkouts) == 1
@@ -0,0 +1,127 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+import strawberry.schema.schema
+
+from product_service.api.graphql.v1.persisted_queries import PersistedQueryStore, sha256_hash
+from product_service.api.graphql.v1.resolvers.base import BaseStrawberryResolver
+
+GET_USERS_QUERY = """
+query Query {
+  users(first: 2) {
+    edges {
+      node {
+        id
+        username
+      }
+    }
+  }
+}
+"""
+GET_USERS_QUERY_HASH = sha256_hash(GET_USERS_QUERY)
+
+
+def persisted(sha256: str) -> dict:
+    return {'persistedQuery': {'version': 1, 'sha256Hash': sha256}}
+
+
+@pytest.mark.asyncio
+async def test_unknown_hash_asks_for_query(client: httpx.AsyncClient):
+    response = await client.post(
+        '/graphql', json={'extensions': persisted(GET_USERS_QUERY_HASH)},
+    )
+
+    error = response.json()['errors'][0]
+    assert error['message'] == 'PersistedQueryNotFound'
+    assert error['extensions']['code'] == 'PERSISTED_QUERY_NOT_FOUND'
+
+
+@pytest.mark.asyncio
+async def test_registered_query_is_executed_by_hash(
+    client: httpx.AsyncClient,
+    persisted_query_store: PersistedQueryStore,
+):
+    await client.post(
+        '/graphql',
+        json={'query': GET_USERS_QUERY, 'extensions': persisted(GET_USERS_QUERY_HASH)},
+    )
+
+    response = await client.get(
+        '/graphql', params={'extensions': json.dumps(persisted(GET_USERS_QUERY_HASH))},
+    )
+
+    edges = response.json()['data']['users']['edges']
+    assert [edge['node']['username'] for edge in edges] == ['user1', 'user2']
+    operation = persisted_query_store.get(GET_USERS_QUERY_HASH)
+    assert operation is not None
+    assert operation.document is not None
+    assert operation.validation_errors == []
+
+
+@pytest.mark.asyncio
+async def test_hash_mismatch_is_rejected(client: httpx.AsyncClient):
+    response = await client.post(
+        '/graphql',
+        json={'query': GET_USERS_QUERY, 'extensions': persisted('0' * 64)},
+    )
+
+    assert response.json()['errors'][0]['message'] == 'provided sha does not match query'
+
+
+@pytest.mark.asyncio
+async def test_hot_operation_skips_parsing_and_selection_walking(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    calls = {'parse': 0, 'selected_fields': 0}
+    parse = strawberry.schema.schema.parse
+    build_selected_fields = BaseStrawberryResolver._build_selected_fields.__func__
+
+    def counting_parse(*args, **kwargs):
+        calls['parse'] += 1
+        return parse(*args, **kwargs)
+
+    def counting_build_selected_fields(cls, *args, **kwargs):
+        calls['selected_fields'] += 1
+        return build_selected_fields(cls, *args, **kwargs)
+
+    monkeypatch.setattr(strawberry.schema.schema, 'parse', counting_parse)
+    monkeypatch.setattr(
+        BaseStrawberryResolver,
+        '_build_selected_fields',
+        classmethod(counting_build_selected_fields),
+    )
+
+    for _ in range(3):
+        response = await client.post(
+            '/graphql',
+            json={'query': GET_USERS_QUERY, 'extensions': persisted(GET_USERS_QUERY_HASH)},
+        )
+        assert 'errors' not in response.json()
+
+    assert calls == {'parse': 1, 'selected_fields': 1}
+
+
+class TestAllowlist:
+    @pytest.fixture
+    def persisted_query_store(self, tmp_path: Path) -> PersistedQueryStore:
+        path = tmp_path / 'persisted-queries.json'
+        path.write_text(json.dumps({GET_USERS_QUERY_HASH: GET_USERS_QUERY}))
+        return PersistedQueryStore.from_file(path, strict=True)
+
+    @pytest.mark.asyncio
+    async def test_allowlisted_query_is_executed(self, client: httpx.AsyncClient):
+        response = await client.post(
+            '/graphql', json={'extensions': persisted(GET_USERS_QUERY_HASH)},
+        )
+
+        assert len(response.json()['data']['users']['edges']) == 2
+
+    @pytest.mark.asyncio
+    async def test_query_outside_of_allowlist_is_rejected(self, client: httpx.AsyncClient):
+        response = await client.post('/graphql', json={'query': '{ users { totalCount } }'})
+
+        error = response.json()['errors'][0]
+        assert error['extensions']['code'] == 'PERSISTED_QUERY_NOT_ALLOWED'
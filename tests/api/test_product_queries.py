@@ -0,0 +1,51 @@
+import httpx
+import pytest
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.models import ProductORM
+
+GET_PRODUCTS_WITH_REVIEWS_QUERY = """
+query Query($first: Int!, $reviewsFirst: Int!) {
+  products(first: $first) {
+    edges {
+      node {
+        id
+        reviews(first: $reviewsFirst) {
+          edges {
+            node {
+              id
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+@pytest.mark.asyncio
+async def test_nested_reviews_are_limited_per_product(
+    client: httpx.AsyncClient,
+    database: Database,
+    sql_statements: list[str],
+):
+    async with database.async_session_factory() as session:
+        session.add(ProductORM(title='no reviews', description='description'))
+        await session.commit()
+    sql_statements.clear()
+
+    response = await client.post(
+        '/graphql',
+        json={
+            'query': GET_PRODUCTS_WITH_REVIEWS_QUERY,
+            'variables': {'first': 10, 'reviewsFirst': 2},
+        },
+    )
+
+    products = [edge['node'] for edge in response.json()['data']['products']['edges']]
+
+    assert len(products) == 6
+    assert [len(p['reviews']['edges']) for p in products] == [2, 2, 2, 2, 2, 0]
+    # products and one batch of reviews, product without reviews is not queried again
+    assert len(sql_statements) == 2
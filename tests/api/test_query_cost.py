@@ -0,0 +1,135 @@
+import httpx
+import pytest
+from graphql import parse
+
+from product_service.api.graphql.v1.cost import QueryCostAnalyzer, QueryCostLimiter
+from product_service.main import graphql_app_factory
+
+NESTED_QUERY = """
+query Query($first: Int!) {
+  users(first: $first) {
+    totalCount
+    edges {
+      node {
+        ...userFields
+      }
+    }
+  }
+}
+
+fragment userFields on User {
+  username
+  reviews(first: 3) {
+    edges {
+      node {
+        product {
+          title
+        }
+      }
+    }
+  }
+}
+"""
+
+DEEP_QUERY = """
+query {
+  review(id: 1) {
+    user {
+      ... on User {
+        reviews {
+          edges {
+            node {
+              product {
+                ... on Product {
+                  reviews {
+                    edges {
+                      node {
+                        user {
+                          ... on User {
+                            reviews {
+                              totalCount
+                            }
+                          }
+                        }
+                      }
+                    }
+                  }
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def analyze(query: str, **variables: int):
+    schema = graphql_app_factory().schema._schema  # type: ignore[attr-defined]
+    return QueryCostAnalyzer(schema, parse(query), variables).analyze()
+
+
+def test_cost_multiplies_nested_pages():
+    cost = analyze(NESTED_QUERY, first=10)
+
+    # users + totalCount + 10 * reviews + 10 * 3 * product
+    assert cost.as_dict() == {'cost': 1 + 1 + 10 + 30, 'depth': 3, 'pageSize': 10}
+
+
+def test_depth_skips_connection_edges():
+    cost = analyze(DEEP_QUERY)
+
+    assert cost.depth == 7
+
+
+@pytest.mark.asyncio
+async def test_cost_is_reported_in_extensions(client: httpx.AsyncClient):
+    response = await client.post(
+        '/graphql', json={'query': NESTED_QUERY, 'variables': {'first': 2}},
+    )
+
+    body = response.json()
+    assert 'errors' not in body
+    assert len(body['data']['users']['edges']) == 2
+    assert body['extensions']['cost']['cost'] == 1 + 1 + 2 + 6
+    assert body['extensions']['cost']['maxCost'] == QueryCostLimiter.max_cost
+
+
+@pytest.mark.asyncio
+async def test_too_large_page_is_rejected(client: httpx.AsyncClient, sql_statements: list[str]):
+    response = await client.post(
+        '/graphql',
+        json={'query': NESTED_QUERY, 'variables': {'first': QueryCostLimiter.max_page_size + 1}},
+    )
+
+    error = response.json()['errors'][0]
+    assert error['extensions']['code'] == 'PAGE_SIZE_TOO_LARGE'
+    assert response.json()['data'] is None
+    assert sql_statements == []
+
+
+@pytest.mark.asyncio
+async def test_too_deep_query_is_rejected(client: httpx.AsyncClient):
+    response = await client.post('/graphql', json={'query': DEEP_QUERY})
+
+    error = response.json()['errors'][0]
+    assert error['extensions']['code'] == 'QUERY_TOO_DEEP'
+    assert response.json()['extensions']['cost']['depth'] == 7
+
+
+@pytest.mark.asyncio
+async def test_too_expensive_query_is_rejected(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(QueryCostLimiter, 'max_cost', 20)
+
+    response = await client.post(
+        '/graphql', json={'query': NESTED_QUERY, 'variables': {'first': 5}},
+    )
+
+    error = response.json()['errors'][0]
+    assert error['extensions']['code'] == 'QUERY_TOO_COMPLEX'
+    assert error['message'] == 'Query cost 22 exceeds maximum cost 20'
@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.query_log import QueryLogWriter, redact
+
+GET_USER_QUERY = """
+query {
+  user(id: 2) {
+    ... on User {
+      username
+    }
+  }
+}
+"""
+
+
+async def log_records(
+    client: httpx.AsyncClient, database: Database, path: Path, **options: float | None,
+) -> list[dict]:
+    for name, value in options.items():
+        setattr(database.query_log, name, value)
+    writer = QueryLogWriter(str(path))
+    writer.start()
+    try:
+        response = await client.post('/graphql', json={'query': GET_USER_QUERY})
+    finally:
+        writer.stop()
+    assert 'errors' not in response.json()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_parameters_are_redacted():
+    assert redact((1, 'secret')) == ['int', 'str']
+    assert redact([{'id': 1, 'title': 'secret'}]) == [{'id': 'int', 'title': 'str'}]
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_logged(
+    client: httpx.AsyncClient, database: Database, tmp_path: Path,
+):
+    records = await log_records(
+        client, database, tmp_path / 'sql.jsonl', sample_rate=0.0, slow_threshold=0.0,
+    )
+
+    [record] = records
+    assert record['level'] == 'WARNING'
+    assert record['message'] == 'slow SQL statement'
+    assert record['statement'].startswith('SELECT')
+    assert record['parameters'] == ['int']
+    assert record['path'] is None
+    assert record['rows'] == 1
+    assert record['slow'] is True
+    assert record['durationMs'] >= 0
+
+
+@pytest.mark.asyncio
+async def test_statements_are_sampled(
+    client: httpx.AsyncClient, database: Database, tmp_path: Path,
+):
+    assert await log_records(
+        client, database, tmp_path / 'none.jsonl', sample_rate=0.0, slow_threshold=60.0,
+    ) == []
+
+    [record] = await log_records(client, database, tmp_path / 'all.jsonl', sample_rate=1.0)
+    assert record['level'] == 'INFO'
+    assert record['slow'] is False
@@ -0,0 +1,115 @@
+import shutil
+from pathlib import Path
+from typing import AsyncGenerator
+
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from product_service.api.graphql.v1.replicas import READ_YOUR_WRITES_COOKIE
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.replicas import SESSIONS, ReplicaSet
+
+USER_QUERY = '{ user(id: 1) { ... on User { username } } }'
+
+UPDATE_USER_MUTATION = """
+mutation {
+  users {
+    updateUser(id: 1, input: {username: "renamed"}) {
+      ... on User {
+        username
+      }
+    }
+  }
+}
+"""
+
+
+@pytest.fixture
+def route_reads() -> bool:
+    return True
+
+
+async def rename_users(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE users SET username = 'replica-' || username"))
+
+
+@pytest_asyncio.fixture
+async def database(database: Database, tmp_path: Path) -> AsyncGenerator[Database, None]:
+    """Primary with one replica, a copy of the primary whose users are renamed"""
+    shutil.copy(tmp_path / 'test.db', tmp_path / 'replica.db')
+    db = Database(
+        url=f'sqlite+aiosqlite:///{tmp_path / "test.db"}',
+        replica_urls=[f'sqlite+aiosqlite:///{tmp_path / "replica.db"}'],
+    )
+    await rename_users(db.replicas.replicas[0].engine)
+    yield db
+    for engine in db.engines:
+        await engine.dispose()
+
+
+async def username(client: httpx.AsyncClient) -> str:
+    response = await client.post('/graphql', json={'query': USER_QUERY})
+    return response.json()['data']['user']['username']
+
+
+@pytest.mark.asyncio
+async def test_queries_read_from_replica_until_client_writes(client: httpx.AsyncClient):
+    sessions = SESSIONS.labels('replica0', 'read')
+    before = sessions.value
+
+    assert await username(client) == 'replica-user1'
+    assert sessions.value == before + 1
+
+    response = await client.post('/graphql', json={'query': UPDATE_USER_MUTATION})
+    assert response.json()['data']['users']['updateUser'] == {'username': 'renamed'}
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+    # reads of the client stick to the primary after its mutation
+    assert await username(client) == 'renamed'
+
+    client.cookies.clear()
+    assert await username(client) == 'replica-user1'
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_is_skipped(
+    client: httpx.AsyncClient, database: Database, tmp_path: Path,
+):
+    replica = database.replicas.replicas[0]
+    (tmp_path / 'replica.db').unlink()
+    (tmp_path / 'replica.db').mkdir()
+    await replica.engine.dispose()
+
+    await database.replicas.check()
+
+    assert database.replicas.metrics()['replica0']['healthy'] is False
+    assert await username(client) == 'user1'
+
+    (tmp_path / 'replica.db').rmdir()
+    shutil.copy(tmp_path / 'test.db', tmp_path / 'replica.db')
+    await rename_users(replica.engine)
+    await database.replicas.check()
+    assert replica.healthy
+    assert await username(client) == 'replica-user1'
+    response = await client.get('/health/replicas')
+    assert response.json() == {'replica0': {'healthy': True, 'failures': 1, 'connections': 0}}
+
+
+@pytest.mark.asyncio
+async def test_balancing(tmp_path: Path):
+    databases = [Database(url=f'sqlite+aiosqlite:///{tmp_path / f"{i}.db"}') for i in range(3)]
+    replicas = ReplicaSet([db.engine for db in databases])
+    replicas.replicas[1].healthy = False
+
+    assert [replicas.choose().name for _ in range(4)] == [
+        'replica0', 'replica2', 'replica0', 'replica2',
+    ]
+
+    least_connections = ReplicaSet([db.engine for db in databases], 'least_connections')
+    async with databases[0].engine.connect():
+        assert least_connections.choose().name == 'replica1'
+    for db in databases:
+        await db.engine.dispose()
@@ -0,0 +1,254 @@
+import asyncio
+
+import httpx
+import pytest
+
+from product_service.api.graphql.v1.response_cache import (
+    ResponseCache,
+    ResponseCacheExtension,
+    response_cache,
+)
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.models import ProductORM
+
+GET_PRODUCT_QUERY = """
+query Query($id: ID!) {
+  product(id: $id) {
+    id
+    title
+  }
+}
+"""
+
+GET_PRODUCTS_COUNT_QUERY = """
+query {
+  products {
+    totalCount
+  }
+}
+"""
+
+CREATE_PRODUCT_MUTATION = """
+mutation {
+  products {
+    createProduct(input: {title: "new", description: "description"}) {
+      ... on Product {
+        id
+      }
+    }
+  }
+}
+"""
+
+
+UPDATE_PRODUCT_MUTATION = """
+mutation {
+  products {
+    updateProducts(input: [{id: 2, title: "renamed", description: "description"}]) {
+      items {
+        id
+      }
+    }
+  }
+}
+"""
+
+GET_REVIEWS_WITH_PRODUCTS_QUERY = """
+query {
+  reviews(first: 8) {
+    edges {
+      node {
+        ...ReviewFields
+      }
+    }
+  }
+}
+
+fragment ReviewFields on Review {
+  id
+  product {
+    productId: id
+  }
+}
+"""
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def cache_responses() -> bool:
+    return True
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    response_cache.clear()
+    monkeypatch.setattr(response_cache, 'clock', clock)
+    monkeypatch.setattr(response_cache, 'ttl', {'product': 10.0})
+    monkeypatch.setattr(response_cache, 'stale_ttl', 5.0)
+    yield clock
+    response_cache.clear()
+
+
+async def get_product_title(client: httpx.AsyncClient, query: str = GET_PRODUCT_QUERY) -> str:
+    response = await client.post('/graphql', json={'query': query, 'variables': {'id': 1}})
+    return response.json()['data']['product']['title']
+
+
+async def set_title_directly(database: Database, title: str) -> None:
+    async with database.async_session_factory() as session:
+        product = await session.get(ProductORM, 1)
+        product.title = title
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(
+    client: httpx.AsyncClient,
+    sql_statements: list[str],
+):
+    assert await get_product_title(client) == 'product1'
+    queried = len(sql_statements)
+
+    # same operation written differently
+    reformatted = ' '.join(GET_PRODUCT_QUERY.split()).replace('title', 'title,')
+    assert await get_product_title(client, reformatted) == 'product1'
+
+    assert len(sql_statements) == queried
+    metrics = (await client.get('/health/response-cache')).json()
+    assert (metrics['hits'], metrics['misses'], metrics['entries']) == (1, 1, 1)
+    assert metrics['bytes'] > 0
+
+
+@pytest.mark.asyncio
+async def test_mutation_invalidates_cached_entity(client: httpx.AsyncClient):
+    async def count_products() -> int:
+        response = await client.post('/graphql', json={'query': GET_PRODUCTS_COUNT_QUERY})
+        return response.json()['data']['products']['totalCount']
+
+    assert await count_products() == 5
+    assert await get_product_title(client) == 'product1'
+
+    response = await client.post('/graphql', json={'query': CREATE_PRODUCT_MUTATION})
+
+    assert response.json()['data']['products']['createProduct']['id'] == '6'
+    assert len(response_cache) == 0
+    assert await count_products() == 6
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_responses_with_the_entity(client: httpx.AsyncClient):
+    async def post(query: str, **variables) -> dict:
+        response = await client.post('/graphql', json={'query': query, 'variables': variables})
+        return response.json()['data']
+
+    await post(GET_PRODUCT_QUERY, id=1)
+    await post(GET_PRODUCT_QUERY, id=2)
+    # reviews 5-8 are of product 2, their product ids are selected under an alias
+    await post(GET_REVIEWS_WITH_PRODUCTS_QUERY)
+    # ids of the products are not selected, any product update may change the response
+    await post('{ products { edges { node { title } } } }')
+    assert len(response_cache) == 4
+
+    response = await client.post('/graphql', json={'query': UPDATE_PRODUCT_MUTATION})
+
+    assert response.json()['data']['products']['updateProducts'] == {'items': [{'id': '2'}]}
+    assert len(response_cache) == 1
+    assert response_cache.get(response_cache.key(GET_PRODUCT_QUERY, 'Query', {'id': 1}))[0]
+    assert (await post(GET_PRODUCT_QUERY, id=2))['product']['title'] == 'renamed'
+
+
+def test_entities_are_tagged_by_id():
+    cache = ResponseCache()
+    tags = frozenset({'product', 'review'})
+    cache.set('first', {}, tags, ids=frozenset({'product:1', 'review:1'}))
+    cache.set('second', {}, tags, ids=frozenset({'product:2', 'review:2'}))
+    cache.set('unknown', {}, tags, ids=frozenset({'product:*'}))
+
+    assert cache.invalidate_ids('review', ['2']) == 1
+    assert cache.invalidate_ids('product', ['3']) == 1
+    assert list(cache._entries) == ['first']
+    assert cache.invalidate('product') == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_response_is_revalidated_in_background(
+    client: httpx.AsyncClient,
+    database: Database,
+    clock: Clock,
+):
+    assert await get_product_title(client) == 'product1'
+    await set_title_directly(database, 'changed')
+
+    clock.now = 11.0
+    assert await get_product_title(client) == 'product1'
+    await asyncio.gather(*ResponseCacheExtension._revalidations)
+
+    assert await get_product_title(client) == 'changed'
+    assert response_cache.metrics()['stale_hits'] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('route_reads', [True])
+async def test_stale_response_is_revalidated_with_replica_routing(
+    client: httpx.AsyncClient,
+    database: Database,
+    clock: Clock,
+):
+    # the refresh runs without the client's request, its reads are routed all the same
+    assert await get_product_title(client) == 'product1'
+    await set_title_directly(database, 'changed')
+
+    clock.now = 11.0
+    assert await get_product_title(client) == 'product1'
+    await asyncio.gather(*ResponseCacheExtension._revalidations)
+
+    assert await get_product_title(client) == 'changed'
+    (entry,) = response_cache._entries.values()
+    assert not entry.revalidating
+
+
+@pytest.mark.asyncio
+async def test_expired_response_is_not_served(
+    client: httpx.AsyncClient,
+    database: Database,
+    clock: Clock,
+):
+    assert await get_product_title(client) == 'product1'
+    await set_title_directly(database, 'changed')
+
+    clock.now = 16.0
+
+    assert await get_product_title(client) == 'changed'
+
+
+def test_least_recently_used_responses_are_evicted_by_size():
+    cache = ResponseCache(max_bytes=350)
+    tags = frozenset({'product'})
+    for i in range(3):
+        cache.set(cache.key(f'{{ product{i} }}', None, None), {'value': 'x' * 80}, tags)
+    cache.get(cache.key('{ product0 }', None, None))
+
+    cache.set(cache.key('{ product3 }', None, None), {'value': 'x' * 80}, tags)
+
+    assert cache.get(cache.key('{ product1 }', None, None))[0] is None
+    assert cache.get(cache.key('{ product0 }', None, None))[0] is not None
+    assert cache.metrics()['evictions'] == 1
+    assert cache.bytes <= 350
+
+
+def test_response_computed_before_invalidation_is_not_stored():
+    cache = ResponseCache()
+    tags = frozenset({'review'})
+    versions = cache.versions(tags)
+
+    cache.invalidate('review')
+
+    assert cache.set(cache.key('{ reviews }', None, None), {}, tags, versions) is False
@@ -0,0 +1,148 @@
+import httpx
+import pytest
+
+GET_REVIEWS_WITH_RELATED_QUERY = """
+query Query($first: Int!) {
+  reviews(first: $first) {
+    edges {
+      node {
+        id
+        product {
+          title
+        }
+        user {
+          username
+        }
+      }
+    }
+  }
+}
+"""
+
+GET_PRODUCT_REVIEWS_WITH_RELATED_QUERY = """
+query Query($id: ID!) {
+  product(id: $id) {
+    title
+    reviews {
+      edges {
+        node {
+          id
+          user {
+            username
+          }
+          product {
+            id
+            title
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+@pytest.mark.asyncio
+async def test_can_get_reviews_with_related(client: httpx.AsyncClient):
+    response = await client.post(
+        '/graphql',
+        json={'query': GET_REVIEWS_WITH_RELATED_QUERY, 'variables': {'first': 10}},
+    )
+
+    data = response.json()['data']
+
+    reviews = [edge['node'] for edge in data['reviews']['edges']]
+    assert len(reviews) == 10
+    for review in reviews:
+        assert review['product']['title']
+        assert review['user']['username']
+
+
+@pytest.mark.asyncio
+async def test_nested_review_relations_are_batched(
+    client: httpx.AsyncClient,
+    sql_statements: list[str],
+):
+    response = await client.post(
+        '/graphql',
+        json={'query': GET_PRODUCT_REVIEWS_WITH_RELATED_QUERY, 'variables': {'id': 1}},
+    )
+
+    data = response.json()['data']
+
+    reviews = [edge['node'] for edge in data['product']['reviews']['edges']]
+    assert reviews
+    assert {r['product']['id'] for r in reviews} == {'1'}
+    assert all(r['user']['username'] for r in reviews)
+    # product and one batch of its reviews joined with their users and products
+    assert len(sql_statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_only_requested_columns_are_selected(
+    client: httpx.AsyncClient,
+    sql_statements: list[str],
+):
+    await client.post(
+        '/graphql',
+        json={'query': GET_REVIEWS_WITH_RELATED_QUERY, 'variables': {'first': 10}},
+    )
+    reviews_statement = sql_statements[0]
+    sql_statements.clear()
+
+    await client.post(
+        '/graphql', json={'query': '{ reviews { edges { node { id } } } }'},
+    )
+
+    assert 'JOIN users' in reviews_statement and 'JOIN products' in reviews_statement
+    assert 'reviews.content' not in reviews_statement
+    assert 'products.description' not in reviews_statement
+    assert 'JOIN' not in sql_statements[0]
+    assert 'reviews.content' not in sql_statements[0]
+
+GET_REVIEWS_PAGE_QUERY = """
+query Query($first: Int!, $after: String) {
+  reviews(first: $first, after: $after) {
+    totalCount
+    edges {
+      cursor
+      node {
+        id
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+
+@pytest.mark.asyncio
+async def test_can_walk_reviews_with_cursors(client: httpx.AsyncClient):
+    ids: list[int] = []
+    after = None
+    while True:
+        response = await client.post(
+            '/graphql',
+            json={'query': GET_REVIEWS_PAGE_QUERY, 'variables': {'first': 3, 'after': after}},
+        )
+        connection = response.json()['data']['reviews']
+        assert connection['totalCount'] == 20
+        ids.extend(int(edge['node']['id']) for edge in connection['edges'])
+        if not connection['pageInfo']['hasNextPage']:
+            break
+        after = connection['pageInfo']['endCursor']
+
+    assert ids == list(range(1, 21))
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(client: httpx.AsyncClient):
+    response = await client.post(
+        '/graphql',
+        json={'query': GET_REVIEWS_PAGE_QUERY, 'variables': {'first': 3, 'after': 'invalid'}},
+    )
+
+    assert response.json()['errors'][0]['message'] == 'Invalid cursor: invalid'
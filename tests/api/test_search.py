@@ -0,0 +1,218 @@
+import importlib.util
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+import sqlalchemy as sql
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy.dialects import postgresql
+
+from product_service.api.graphql.v1.pagination import encode_cursor
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.models import Base, ProductORM, ReviewORM
+from product_service.core.db.sqlalchemy.search import (
+    PRODUCT_SEARCH,
+    postgres_ddl,
+    ranked_search,
+)
+
+SEARCH_PRODUCTS_QUERY = """
+query Search($query: String!, $first: Int!, $after: String) {
+  searchProducts(query: $query, first: $first, after: $after) {
+    totalCount
+    edges {
+      cursor
+      node {
+        id
+        title
+      }
+    }
+    pageInfo {
+      hasNextPage
+      endCursor
+    }
+  }
+}
+"""
+
+SEARCH_REVIEWS_QUERY = """
+query Search($query: String!, $productId: ID) {
+  searchReviews(query: $query, productId: $productId) {
+    totalCount
+    edges {
+      node {
+        id
+        content
+        product {
+          title
+        }
+      }
+    }
+  }
+}
+"""
+
+MIGRATION = Path(__file__).parents[2] / 'alembic/versions/d41f7a9e2c15_add_full_text_search.py'
+
+
+@pytest_asyncio.fixture
+async def catalog(database: Database) -> None:
+    async with database.async_session_factory() as session:
+        session.add_all([
+            ProductORM(id=10, title='Grinder', description='For espresso and filter coffee'),
+            ProductORM(id=11, title='Espresso machine', description='Pressure of 15 bar'),
+            ProductORM(id=12, title='Kettle', description='Boils water'),
+        ])
+        session.add_all([
+            ReviewORM(id=100, content='Great espresso every morning', user_id=1, product_id=11),
+            ReviewORM(id=101, content='Espresso is too bitter', user_id=2, product_id=10),
+            ReviewORM(id=102, content='Boils fast', user_id=3, product_id=12),
+        ])
+        await session.commit()
+
+
+async def search_products(client: httpx.AsyncClient, query: str, **variables) -> dict:
+    response = await client.post(
+        '/graphql',
+        json={
+            'query': SEARCH_PRODUCTS_QUERY,
+            'variables': {'query': query, 'first': 20, **variables},
+        },
+    )
+    body = response.json()
+    assert 'errors' not in body, body
+    return body['data']['searchProducts']
+
+
+@pytest.mark.asyncio
+async def test_title_matches_rank_first(client: httpx.AsyncClient, catalog: None):
+    result = await search_products(client, 'espresso')
+
+    assert [edge['node']['title'] for edge in result['edges']] == ['Espresso machine', 'Grinder']
+    assert result['totalCount'] == 2
+
+
+@pytest.mark.asyncio
+async def test_words_match_by_prefix(client: httpx.AsyncClient, catalog: None):
+    result = await search_products(client, 'espr mach')
+
+    assert [edge['node']['id'] for edge in result['edges']] == ['11']
+
+
+@pytest.mark.asyncio
+async def test_query_without_words_matches_nothing(client: httpx.AsyncClient, catalog: None):
+    result = await search_products(client, ' "* -')
+
+    assert result == {'totalCount': 0, 'edges': [], 'pageInfo': {
+        'hasNextPage': False, 'endCursor': None,
+    }}
+
+
+@pytest.mark.asyncio
+async def test_pages_follow_rank_and_id(client: httpx.AsyncClient, catalog: None):
+    # the same text gives the same rank, pages are ordered by id
+    expected = [str(id) for id in range(1, 6)]
+
+    ids, after = [], None
+    for _ in range(3):
+        result = await search_products(client, 'description', first=2, after=after)
+        ids += [edge['node']['id'] for edge in result['edges']]
+        after = result['pageInfo']['endCursor']
+        if not result['pageInfo']['hasNextPage']:
+            break
+
+    assert ids == expected
+    assert result['totalCount'] == 5
+
+
+@pytest.mark.asyncio
+async def test_cursor_without_rank_is_rejected(client: httpx.AsyncClient, catalog: None):
+    response = await client.post(
+        '/graphql',
+        json={
+            'query': SEARCH_PRODUCTS_QUERY,
+            'variables': {'query': 'espresso', 'first': 1, 'after': encode_cursor(11)},
+        },
+    )
+
+    assert response.json()['errors'][0]['message'].startswith('Invalid cursor')
+
+
+@pytest.mark.asyncio
+async def test_reviews_are_filtered_by_product(client: httpx.AsyncClient, catalog: None):
+    response = await client.post(
+        '/graphql',
+        json={'query': SEARCH_REVIEWS_QUERY, 'variables': {'query': 'espresso'}},
+    )
+    everywhere = response.json()['data']['searchReviews']
+    response = await client.post(
+        '/graphql',
+        json={'query': SEARCH_REVIEWS_QUERY, 'variables': {'query': 'espresso', 'productId': 11}},
+    )
+    of_product = response.json()['data']['searchReviews']
+
+    assert {edge['node']['id'] for edge in everywhere['edges']} == {'100', '101'}
+    assert everywhere['totalCount'] == 2
+    assert of_product['edges'] == [{'node': {
+        'id': '100',
+        'content': 'Great espresso every morning',
+        'product': {'title': 'Espresso machine'},
+    }}]
+    assert of_product['totalCount'] == 1
+
+
+@pytest.mark.asyncio
+async def test_index_follows_changes(
+    client: httpx.AsyncClient,
+    database: Database,
+    catalog: None,
+):
+    async with database.async_session_factory() as session:
+        await session.execute(
+            sql.update(ProductORM).where(ProductORM.id == 12).values(title='Espresso kettle'),
+        )
+        await session.execute(sql.delete(ReviewORM).where(ReviewORM.product_id == 10))
+        await session.execute(sql.delete(ProductORM).where(ProductORM.id == 10))
+        await session.commit()
+
+    result = await search_products(client, 'espresso')
+    assert {edge['node']['id'] for edge in result['edges']} == {'11', '12'}
+    assert (await search_products(client, 'kettle'))['totalCount'] == 1
+
+
+def test_postgres_search_uses_the_indexes():
+    statements = postgres_ddl(PRODUCT_SEARCH)
+    stmt = ranked_search(PRODUCT_SEARCH, 'postgresql', sql.select(ProductORM.id), after=True)
+    compiled = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert statements[0].startswith('ALTER TABLE products ADD COLUMN search_vector tsvector')
+    assert 'USING gin (search_vector)' in statements[1]
+    assert 'USING gin (title gin_trgm_ops)' in statements[3]
+    assert "products.search_vector @@ websearch_to_tsquery('english'::regconfig" in compiled
+    assert 'ts_rank_cd' in compiled
+    assert '<%' in compiled
+
+
+def test_migration_indexes_existing_rows():
+    spec = importlib.util.spec_from_file_location('add_full_text_search', MIGRATION)
+    assert spec is not None and spec.loader is not None
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    fts_objects = sql.text("SELECT name, sql FROM sqlite_master WHERE name LIKE '%_fts%'")
+
+    engine = sql.create_engine('sqlite://')
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        created = sorted(conn.execute(fts_objects).all())
+        with Operations.context(MigrationContext.configure(conn)):
+            migration.downgrade()
+            assert conn.execute(fts_objects).all() == []
+            conn.execute(sql.insert(ProductORM).values(id=1, title='Espresso', description=''))
+            migration.upgrade()
+
+        # the same index as the models create, filled with the rows that existed before
+        assert sorted(conn.execute(fts_objects).all()) == created
+        found = conn.execute(sql.text("SELECT rowid FROM products_fts('espresso')")).all()
+        assert found == [(1,)]
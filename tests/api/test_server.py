@@ -0,0 +1,145 @@
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+import sqlalchemy as sql
+from sqlalchemy import text
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.migrations import (
+    SchemaVersionMismatch,
+    check_schema_version,
+    head_revisions,
+)
+from product_service.core.db.sqlalchemy.models import ProductORM, UserORM
+from product_service.core.db.sqlalchemy.statements import StatementCache
+from product_service.server import default_workers
+
+ALEMBIC_CONFIG = Path(__file__).parents[2] / 'alembic.ini'
+
+# Application counting its requests, served by two forked workers
+PREFORK_SERVER = """
+import sys
+import time
+
+import uvicorn
+
+from product_service.core.metrics import CONTENT_TYPE, Counter, registry
+from product_service.server import PreforkServer
+
+REQUESTS = registry.register(Counter('requests', 'Requests'))
+
+
+async def app(scope, receive, send):
+    REQUESTS.labels().inc()
+    body = registry.collect().encode()
+    headers = [(b'content-type', CONTENT_TYPE.encode())]
+    await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+port, metrics_port = int(sys.argv[1]), int(sys.argv[2])
+config = uvicorn.Config(app, host='127.0.0.1', port=port, lifespan='off', log_level='error')
+sys.exit(PreforkServer(config, 2, time.perf_counter(), metrics_port=metrics_port).run())
+"""
+
+
+async def stamp(database: Database, revision: str) -> None:
+    async with database.engine.begin() as conn:
+        await conn.execute(text(
+            'CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)'
+        ))
+        await conn.execute(text('DELETE FROM alembic_version'))
+        await conn.execute(text('INSERT INTO alembic_version VALUES (:v)'), {'v': revision})
+
+
+@pytest.mark.asyncio
+async def test_schema_check_requires_head_revision(database: Database):
+    (head,) = head_revisions(ALEMBIC_CONFIG)
+
+    with pytest.raises(SchemaVersionMismatch, match='none, expected'):
+        await check_schema_version(database, ALEMBIC_CONFIG)
+
+    await stamp(database, 'outdated')
+    with pytest.raises(SchemaVersionMismatch) as e:
+        await check_schema_version(database, ALEMBIC_CONFIG)
+    assert e.value.database == {'outdated'}
+    assert 'alembic upgrade head' in str(e.value)
+
+    await stamp(database, head)
+    assert await check_schema_version(database, ALEMBIC_CONFIG) == head
+
+
+def test_statements_are_compiled_once_per_engine(database: Database):
+    cache = StatementCache()
+    cache.get('users', lambda: sql.select(UserORM.id))
+    compiled = database.engine.sync_engine._compiled_cache
+    assert compiled is not None
+
+    assert cache.compile(database.engine) == 1
+    assert len(compiled) == 1
+    compiled.clear()
+    # compiled by the master before the worker was forked
+    assert cache.compile(database.engine) == 1
+    assert len(compiled) == 0
+
+    cache.get('products', lambda: sql.select(ProductORM.id))
+    assert cache.compile(database.engine) == 2
+    assert len(compiled) == 2
+
+
+def test_default_workers():
+    assert default_workers() >= 1
+
+
+def free_ports(count: int) -> int:
+    """First of `count` consecutive ports nothing listens on"""
+    while True:
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            first = sock.getsockname()[1]
+        try:
+            for port in range(first, first + count):
+                with socket.socket() as sock:
+                    sock.bind(('127.0.0.1', port))
+        except OSError:
+            continue
+        return first
+
+
+def test_workers_serve_their_metrics_on_own_ports():
+    port, metrics_port = free_ports(1), free_ports(2)
+    server = subprocess.Popen(
+        [sys.executable, '-c', PREFORK_SERVER, str(port), str(metrics_port)],
+        env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)},
+    )
+
+    def scrape(worker: int) -> list[str]:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                response = httpx.get(f'http://127.0.0.1:{metrics_port + worker}/metrics')
+                return re.findall(r'^requests_total\{(.*)\} (\S+)$', response.text, re.MULTILINE)
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    try:
+        first = [scrape(0) for _ in range(3)]
+        second = scrape(1)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        code = server.wait(10)
+
+    # every scrape of the port reaches the same worker, its counter does not jump
+    assert first == [[('worker="0"', '1')], [('worker="0"', '2')], [('worker="0"', '3')]]
+    assert second == [('worker="1"', '1')]
+    assert code == 0
@@ -0,0 +1,117 @@
+import httpx
+import pytest
+from sqlalchemy import select
+
+from product_service.api.graphql.v1.sql_trace import SQLTraceExtension
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.models import UserORM
+from product_service.core.db.sqlalchemy.sql_trace import (
+    NPlusOneDetected,
+    SQLTrace,
+    current_sql_trace,
+    statement_shape,
+)
+
+GET_PRODUCTS_QUERY = """
+query {
+  products(first: 3) {
+    edges {
+      node {
+        title
+        reviews(first: 2) {
+          edges {
+            node {
+              content
+              user {
+                ... on User {
+                  username
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+GET_USERS_ONE_BY_ONE_QUERY = """
+query {
+  first: user(id: 1) { username }
+  second: user(id: 2) { username }
+  third: user(id: 3) { username }
+}
+"""
+
+
+@pytest.fixture
+def trace_sql() -> bool:
+    return True
+
+
+@pytest.fixture(autouse=True)
+def sample_every_operation(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SQLTraceExtension, 'sample_rate', 1.0)
+
+
+def test_statement_shape_collapses_in_lists():
+    assert statement_shape('SELECT id\n FROM users WHERE id IN (?, ?, ?)') == (
+        statement_shape('SELECT id FROM users WHERE id IN ($1)')
+    ) == 'SELECT id FROM users WHERE id IN (?)'
+
+
+@pytest.mark.asyncio
+async def test_statements_are_returned_with_field_paths(client: httpx.AsyncClient):
+    response = await client.post('/graphql', json={'query': GET_PRODUCTS_QUERY})
+
+    trace = response.json()['extensions']['sqlTrace']
+    paths = [statement['path'] for statement in trace['statements']]
+    # reviews with their users are prefetched together with products
+    assert trace['count'] == 2
+    assert paths == ['products', 'products']
+    assert trace['statements'][0]['rows'] == 4
+    assert trace['repeated'] == []
+    assert trace['lazyLoads'] == []
+
+
+@pytest.mark.asyncio
+async def test_repeated_statements_are_flagged(client: httpx.AsyncClient):
+    response = await client.post('/graphql', json={'query': GET_USERS_ONE_BY_ONE_QUERY})
+
+    body = response.json()
+    assert 'errors' not in body
+    [repeated] = body['extensions']['sqlTrace']['repeated']
+    assert repeated['count'] == 3
+    assert repeated['paths'] == ['first', 'second', 'third']
+
+
+@pytest.mark.asyncio
+async def test_strict_mode_fails_operation(
+    client: httpx.AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(SQLTraceExtension, 'strict', True)
+
+    response = await client.post('/graphql', json={'query': GET_USERS_ONE_BY_ONE_QUERY})
+
+    [error] = response.json()['errors']
+    assert error['extensions']['code'] == 'N_PLUS_ONE'
+    assert error['message'].startswith('3 statements of the same shape')
+
+
+@pytest.mark.asyncio
+async def test_lazy_loads_are_flagged(database: Database):
+    trace = SQLTrace()
+    token = current_sql_trace.set(trace)
+    try:
+        async with database.async_session_factory() as session:
+            user = await session.scalar(select(UserORM).where(UserORM.id == 1))
+            await session.run_sync(lambda _: user.reviews)
+    finally:
+        current_sql_trace.reset(token)
+
+    assert [lazy_load.attribute for lazy_load in trace.lazy_loads] == ['UserORM.reviews']
+    assert len(trace.statements) == 2
+    with pytest.raises(NPlusOneDetected, match='lazy load of UserORM.reviews'):
+        trace.assert_no_n_plus_one()
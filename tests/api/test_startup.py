@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from graphql import get_introspection_query
+
+import product_service
+from product_service.api.graphql.v1.introspection import IntrospectionCache
+from product_service.main import graphql_app_factory, schema_factory
+
+# Budgets of a cold start, about a third above the measured 1.2 s import and 20 ms schema,
+# override on machines that are slower
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 1700))
+SCHEMA_BUDGET_MS = float(os.environ.get('SCHEMA_BUDGET_MS', 35))
+# Needed only by the command line, by optional exporters or by extensions that are
+# turned off, importing the application must not import them
+DEFERRED_MODULES = (
+    'alembic',
+    'product_service.__main__',
+    'product_service.api.graphql.v1.metrics',
+    'product_service.api.graphql.v1.replicas',
+    'product_service.api.graphql.v1.sql_trace',
+    'product_service.api.graphql.v1.tracing',
+    'product_service.api.metrics',
+    'product_service.core.db.sqlalchemy.bulk_import',
+    'urllib.request',
+)
+
+
+def import_report(module: str) -> tuple[float, dict[str, tuple[int, int]]]:
+    """
+    Wall time of importing the module in a fresh interpreter and
+    `-X importtime` report: self and cumulative microseconds by module
+    """
+    env = {**os.environ, 'PYTHONPATH': str(Path(product_service.__file__).parents[1])}
+    code = (
+        'import time; started = time.perf_counter(); '
+        f'import {module}; print((time.perf_counter() - started) * 1000)'
+    )
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, check=True, timeout=60,
+    )
+    report: dict[str, tuple[int, int]] = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        report[name.strip()] = (int(self_us), int(cumulative_us))
+    return float(process.stdout), report
+
+
+def test_import_time_budget():
+    elapsed, report = import_report('product_service.main')
+    slowest = sorted(report.items(), key=lambda item: item[1][0], reverse=True)[:15]
+    summary = '\n'.join(f'{self_us / 1000:8.1f} ms  {name}' for name, (self_us, _) in slowest)
+
+    assert elapsed < IMPORT_BUDGET_MS, f'import took {elapsed:.0f} ms, slowest:\n{summary}'
+    imported = [name for name in DEFERRED_MODULES if name in report]
+    assert not imported, f'imported on start: {imported}'
+
+
+def test_schema_is_built_once():
+    started = time.perf_counter()
+    schema_factory.__wrapped__()
+    elapsed = (time.perf_counter() - started) * 1000
+
+    assert elapsed < SCHEMA_BUDGET_MS, f'schema built in {elapsed:.0f} ms'
+    assert schema_factory() is schema_factory()
+    assert graphql_app_factory().schema is graphql_app_factory().schema
+
+
+@pytest.mark.asyncio
+async def test_introspection_is_cached(client: httpx.AsyncClient):
+    query = get_introspection_query()
+    IntrospectionCache.results.clear()
+
+    first = await client.post('/graphql', json={'query': query})
+    second = await client.post('/graphql', json={'query': query})
+
+    assert first.json()['data']['__schema']['queryType'] == {'name': 'Query'}
+    assert second.json()['data'] == first.json()['data']
+    (results,) = IntrospectionCache.results.values()
+    assert results.metrics() == {
+        'size': 1, 'hits': 1, 'misses': 1,
+    }
+
+    response = await client.post(
+        '/graphql', json={'query': '{ __typename user(id: 1) { ... on User { username } } }'},
+    )
+    assert response.json()['data']['user'] == {'username': 'user1'}
+    assert len(results) == 1
@@ -0,0 +1,110 @@
+import httpx
+import pytest
+import sqlalchemy as sql
+
+from product_service.core.db.sqlalchemy import Database
+from product_service.core.db.sqlalchemy.statements import StatementCache, statement_cache
+from product_service.core.dto import SelectedFields
+from product_service.gateways.sqlalchemy.review import SQLAlchemyReviewGateway
+from product_service.gateways.sqlalchemy.statements import precompile_statements
+from product_service.gateways.sqlalchemy.user import SQLAlchemyUserGateway
+
+
+@pytest.fixture(autouse=True)
+def clear_statement_cache():
+    statement_cache.clear()
+    yield
+    statement_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_statement_is_reused_for_same_shape(database: Database):
+    fields = [SelectedFields(owner='user', fields=['username'])]
+    async with database.async_session_factory() as session:
+        gateway = SQLAlchemyUserGateway(session)
+        first_stmt, first_params = gateway._construct_select_query(fields, ids=[1, 2])
+        second_stmt, second_params = gateway._construct_select_query(fields, ids=[3])
+        other_stmt, _ = gateway._construct_select_query(fields, limit=2)
+
+        users = await gateway.get_many([3, 4], fields)
+
+    assert first_stmt is second_stmt
+    assert other_stmt is not first_stmt
+    assert (first_params, second_params) == ({'ids': [1, 2]}, {'ids': [3]})
+    assert [user.username for user in users] == ['user3', 'user4']
+    assert statement_cache.metrics()['misses'] == 3
+
+
+@pytest.mark.asyncio
+async def test_reviews_per_parent_are_bound_on_execution(database: Database):
+    fields = [SelectedFields(owner='reviews', fields=['id'])]
+    async with database.async_session_factory() as session:
+        gateway = SQLAlchemyReviewGateway(session)
+        first = await gateway.get_many_by_product_ids([1, 2], fields, limit=2)
+        second = await gateway.get_many_by_product_ids([3], fields, limit=1, after=9)
+
+    assert {id: [r.id for r in reviews] for id, reviews in first.items()} == {1: [1, 2], 2: [5, 6]}
+    assert {id: [r.id for r in reviews] for id, reviews in second.items()} == {3: [10]}
+    assert statement_cache.metrics() == {'size': 2, 'hits': 0, 'misses': 2, 'evictions': 0}
+
+
+@pytest.mark.asyncio
+async def test_precompiled_statements_skip_compilation(database: Database):
+    compiled = precompile_statements(database.engine)
+    compiled_cache = database.engine.sync_engine._compiled_cache
+    cached = len(compiled_cache)
+
+    fields = [SelectedFields(owner='users', fields=['id', 'username'])]
+    async with database.async_session_factory() as session:
+        users = await SQLAlchemyUserGateway(session).get_list(fields, limit=2)
+
+    assert compiled == statement_cache.metrics()['size'] > 0
+    assert len(users) == 2
+    assert len(compiled_cache) == cached
+    assert statement_cache.metrics()['hits'] == 1
+
+
+@pytest.mark.asyncio
+async def test_statement_cache_metrics(client: httpx.AsyncClient, database: Database):
+    fields = [SelectedFields(owner='user', fields=['username'])]
+    async with database.async_session_factory() as session:
+        gateway = SQLAlchemyUserGateway(session)
+        await gateway.get(id=1, fields=fields)
+        await gateway.get(id=2, fields=fields)
+
+    response = await client.get('/health/statements')
+
+    assert response.json() == {'size': 1, 'hits': 1, 'misses': 1, 'evictions': 0}
+
+
+@pytest.mark.asyncio
+async def test_field_order_does_not_create_statements(client: httpx.AsyncClient):
+    queries = [
+        '{ product(id: 1) { id title description } }',
+        '{ product(id: 1) { description title id } }',
+        '{ product(id: 1) { name: title description heading: title } }',
+    ]
+
+    responses = [await client.post('/graphql', json={'query': query}) for query in queries]
+
+    assert responses[1].json()['data']['product'] == {
+        'description': 'description1', 'title': 'product1', 'id': '1',
+    }
+    assert responses[2].json()['data']['product'] == {
+        'name': 'product1', 'description': 'description1', 'heading': 'product1',
+    }
+    assert statement_cache.metrics()['size'] == 1
+
+
+def test_least_recently_used_statements_are_evicted():
+    cache = StatementCache(maxsize=2)
+    statements = {name: sql.select(sql.literal(name)) for name in 'abc'}
+
+    cache.get('a', lambda: statements['a'])
+    cache.get('b', lambda: statements['b'])
+    cache.get('a', lambda: statements['a'])
+    cache.get('c', lambda: statements['c'])
+
+    assert len(cache) == 2
+    assert cache.get('a', lambda: statements['c']) is statements['a']
+    assert cache.metrics() == {'size': 2, 'hits': 2, 'misses': 3, 'evictions': 1}
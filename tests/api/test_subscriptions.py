@@ -0,0 +1,231 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Callable
+
+import httpx
+import pytest
+from dishka import AsyncContainer, Scope
+
+from product_service.core.broker import InMemoryBroker, SubscriberDropped
+from product_service.main import graphql_app_factory
+
+REVIEW_ADDED_SUBSCRIPTION = """
+subscription ReviewAdded($productId: ID!) {
+  reviewAdded(productId: $productId) {
+    content
+    user {
+      ... on User {
+        username
+      }
+    }
+  }
+}
+"""
+
+PRODUCT_REVIEWS_SUBSCRIPTION = """
+subscription ProductReviews($productId: ID!, $batchSize: Int!, $after: ID) {
+  productReviews(productId: $productId, batchSize: $batchSize, after: $after) {
+    id
+    user {
+      ... on User {
+        username
+      }
+    }
+  }
+}
+"""
+
+MULTIPART_ACCEPT = 'multipart/mixed;boundary=graphql;subscriptionSpec=1.0,application/json'
+
+CREATE_REVIEW_MUTATION = """
+mutation CreateReview($input: ReviewInput!) {
+  reviews {
+    createReview(input: $input) {
+      id
+    }
+  }
+}
+"""
+
+
+async def wait_until(condition: Callable[[], bool], timeout: float = 1) -> None:
+    async def wait() -> None:
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(wait(), timeout)
+
+
+def multipart_payloads(body: str) -> list[dict]:
+    """Payloads of the parts of a multipart subscription response, heartbeats are skipped"""
+    parts = (part.partition('\r\n\r\n')[2].strip() for part in body.split('--graphql'))
+    return [payload for part in parts if part and (payload := json.loads(part))]
+
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_to_subscribers_of_topic():
+    broker = InMemoryBroker()
+
+    async with broker.subscribe('a') as first, broker.subscribe('a') as second:
+        async with broker.subscribe('b') as other:
+            await broker.publish('a', 1)
+            await broker.publish('c', 2)
+            assert (first.queue.qsize(), second.queue.qsize(), other.queue.qsize()) == (1, 1, 0)
+            assert await anext(first) == await anext(second) == 1
+
+    assert broker.metrics() == {'topics': 0, 'subscribers': 0, 'published': 1, 'dropped': 0}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('overflow', ['wait', 'drop'])
+async def test_broker_drops_slow_subscriber(overflow):
+    broker = InMemoryBroker(maxsize=1, overflow=overflow, publish_timeout=0.01)
+
+    async with broker.subscribe('a') as slow, broker.subscribe('a') as fast:
+        await broker.publish('a', 1)
+        assert await anext(fast) == 1
+        await broker.publish('a', 2)
+
+        assert await anext(fast) == 2
+        with pytest.raises(SubscriberDropped):
+            await anext(slow)
+        assert broker.metrics()['subscribers'] == 1
+    assert broker.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_broker_waits_for_subscriber_to_catch_up():
+    broker = InMemoryBroker(maxsize=1, overflow='wait', publish_timeout=1)
+
+    async with broker.subscribe('a') as subscriber:
+        await broker.publish('a', 1)
+        publishing = asyncio.create_task(broker.publish('a', 2))
+        await asyncio.sleep(0.01)
+        assert not publishing.done()
+
+        assert await anext(subscriber) == 1
+        await publishing
+        assert await anext(subscriber) == 2
+    assert broker.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_review_added_subscription(client: httpx.AsyncClient, container: AsyncContainer):
+    schema = graphql_app_factory().schema
+    broker = await container.get(InMemoryBroker)
+
+    # websocket connections only enter session scope of the container
+    async with container(scope=Scope.SESSION) as session_container:
+        request = SimpleNamespace(state=SimpleNamespace(dishka_container=session_container))
+
+        received = []
+
+        async def consume():
+            # like websocket handlers, events are consumed in a task cancelled on disconnect
+            async for event in await schema.subscribe(
+                REVIEW_ADDED_SUBSCRIPTION,
+                variable_values={'productId': '2'},
+                context_value={'request': request},
+            ):
+                received.append(event)
+
+        subscription = asyncio.create_task(consume())
+        await wait_until(lambda: broker.metrics()['subscribers'] == 1)
+        for review in (
+            {'content': 'other product', 'userId': 1, 'productId': 3},
+            {'content': 'added', 'userId': 3, 'productId': 2},
+        ):
+            await client.post(
+                '/graphql', json={'query': CREATE_REVIEW_MUTATION, 'variables': {'input': review}},
+            )
+        await wait_until(lambda: len(received) > 0)
+        subscription.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await subscription
+
+    [result] = received
+    assert result.errors is None
+    assert result.data == {'reviewAdded': {'content': 'added', 'user': {'username': 'user3'}}}
+    assert broker.metrics()['subscribers'] == 0
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_of_one_connection_resolve_events_in_own_scope(
+    client: httpx.AsyncClient, container: AsyncContainer,
+):
+    schema = graphql_app_factory().schema
+    broker = await container.get(InMemoryBroker)
+
+    async with container(scope=Scope.SESSION) as session_container:
+        request = SimpleNamespace(state=SimpleNamespace(dishka_container=session_container))
+        # operations of a websocket connection share its context
+        context = {'request': request}
+        received: list[list] = [[], []]
+
+        async def consume(results: list) -> None:
+            async for event in await schema.subscribe(
+                REVIEW_ADDED_SUBSCRIPTION,
+                variable_values={'productId': '2'},
+                context_value=context,
+            ):
+                results.append(event)
+
+        subscriptions = [asyncio.create_task(consume(results)) for results in received]
+        await wait_until(lambda: broker.metrics()['subscribers'] == 2)
+        # scopes of the first events are left when the second ones are read
+        for user_id in (1, 3):
+            review = {'content': 'added', 'userId': user_id, 'productId': 2}
+            await client.post(
+                '/graphql', json={'query': CREATE_REVIEW_MUTATION, 'variables': {'input': review}},
+            )
+            await wait_until(lambda: all(len(results) == len(received[0]) for results in received))
+        await wait_until(lambda: all(len(results) == 2 for results in received))
+        for subscription in subscriptions:
+            subscription.cancel()
+        await asyncio.gather(*subscriptions, return_exceptions=True)
+
+    for results in received:
+        assert [result.errors for result in results] == [None, None]
+        assert [result.data['reviewAdded']['user'] for result in results] == [
+            {'username': 'user1'}, {'username': 'user3'},
+        ]
+    assert context == {'request': request}
+
+
+@pytest.mark.asyncio
+async def test_product_reviews_are_streamed_in_batches(
+    client: httpx.AsyncClient, sql_statements: list[str],
+):
+    response = await client.post(
+        '/graphql',
+        json={
+            'query': PRODUCT_REVIEWS_SUBSCRIPTION,
+            'variables': {'productId': 2, 'batchSize': 2, 'after': 5},
+        },
+        headers={'Accept': MULTIPART_ACCEPT},
+    )
+
+    assert response.headers['content-type'].startswith('multipart/mixed')
+    batches = [p['payload']['data']['productReviews'] for p in multipart_payloads(response.text)]
+    assert batches == [
+        [{'id': '6', 'user': {'username': 'user2'}}, {'id': '7', 'user': {'username': 'user3'}}],
+        [{'id': '8', 'user': {'username': 'user4'}}],
+    ]
+    # one query read with a cursor, users are joined
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_product_reviews_batch_size_is_limited(client: httpx.AsyncClient):
+    response = await client.post(
+        '/graphql',
+        json={
+            'query': PRODUCT_REVIEWS_SUBSCRIPTION,
+            'variables': {'productId': 2, 'batchSize': 0},
+        },
+        headers={'Accept': MULTIPART_ACCEPT},
+    )
+
+    [payload] = multipart_payloads(response.text)
+    [error] = payload['payload']['errors']
+    assert error['message'] == '"batchSize" must be between 1 and 100'
@@ -0,0 +1,102 @@
+import json
+from typing import Iterator
+
+import httpx
+import pytest
+
+from product_service.core.tracing import (
+    BatchSpanProcessor,
+    FileSpanExporter,
+    InMemorySpanExporter,
+    SimpleSpanProcessor,
+    Span,
+    tracer,
+)
+
+GET_PRODUCTS_QUERY = """
+query Products {
+  products(first: 2) {
+    edges {
+      node {
+        title
+        reviews(first: 2) {
+          edges {
+            node {
+              content
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+@pytest.fixture
+def trace() -> bool:
+    return True
+
+
+@pytest.fixture
+def exporter() -> Iterator[InMemorySpanExporter]:
+    exporter = InMemorySpanExporter()
+    tracer.add_processor(SimpleSpanProcessor(exporter))
+    yield exporter
+    tracer.shutdown()
+
+
+def children(spans: list[Span], parent: Span) -> list[str]:
+    return [span.name for span in spans if span.parent_id == parent.span_id]
+
+
+@pytest.mark.asyncio
+async def test_operation_spans_are_nested(
+    client: httpx.AsyncClient,
+    exporter: InMemorySpanExporter,
+):
+    response = await client.post('/graphql', json={'query': GET_PRODUCTS_QUERY})
+
+    assert 'errors' not in response.json()
+    spans = exporter.spans
+    by_name = {span.name: span for span in spans}
+    operation = by_name['graphql.operation']
+    assert operation.parent_id is None
+    assert operation.attributes['graphql.operation.name'] == 'Products'
+    assert {span.trace_id for span in spans} == {operation.trace_id}
+    assert children(spans, operation) == ['graphql.parse', 'graphql.validate', 'graphql.execute']
+
+    products = by_name['graphql.resolve Query.products']
+    assert products.parent_id == by_name['graphql.execute'].span_id
+    assert 'di.get StrawberryProductResolver' in children(spans, products)
+    gateway = by_name['SQLAlchemyAggregatedProductGateway.get_list']
+    assert 'SQLAlchemyProductGateway.get_list' in children(spans, gateway)
+
+    statements = [span for span in spans if span.name == 'sql']
+    assert len(statements) == 2
+    # page of products with one extra row to detect the next page
+    assert statements[0].attributes['db.rows'] == 3
+    assert all(span.end_ns is not None and span.end_ns >= span.start_ns for span in spans)
+
+
+@pytest.mark.asyncio
+async def test_spans_are_not_recorded_without_processors(client: httpx.AsyncClient):
+    response = await client.post('/graphql', json={'query': GET_PRODUCTS_QUERY})
+
+    assert 'errors' not in response.json()
+    assert not tracer.enabled
+
+
+def test_batch_processor_exports_spans_to_file(tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    tracer.add_processor(BatchSpanProcessor(FileSpanExporter(path), schedule_delay=0.01))
+    with tracer.span('parent', key='value'):
+        with tracer.span('child'):
+            pass
+    tracer.shutdown()
+
+    child, parent = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (child['name'], parent['name']) == ('child', 'parent')
+    assert child['parentSpanId'] == parent['spanId']
+    assert child['traceId'] == parent['traceId']
+    assert parent['attributes'] == [{'key': 'key', 'value': {'stringValue': 'value'}}]